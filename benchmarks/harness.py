@@ -0,0 +1,179 @@
+"""Offline end-to-end benchmark of the insight and report graphs.
+
+Every provider is served by ``benchmarks.transports`` and persistent caches are off, so a
+scenario measures the pipeline itself: per-node time, peak RSS and countries per second.
+"""
+from __future__ import annotations
+
+import os
+import sys
+import tempfile
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+from benchmarks.transports import install_fixture_transports, uninstall_fixture_transports
+
+GRAPHS = ("insight", "report")
+DEFAULT_SIZES = (1, 10, 50)
+SEGMENT = "logistics"
+
+BENCH_COUNTRIES = [
+    "Mongolia", "South Korea", "Vietnam", "Indonesia", "Thailand", "Philippines", "Malaysia", "Singapore",
+    "India", "Japan", "Kazakhstan", "Uzbekistan", "Bangladesh", "Pakistan", "Sri Lanka", "Cambodia",
+    "Laos", "Myanmar", "Nepal", "Australia", "New Zealand", "United States", "Canada", "Mexico",
+    "Brazil", "Chile", "Peru", "Colombia", "Argentina", "Germany", "France", "Poland",
+    "Spain", "Italy", "Netherlands", "Sweden", "Turkey", "Saudi Arabia", "United Arab Emirates", "Qatar",
+    "Egypt", "Kenya", "Nigeria", "South Africa", "Morocco", "Ghana", "Ethiopia", "Tanzania",
+    "Ukraine", "Romania",
+]
+
+
+@dataclass
+class ScenarioResult:
+    graph: str
+    countries: int
+    elapsed_s: float
+    countries_per_s: float
+    peak_rss_mb: Optional[float]
+    node_seconds: Dict[str, float] = field(default_factory=dict)
+    http_requests: Dict[str, int] = field(default_factory=dict)
+    llm_tokens: int = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+def configure_offline(output_dir: Optional[Path] = None) -> Path:
+    """Point credentials, render mode and report output at the offline setup; caches off.
+
+    Call before importing the graph modules so import-time settings pick it up.
+    """
+    output_dir = Path(output_dir or tempfile.mkdtemp(prefix="skala-bench-"))
+    os.environ["TAVILY_API_KEY"] = "offline-benchmark"
+    os.environ["OPENAI_API_KEY"] = "offline-benchmark"
+    os.environ["REPORT_RENDER_MODE"] = "llm"
+    os.environ["REPORT_OUTPUT_DIR"] = str(output_dir)
+
+    import graph.nodes.report_writer as report_writer
+    import tools.web_search as web_search
+    from tools.cache import set_cache_mode
+
+    # Modules imported before this call keep their import-time values.
+    web_search.TAVILY_API_KEY = os.environ["TAVILY_API_KEY"]
+    report_writer.OUTPUT_DIR = output_dir
+    set_cache_mode("off")
+    return output_dir
+
+
+def peak_rss_mb() -> Optional[float]:
+    """Process high-water mark RSS in MB (``None`` where ``resource`` is unavailable, e.g. Windows)."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes.
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def _initial_state(graph: str, countries: List[str]) -> Dict[str, Any]:
+    company = {"name": "Acme Logistics", "url": "https://acme-logistics.example.com"}
+    if graph == "insight":
+        return {"countries": countries, "segment": SEGMENT, "language": "ko", "company": company}
+    from scripts.run_report import build_report_state
+
+    return build_report_state(
+        countries=countries,
+        segment=SEGMENT,
+        company_name=company["name"],
+        company_url=company["url"],
+    )
+
+
+def _compiled(graph: str) -> Any:
+    from graph.builder import build_graph, build_report_graph
+
+    return (build_graph if graph == "insight" else build_report_graph)().compile()
+
+
+def _collect(snapshot: Dict[str, Any]) -> tuple[Dict[str, float], Dict[str, int], int]:
+    node_seconds: Dict[str, float] = {}
+    for sample in snapshot["timings"]:
+        if sample["name"] == "node_seconds":
+            node = sample["labels"]["node"]
+            node_seconds[node] = round(node_seconds.get(node, 0.0) + sample["sum"], 4)
+    http_requests: Dict[str, int] = {}
+    tokens = 0
+    for sample in snapshot["counters"]:
+        if sample["name"] == "http_requests_total":
+            provider = sample["labels"]["provider"]
+            http_requests[provider] = http_requests.get(provider, 0) + int(sample["value"])
+        elif sample["name"] in ("llm_prompt_tokens_total", "llm_completion_tokens_total"):
+            tokens += int(sample["value"])
+    return node_seconds, http_requests, tokens
+
+
+async def run_scenario(graph: str, size: int, *, latency_scale: float = 1.0) -> ScenarioResult:
+    """Run one graph end to end for the first ``size`` benchmark countries."""
+    from tools.executors import drain_exports
+    from tools.http_client import http_clients
+    from tools.metrics import METRICS
+
+    if graph not in GRAPHS:
+        raise ValueError(f"Unknown graph {graph!r}; expected one of {GRAPHS}")
+    if not 0 < size <= len(BENCH_COUNTRIES):
+        raise ValueError(f"size must be between 1 and {len(BENCH_COUNTRIES)}")
+
+    compiled = _compiled(graph)
+    state = _initial_state(graph, BENCH_COUNTRIES[:size])
+    METRICS.reset()
+    install_fixture_transports(latency_scale)
+    try:
+        async with http_clients():
+            started = time.perf_counter()
+            await compiled.ainvoke(state, config={"configurable": {"run_id": f"bench-{graph}-{size}"}})
+            await drain_exports()
+            elapsed = time.perf_counter() - started
+    finally:
+        uninstall_fixture_transports()
+
+    node_seconds, http_requests, tokens = _collect(METRICS.snapshot())
+    return ScenarioResult(
+        graph=graph,
+        countries=size,
+        elapsed_s=round(elapsed, 4),
+        countries_per_s=round(size / elapsed, 3) if elapsed else 0.0,
+        peak_rss_mb=peak_rss_mb(),
+        node_seconds=node_seconds,
+        http_requests=http_requests,
+        llm_tokens=tokens,
+    )
+
+
+async def run_suite(
+    graphs: Iterable[str] = GRAPHS,
+    sizes: Iterable[int] = DEFAULT_SIZES,
+    *,
+    latency_scale: float = 1.0,
+) -> List[ScenarioResult]:
+    """Run every (graph, size) scenario in order, smallest first."""
+    results = []
+    for graph in graphs:
+        for size in sorted(sizes):
+            results.append(await run_scenario(graph, size, latency_scale=latency_scale))
+    return results
+
+
+def compare(results: List[ScenarioResult], baseline: List[Dict[str, Any]], tolerance: float) -> List[str]:
+    """Describe scenarios whose elapsed time regressed more than ``tolerance`` over the baseline."""
+    previous = {(entry["graph"], entry["countries"]): entry for entry in baseline}
+    regressions = []
+    for result in results:
+        before = previous.get((result.graph, result.countries))
+        if before and result.elapsed_s > before["elapsed_s"] * (1 + tolerance):
+            regressions.append(
+                f"{result.graph}/{result.countries}: {result.elapsed_s:.3f}s vs baseline {before['elapsed_s']:.3f}s"
+            )
+    return regressions
@@ -0,0 +1,369 @@
+"""Local stand-in for the Tavily, World Bank, OpenAI chat-completions and company-page endpoints.
+
+Answers from the recorded fixtures (same handlers as ``benchmarks.transports``) with
+configurable latency distributions, error rates and rate limiting, so a full deployment can
+be load-tested on a laptop by pointing it here through environment variables::
+
+    python -m benchmarks.mock_server --port 8765 --rate-limit openai=5 --error-rate tavily=0.05
+
+    TAVILY_ENDPOINT=http://127.0.0.1:8765/search
+    WORLDBANK_BASE_URL=http://127.0.0.1:8765/v2
+    OPENAI_BASE_URL=http://127.0.0.1:8765/v1
+    --company-url http://127.0.0.1:8765/company
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import random
+import threading
+import time
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import httpx
+import yaml
+
+from benchmarks.transports import load_fixture, openai_handler, tavily_handler, web_handler, worldbank_handler
+
+PROVIDERS = ("tavily", "worldbank", "openai", "web")
+DISTRIBUTIONS = ("fixed", "uniform", "normal", "lognormal", "exponential")
+_RECORDED_LATENCY_MS = {
+    "tavily": load_fixture("tavily.json")["latency_ms"],
+    "worldbank": load_fixture("worldbank.json")["latency_ms"],
+    "openai": load_fixture("openai.json")["latency_ms"],
+    "web": 300,
+}
+
+
+@dataclass(frozen=True)
+class LatencySpec:
+    """Latency distribution in milliseconds, written ``kind:arg[,arg]``.
+
+    ``fixed:200`` / ``uniform:100,400`` / ``normal:250,50`` (mean, sd) /
+    ``lognormal:250,0.5`` (median, sigma) / ``exponential:250`` (mean).
+    """
+
+    kind: str
+    params: Tuple[float, ...]
+
+    @classmethod
+    def parse(cls, spec: str) -> "LatencySpec":
+        kind, _, raw = spec.partition(":")
+        kind = kind.strip().lower()
+        if kind not in DISTRIBUTIONS:
+            raise ValueError(f"Unknown latency distribution {kind!r} (expected one of {', '.join(DISTRIBUTIONS)})")
+        try:
+            params = tuple(float(part) for part in raw.split(",") if part.strip())
+        except ValueError as exc:
+            raise ValueError(f"Invalid latency parameters in {spec!r}") from exc
+        expected = {"fixed": 1, "uniform": 2, "normal": 2, "lognormal": 2, "exponential": 1}[kind]
+        if len(params) != expected:
+            raise ValueError(f"{kind} latency takes {expected} parameter(s), got {spec!r}")
+        return cls(kind, params)
+
+    def scaled(self, factor: float) -> "LatencySpec":
+        if self.kind == "lognormal":  # sigma is a shape parameter, only the median scales
+            return LatencySpec(self.kind, (self.params[0] * factor, self.params[1]))
+        return LatencySpec(self.kind, tuple(param * factor for param in self.params))
+
+    def sample(self, rng: random.Random) -> float:
+        """One delay in seconds (never negative)."""
+        a = self.params[0]
+        if self.kind == "fixed":
+            ms = a
+        elif self.kind == "uniform":
+            ms = rng.uniform(a, self.params[1])
+        elif self.kind == "normal":
+            ms = rng.gauss(a, self.params[1])
+        elif self.kind == "lognormal":
+            ms = a * math.exp(rng.gauss(0.0, self.params[1]))
+        else:
+            ms = rng.expovariate(1.0 / a) if a > 0 else 0.0
+        return max(0.0, ms) / 1000.0
+
+
+class RateLimiter:
+    """Token bucket of ``rate`` requests per second with ``burst`` capacity."""
+
+    def __init__(self, rate: float, burst: Optional[float] = None) -> None:
+        self.rate = rate
+        self.capacity = burst if burst is not None else max(1.0, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """Take a token; returns 0 on success, otherwise the seconds until one is available."""
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return 0.0
+            return (1 - self.tokens) / self.rate
+
+
+@dataclass
+class ProviderBehaviour:
+    latency: LatencySpec
+    error_rate: float = 0.0
+    rate_limit: Optional[RateLimiter] = None
+
+
+@dataclass
+class MockConfig:
+    providers: Dict[str, ProviderBehaviour]
+    seed: Optional[int] = None
+    stats: Dict[str, Dict[str, int]] = field(default_factory=dict)
+
+    @classmethod
+    def build(
+        cls,
+        *,
+        latency: Optional[Dict[str, str]] = None,
+        error_rate: Optional[Dict[str, float]] = None,
+        rate_limit: Optional[Dict[str, float]] = None,
+        burst: Optional[Dict[str, float]] = None,
+        latency_scale: float = 1.0,
+        seed: Optional[int] = None,
+    ) -> "MockConfig":
+        """Per-provider settings; a ``"*"`` key applies to every provider without its own entry.
+
+        Latency defaults to a lognormal around each fixture's recorded latency.
+        """
+
+        def pick(mapping: Optional[Dict[str, Any]], provider: str) -> Any:
+            mapping = mapping or {}
+            return mapping.get(provider, mapping.get("*"))
+
+        providers = {}
+        for provider in PROVIDERS:
+            spec = pick(latency, provider) or f"lognormal:{_RECORDED_LATENCY_MS[provider]},0.35"
+            rps = pick(rate_limit, provider)
+            providers[provider] = ProviderBehaviour(
+                latency=LatencySpec.parse(spec).scaled(latency_scale),
+                error_rate=float(pick(error_rate, provider) or 0.0),
+                rate_limit=RateLimiter(float(rps), pick(burst, provider)) if rps else None,
+            )
+        return cls(providers=providers, seed=seed, stats={p: {} for p in PROVIDERS})
+
+    @classmethod
+    def from_file(cls, path: Path, **overrides: Any) -> "MockConfig":
+        """Load ``latency``/``error_rate``/``rate_limit``/``burst`` mappings from YAML or JSON."""
+        data = yaml.safe_load(Path(path).read_text(encoding="utf-8")) or {}
+        options = {key: data.get(key) for key in ("latency", "error_rate", "rate_limit", "burst")}
+        options["latency_scale"] = float(data.get("latency_scale", 1.0))
+        options["seed"] = data.get("seed")
+        options.update({key: value for key, value in overrides.items() if value is not None})
+        return cls.build(**options)
+
+
+def _route(method: str, path: str) -> str:
+    if method == "POST" and path.rstrip("/").endswith("/search"):
+        return "tavily"
+    if method == "POST" and path.rstrip("/").endswith("/chat/completions"):
+        return "openai"
+    if "/country/" in path and "/indicator/" in path:
+        return "worldbank"
+    return "web"
+
+
+_HANDLERS: Dict[str, Callable[[httpx.Request], httpx.Response]] = {
+    "tavily": tavily_handler,
+    "worldbank": worldbank_handler,
+    "openai": openai_handler,
+    "web": web_handler,
+}
+
+
+def _error_body(provider: str, status: int, message: str) -> bytes:
+    if provider == "openai":
+        kind = "rate_limit_exceeded" if status == 429 else "server_error"
+        payload: Any = {"error": {"message": message, "type": kind, "code": kind}}
+    elif provider == "worldbank":
+        payload = [{"message": [{"id": str(status), "key": "Error", "value": message}]}]
+    else:
+        payload = {"detail": {"error": message}}
+    return json.dumps(payload).encode("utf-8")
+
+
+def _sse_chunks(response: httpx.Response) -> List[bytes]:
+    """Re-encode a chat completion as a streamed (server-sent events) response."""
+    body = response.json()
+    content = body["choices"][0]["message"]["content"]
+    pieces = [content[i : i + 64] for i in range(0, len(content), 64)] or [""]
+    chunks = []
+    for index, piece in enumerate(pieces):
+        delta = {"role": "assistant", "content": piece} if index == 0 else {"content": piece}
+        event = {
+            "id": body["id"],
+            "object": "chat.completion.chunk",
+            "created": body["created"],
+            "model": body["model"],
+            "choices": [{"index": 0, "delta": delta, "finish_reason": None}],
+        }
+        chunks.append(f"data: {json.dumps(event, ensure_ascii=False)}\n\n".encode("utf-8"))
+    chunks.append(b"data: [DONE]\n\n")
+    return chunks
+
+
+class MockServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address: Tuple[str, int], config: MockConfig) -> None:
+        super().__init__(address, _MockHandler)
+        self.config = config
+        self.rng = random.Random(config.seed)
+        self._lock = threading.Lock()
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def env(self) -> Dict[str, str]:
+        """Environment variables that route the app's outbound calls to this server."""
+        return {
+            "TAVILY_ENDPOINT": f"{self.base_url}/search",
+            "WORLDBANK_BASE_URL": f"{self.base_url}/v2",
+            "OPENAI_BASE_URL": f"{self.base_url}/v1",
+        }
+
+    def count(self, provider: str, outcome: str) -> None:
+        with self._lock:
+            stats = self.config.stats.setdefault(provider, {})
+            stats[outcome] = stats.get(outcome, 0) + 1
+
+    def draw(self, behaviour: ProviderBehaviour) -> Tuple[float, bool]:
+        with self._lock:
+            return behaviour.latency.sample(self.rng), self.rng.random() < behaviour.error_rate
+
+
+class _MockHandler(BaseHTTPRequestHandler):
+    server: MockServer
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format: str, *args: Any) -> None:  # noqa: A002 - quiet by default
+        pass
+
+    def _send(self, status: int, body: bytes, headers: Dict[str, str]) -> None:
+        self.send_response(status)
+        for key, value in headers.items():
+            self.send_header(key, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _handle(self) -> None:
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length) if length else b""
+        path = self.path.split("?", 1)[0]
+        if path == "/__stats":
+            self._send(200, json.dumps(self.server.config.stats).encode("utf-8"), {"Content-Type": "application/json"})
+            return
+
+        provider = _route(self.command, path)
+        behaviour = self.server.config.providers[provider]
+        json_headers = {"Content-Type": "application/json"}
+        if behaviour.rate_limit is not None:
+            wait = behaviour.rate_limit.acquire()
+            if wait > 0:
+                self.server.count(provider, "429")
+                headers = {**json_headers, "Retry-After": str(max(1, math.ceil(wait)))}
+                self._send(429, _error_body(provider, 429, "Rate limit exceeded"), headers)
+                return
+
+        delay, fail = self.server.draw(behaviour)
+        if delay:
+            time.sleep(delay)
+        if fail:
+            self.server.count(provider, "500")
+            self._send(500, _error_body(provider, 500, "Injected upstream error"), json_headers)
+            return
+
+        request = httpx.Request(self.command, f"{self.server.base_url}{self.path}", headers=dict(self.headers), content=body)
+        response = _HANDLERS[provider](request)
+        self.server.count(provider, str(response.status_code))
+        if provider == "openai" and response.status_code == 200 and json.loads(body or b"{}").get("stream"):
+            self._send(200, b"".join(_sse_chunks(response)), {"Content-Type": "text/event-stream"})
+            return
+        content_type = response.headers.get("content-type", "application/json")
+        self._send(response.status_code, response.content, {"Content-Type": content_type})
+
+    do_GET = _handle
+    do_POST = _handle
+
+
+def start_server(config: MockConfig, host: str = "127.0.0.1", port: int = 0) -> Tuple[MockServer, threading.Thread]:
+    """Serve in a background thread (``port=0`` picks a free port); call ``server.shutdown()`` to stop."""
+    server = MockServer((host, port), config)
+    thread = threading.Thread(target=server.serve_forever, name="mock-server", daemon=True)
+    thread.start()
+    return server, thread
+
+
+def _pairs(values: List[str], convert: Callable[[str], Any]) -> Dict[str, Any]:
+    """Parse repeated ``provider=value`` options (a bare value applies to every provider)."""
+    parsed: Dict[str, Any] = {}
+    for item in values:
+        provider, sep, raw = item.partition("=")
+        if not sep:
+            provider, raw = "*", item
+        if provider != "*" and provider not in PROVIDERS:
+            raise argparse.ArgumentTypeError(f"Unknown provider {provider!r} (expected one of {', '.join(PROVIDERS)})")
+        parsed[provider] = convert(raw)
+    return parsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Local Tavily/World Bank/OpenAI stand-in for load tests")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--config", help="YAML/JSON file with latency/error_rate/rate_limit/burst mappings")
+    parser.add_argument(
+        "--latency",
+        action="append",
+        default=[],
+        help="provider=dist:args, e.g. openai=lognormal:1200,0.5 or tavily=uniform:100,400 (repeatable)",
+    )
+    parser.add_argument("--latency-scale", type=float, default=None, help="Multiply every latency distribution")
+    parser.add_argument("--error-rate", action="append", default=[], help="provider=fraction of injected 500s")
+    parser.add_argument("--rate-limit", action="append", default=[], help="provider=requests per second (429 + Retry-After)")
+    parser.add_argument("--burst", action="append", default=[], help="provider=token bucket capacity")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    options: Dict[str, Any] = {
+        "latency": _pairs(args.latency, str) or None,
+        "error_rate": _pairs(args.error_rate, float) or None,
+        "rate_limit": _pairs(args.rate_limit, float) or None,
+        "burst": _pairs(args.burst, float) or None,
+        "latency_scale": args.latency_scale,
+        "seed": args.seed,
+    }
+    if args.config:
+        config = MockConfig.from_file(Path(args.config), **options)
+    else:
+        if options["latency_scale"] is None:
+            options["latency_scale"] = 1.0
+        config = MockConfig.build(**options)
+
+    server = MockServer((args.host, args.port), config)
+    for key, value in server.env().items():
+        print(f"{key}={value}")
+    print(f"company page: {server.base_url}/company   stats: {server.base_url}/__stats", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
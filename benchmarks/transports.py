@@ -0,0 +1,162 @@
+"""Fake httpx transports replaying the recorded provider responses under ``benchmarks/fixtures``.
+
+Each provider answers from its fixture after that fixture's recorded latency (scaled by
+``latency_scale``), so graph runs exercise the real request/parse path without a network.
+"""
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import re
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+from urllib.parse import unquote
+
+import httpx
+
+FIXTURES_DIR = Path(__file__).resolve().parent / "fixtures"
+
+Handler = Callable[[httpx.Request], httpx.Response]
+
+
+@lru_cache(maxsize=None)
+def load_fixture(name: str) -> Any:
+    path = FIXTURES_DIR / name
+    text = path.read_text(encoding="utf-8")
+    return json.loads(text) if path.suffix == ".json" else text
+
+
+def _stable_hash(text: str) -> int:
+    return int(hashlib.sha1(text.encode("utf-8")).hexdigest()[:8], 16)
+
+
+def _slug(text: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "-", text.lower()).strip("-")
+
+
+class FixtureTransport(httpx.AsyncBaseTransport):
+    """Answer requests with ``handler`` after ``latency`` seconds."""
+
+    def __init__(self, handler: Handler, latency: float = 0.0) -> None:
+        self._handler = handler
+        self.latency = latency
+        self.requests = 0
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        self.requests += 1
+        await request.aread()
+        if self.latency > 0:
+            await asyncio.sleep(self.latency)
+        return self._handler(request)
+
+
+def tavily_handler(request: httpx.Request) -> httpx.Response:
+    """Rotate through the recorded results so distinct queries yield distinct URLs."""
+    payload = json.loads(request.content or b"{}")
+    query = str(payload.get("query", ""))
+    k = int(payload.get("max_results") or 5)
+    recorded = load_fixture("tavily.json")["results"]
+    offset = _stable_hash(query) % len(recorded)
+    slug = _slug(query)
+    results = []
+    for index in range(min(k, len(recorded))):
+        item = recorded[(offset + index) % len(recorded)]
+        results.append({key: value.format(query=query, slug=slug) if isinstance(value, str) else value for key, value in item.items()})
+    return httpx.Response(200, json={"query": query, "results": results})
+
+
+def worldbank_handler(request: httpx.Request) -> httpx.Response:
+    """Serve ``/country/{codes}/indicator/{indicators}`` in the World Bank v2 JSON layout."""
+    match = re.search(r"/country/([^/]+)/indicator/([^/?]+)", unquote(request.url.path))
+    if not match:
+        return httpx.Response(404, json=[{"message": [{"key": "Invalid value"}]}])
+    codes = [code.upper() for code in match.group(1).split(";") if code]
+    indicators = [indicator for indicator in match.group(2).split(";") if indicator]
+    recorded = load_fixture("worldbank.json")["values"]
+    rows = []
+    for code in codes:
+        # Spread values per country so downstream scoring sees a realistic range.
+        factor = 0.25 + (_stable_hash(code) % 400) / 100.0
+        for indicator in indicators:
+            base = recorded.get(indicator)
+            value = None if base is None else round(min(base * factor, 100.0) if indicator.endswith(".ZS") else base * factor, 4)
+            rows.append(
+                {
+                    "indicator": {"id": indicator, "value": indicator},
+                    "country": {"id": code[:2], "value": code},
+                    "countryiso3code": code,
+                    "date": "2023",
+                    "value": value,
+                }
+            )
+    meta = {"page": 1, "pages": 1, "per_page": len(rows) or 1, "total": len(rows)}
+    return httpx.Response(200, json=[meta, rows])
+
+
+def web_handler(request: httpx.Request) -> httpx.Response:
+    return httpx.Response(200, text=load_fixture("company_page.html"), headers={"content-type": "text/html; charset=utf-8"})
+
+
+def openai_handler(request: httpx.Request) -> httpx.Response:
+    """Chat-completions replay: JSON briefs for the company profile, Markdown sections otherwise."""
+    payload = json.loads(request.content or b"{}")
+    messages = payload.get("messages") or [{}]
+    system = str(messages[0].get("content", ""))
+    prompt = str(messages[-1].get("content", ""))
+    recorded = load_fixture("openai.json")
+    if "JSON" in system:
+        content = json.dumps(recorded["company_profile"], ensure_ascii=False)
+    else:
+        completions = recorded["completions"]
+        content = completions[_stable_hash(prompt) % len(completions)]
+    body = {
+        "id": f"chatcmpl-bench-{_stable_hash(prompt):08x}",
+        "object": "chat.completion",
+        "created": 0,
+        "model": payload.get("model", "benchmark"),
+        "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+        "usage": {
+            "prompt_tokens": len(prompt) // 4,
+            "completion_tokens": len(content) // 4,
+            "total_tokens": (len(prompt) + len(content)) // 4,
+        },
+    }
+    return httpx.Response(200, json=body)
+
+
+_PROVIDERS: Dict[str, tuple[Handler, Optional[str]]] = {
+    "tavily": (tavily_handler, "tavily.json"),
+    "worldbank": (worldbank_handler, "worldbank.json"),
+    "web": (web_handler, None),
+    "pages": (web_handler, None),
+    "openai": (openai_handler, "openai.json"),
+}
+WEB_LATENCY_MS = 300
+
+
+def fixture_transports(latency_scale: float = 1.0) -> Dict[str, FixtureTransport]:
+    """One ``FixtureTransport`` per provider in ``tools.http_client.PROVIDERS``."""
+    transports = {}
+    for provider, (handler, fixture) in _PROVIDERS.items():
+        latency_ms = load_fixture(fixture).get("latency_ms", 0) if fixture else WEB_LATENCY_MS
+        transports[provider] = FixtureTransport(handler, latency=latency_ms / 1000.0 * latency_scale)
+    return transports
+
+
+def install_fixture_transports(latency_scale: float = 1.0) -> Dict[str, FixtureTransport]:
+    """Register the fixture transports with the shared HTTP client registry."""
+    from tools.http_client import register_transport
+
+    transports = fixture_transports(latency_scale)
+    for provider, transport in transports.items():
+        register_transport(provider, transport)
+    return transports
+
+
+def uninstall_fixture_transports() -> None:
+    from tools.http_client import register_transport
+
+    for provider in _PROVIDERS:
+        register_transport(provider, None)
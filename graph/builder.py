@@ -1,9 +1,10 @@
 """LangGraph builders wiring the agent nodes."""
 from __future__ import annotations
 
-from typing import Any, Callable
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Sequence, Set
 
-from langgraph.graph import StateGraph
+from langgraph.graph import END, START, StateGraph
 
 from graph.state import ReportState, State
 from graph.logging_utils import log_node_io
@@ -11,19 +12,86 @@ from graph.nodes.barrier_extractor import barrier_extractor
 from graph.nodes.company_profile import company_profile
 from graph.nodes.competition_analyzer import competition_analyzer
 from graph.nodes.country_market_research import country_market_research
-from graph.nodes.decision_flow_controller import decision_flow_controller
+from graph.nodes.decision_flow_controller import decision_flow_controller, route_after_decision
 from graph.nodes.entry_strategy import entry_strategy
+from graph.nodes.evidence_retry import evidence_retry
 from graph.nodes.insight_integrator import insight_integrator
 from graph.nodes.law_analyzer import law_analyzer
 from graph.nodes.market_analyzer import market_analyzer
 from graph.nodes.partner_sourcing import partner_sourcing
 from graph.nodes.reference_loader import reference_loader
 from graph.nodes.report_writer import report_writer
+from graph.nodes.search_planner import plan_insight_searches, plan_report_searches
+from tools.checkpoint import checkpointed
+from tools.tracing import traced
 
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
 
-def _instrument(node_name: str, func: Callable[..., Any]) -> Callable[..., Any]:
-    """Attach structured execution logging to a node."""
-    return log_node_io(node_name)(func)
+# State paths each report node reads; checkpoints are reused only when these hash the same.
+# ``None`` hashes the whole state.
+REPORT_NODE_INPUTS: Dict[str, Optional[Sequence[str]]] = {
+    "company_loader": ("company", "firm", "company_name"),
+    "reference_loader": ("references",),
+    "search_planner": ("countries", "segment", "rules.min_evidence"),
+    "market_assessment": ("countries", "segment", "rules.min_evidence", "search_results", "search_reused"),
+    "competition_assessment": ("countries", "segment", "search_results"),
+    "partner_mapper": ("countries", "segment", "search_results"),
+    "strategy_planner": ("countries", "market", "competition", "firm", "rules"),
+    "decision_router": ("countries", "strategies", "market", "rules", "retry_attempts"),
+    "evidence_retry": ("retry_countries", "retry_attempts", "segment", "market", "rules.min_evidence"),
+    "report_builder": None,
+}
+# Files rendered by a node count towards its code version, so template edits re-run it. (Project
+# modules a node imports, e.g. tools/scoring.py, are covered by ``code_version`` itself.)
+REPORT_NODE_ASSETS: Dict[str, Sequence[Path]] = {
+    "report_builder": (PROJECT_ROOT / "prompts", PROJECT_ROOT / "templates"),
+}
+
+
+def _instrument(
+    node_name: str,
+    func: Callable[..., Any],
+    *,
+    inputs: Optional[Sequence[str]] = None,
+    assets: Sequence[Path] = (),
+) -> Callable[..., Any]:
+    """Attach structured execution logging, a trace span and checkpoint reuse to a node."""
+    node = checkpointed(node_name, func, inputs=inputs, assets=assets)
+    return log_node_io(node_name)(traced(node_name, cat="node")(node))
+
+
+def _report_node(node_name: str, func: Callable[..., Any]) -> Callable[..., Any]:
+    return _instrument(
+        node_name,
+        func,
+        inputs=REPORT_NODE_INPUTS.get(node_name),
+        assets=REPORT_NODE_ASSETS.get(node_name, ()),
+    )
+
+
+def downstream_nodes(graph: StateGraph, node: str) -> Set[str]:
+    """Return ``node`` and every node reachable from it (edges, joins and branches)."""
+    if node not in graph.nodes:
+        raise ValueError(f"Unknown node {node!r}; expected one of {sorted(graph.nodes)}")
+    successors: Dict[str, Set[str]] = {}
+    for start, end in graph.edges:
+        successors.setdefault(start, set()).add(end)
+    for starts, end in graph.waiting_edges:
+        for start in starts:
+            successors.setdefault(start, set()).add(end)
+    for start, branches in graph.branches.items():
+        for branch in branches.values():
+            successors.setdefault(start, set()).update((branch.ends or {}).values())
+
+    seen: Set[str] = set()
+    stack = [node]
+    while stack:
+        current = stack.pop()
+        if current in seen or current == END:
+            continue
+        seen.add(current)
+        stack.extend(successors.get(current, ()))
+    return seen
 
 
 def build_graph() -> StateGraph:
@@ -31,42 +99,61 @@ def build_graph() -> StateGraph:
     graph = StateGraph(State)
     graph.add_node("company_loader", _instrument("company_loader", company_profile))
     graph.add_node("reference_loader", _instrument("reference_loader", reference_loader))
+    graph.add_node("search_planner", _instrument("search_planner", plan_insight_searches))
     graph.add_node("law_analysis", _instrument("law_analysis", law_analyzer))
     graph.add_node("market_analysis", _instrument("market_analysis", market_analyzer))
     graph.add_node("competition_analysis", _instrument("competition_analysis", competition_analyzer))
     graph.add_node("barrier_normalizer", _instrument("barrier_normalizer", barrier_extractor))
     graph.add_node("insight_aggregator", _instrument("insight_aggregator", insight_integrator))
 
-    graph.set_entry_point("company_loader")
-    graph.add_edge("company_loader", "reference_loader")
-    graph.add_edge("reference_loader", "law_analysis")
-    graph.add_edge("law_analysis", "market_analysis")
-    graph.add_edge("market_analysis", "competition_analysis")
-    graph.add_edge("competition_analysis", "barrier_normalizer")
-    graph.add_edge("barrier_normalizer", "insight_aggregator")
-    graph.set_finish_point("insight_aggregator")
+    # The three collectors only read countries/segment and the planned searches, so they run
+    # alongside the loaders and join before barrier_normalizer; their ``interim`` slices
+    # merge via the reducer.
+    for node in ("company_loader", "reference_loader", "search_planner"):
+        graph.add_edge(START, node)
+    for node in ("law_analysis", "market_analysis", "competition_analysis"):
+        graph.add_edge("search_planner", node)
+    graph.add_edge(["law_analysis", "market_analysis", "competition_analysis"], "barrier_normalizer")
+    graph.add_edge(["barrier_normalizer", "company_loader", "reference_loader"], "insight_aggregator")
+    graph.add_edge("insight_aggregator", END)
     return graph
 
 
 def build_report_graph() -> StateGraph:
-    """Create the extended multi-agent graph for strategy reporting."""
+    """Create the extended multi-agent graph for strategy reporting.
+
+    Independent branches run concurrently, so a report's latency follows the slowest
+    branch rather than the sum of every node.
+    """
     graph = StateGraph(ReportState)
-    graph.add_node("company_loader", _instrument("company_loader", company_profile))
-    graph.add_node("reference_loader", _instrument("reference_loader", reference_loader))
-    graph.add_node("market_assessment", _instrument("market_assessment", country_market_research))
-    graph.add_node("competition_assessment", _instrument("competition_assessment", competition_analyzer))
-    graph.add_node("strategy_planner", _instrument("strategy_planner", entry_strategy))
-    graph.add_node("partner_mapper", _instrument("partner_mapper", partner_sourcing))
-    graph.add_node("decision_router", _instrument("decision_router", decision_flow_controller))
-    graph.add_node("report_builder", _instrument("report_builder", report_writer))
-
-    graph.set_entry_point("company_loader")
-    graph.add_edge("company_loader", "reference_loader")
-    graph.add_edge("reference_loader", "market_assessment")
-    graph.add_edge("market_assessment", "competition_assessment")
-    graph.add_edge("competition_assessment", "strategy_planner")
-    graph.add_edge("strategy_planner", "partner_mapper")
-    graph.add_edge("partner_mapper", "decision_router")
-    graph.add_edge("decision_router", "report_builder")
-    graph.set_finish_point("report_builder")
+    graph.add_node("company_loader", _report_node("company_loader", company_profile))
+    graph.add_node("reference_loader", _report_node("reference_loader", reference_loader))
+    graph.add_node("search_planner", _report_node("search_planner", plan_report_searches))
+    graph.add_node("market_assessment", _report_node("market_assessment", country_market_research))
+    graph.add_node("competition_assessment", _report_node("competition_assessment", competition_analyzer))
+    graph.add_node("strategy_planner", _report_node("strategy_planner", entry_strategy))
+    graph.add_node("partner_mapper", _report_node("partner_mapper", partner_sourcing))
+    graph.add_node("decision_router", _report_node("decision_router", decision_flow_controller))
+    graph.add_node("evidence_retry", _report_node("evidence_retry", evidence_retry))
+    graph.add_node("report_builder", _report_node("report_builder", report_writer))
+
+    # The loaders and the search planner only read the run inputs and fan out from START; the
+    # per-country collectors follow the planner so their searches run once, merged and
+    # deduplicated. strategy_planner joins all of them, which keeps report_builder on a
+    # single (conditional) incoming edge.
+    collectors = ("market_assessment", "competition_assessment", "partner_mapper")
+    for node in ("company_loader", "reference_loader", "search_planner"):
+        graph.add_edge(START, node)
+    for node in collectors:
+        graph.add_edge("search_planner", node)
+    graph.add_edge(["company_loader", "reference_loader", *collectors], "strategy_planner")
+    graph.add_edge("strategy_planner", "decision_router")
+    # Thin evidence loops back through a targeted re-collection until the retry budget is spent.
+    graph.add_conditional_edges(
+        "decision_router",
+        route_after_decision,
+        {"evidence_retry": "evidence_retry", "report_builder": "report_builder"},
+    )
+    graph.add_edge("evidence_retry", "strategy_planner")
+    graph.add_edge("report_builder", END)
     return graph
@@ -7,6 +7,8 @@ import time
 from functools import wraps
 from typing import Any, Callable, Dict, Iterable, Optional, TypeVar
 
+from tools.metrics import METRICS, node_scope
+
 _FuncT = TypeVar("_FuncT", bound=Callable[..., Any])
 
 LOGGER_NAME = "graph.nodes"
@@ -37,6 +39,11 @@ def _extract_return_keys(result: Any) -> list[str]:
     return []
 
 
+def _record_node(node_name: str, elapsed_ms: float, status: str) -> None:
+    METRICS.inc("node_runs_total", node=node_name, status=status)
+    METRICS.observe("node_seconds", elapsed_ms / 1000.0, node=node_name)
+
+
 def log_node_io(node_name: Optional[str] = None) -> Callable[[_FuncT], _FuncT]:
     """Decorator that logs node start/end timestamps, duration, and payload keys."""
 
@@ -51,12 +58,15 @@ def log_node_io(node_name: Optional[str] = None) -> Callable[[_FuncT], _FuncT]:
                 logger.info("--> %s start input_keys=%s", resolved_name, input_keys)
                 started = time.perf_counter()
                 try:
-                    result = await func(*args, **kwargs)  # type: ignore[misc]
+                    with node_scope(resolved_name):
+                        result = await func(*args, **kwargs)  # type: ignore[misc]
                 except Exception:
                     elapsed_ms = (time.perf_counter() - started) * 1000.0
+                    _record_node(resolved_name, elapsed_ms, "error")
                     logger.exception("<-- %s error elapsed_ms=%.1f", resolved_name, elapsed_ms)
                     raise
                 elapsed_ms = (time.perf_counter() - started) * 1000.0
+                _record_node(resolved_name, elapsed_ms, "ok")
                 return_keys = _extract_return_keys(result)
                 logger.info("<-- %s done elapsed_ms=%.1f return_keys=%s", resolved_name, elapsed_ms, return_keys)
                 return result
@@ -69,12 +79,15 @@ def log_node_io(node_name: Optional[str] = None) -> Callable[[_FuncT], _FuncT]:
             logger.info("--> %s start input_keys=%s", resolved_name, input_keys)
             started = time.perf_counter()
             try:
-                result = func(*args, **kwargs)
+                with node_scope(resolved_name):
+                    result = func(*args, **kwargs)
             except Exception:
                 elapsed_ms = (time.perf_counter() - started) * 1000.0
+                _record_node(resolved_name, elapsed_ms, "error")
                 logger.exception("<-- %s error elapsed_ms=%.1f", resolved_name, elapsed_ms)
                 raise
             elapsed_ms = (time.perf_counter() - started) * 1000.0
+            _record_node(resolved_name, elapsed_ms, "ok")
             return_keys = _extract_return_keys(result)
             logger.info("<-- %s done elapsed_ms=%.1f return_keys=%s", resolved_name, elapsed_ms, return_keys)
             return result
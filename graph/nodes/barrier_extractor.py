@@ -4,6 +4,14 @@ from __future__ import annotations
 import re
 from typing import Any, Dict, List, Tuple
 
+from tools.parsing import relevant_sentences
+
+# 전문(full_text)에서 분류기에 넘길 규제 관련 문장 키워드
+_BARRIER_TERMS = re.compile(
+    r"\b(foreign|ownership|investment|locali[sz]ation|data protection|tax|vat|withholding|permit|quota|wage|labou?r)\b",
+    re.IGNORECASE,
+)
+
 # ---- simple classifiers ------------------------------------------------------
 
 def _collect_texts(payload: Dict[str, Any]) -> List[Dict[str, str]]:
@@ -29,6 +37,9 @@ def _collect_texts(payload: Dict[str, Any]) -> List[Dict[str, str]]:
                 break
         if txt:
             out.append({"text": txt, "source_url": pg.get("url") or pg.get("source") or ""})
+        # 본문 전문을 받아 둔 경우(tools.page_fetcher): 규제 키워드가 있는 문장만
+        for sentence in relevant_sentences(pg.get("full_text") or "", _BARRIER_TERMS, limit=10):
+            out.append({"text": sentence, "source_url": pg.get("url") or pg.get("source") or ""})
 
     # 3) 기타 관례적 키
     for key in ("notes", "law_text", "raw"):
@@ -182,7 +193,5 @@ def barrier_extractor(state: Dict[str, Any]) -> Dict[str, Any]:
             "evidence": evidence,                            # ← 보고서에서 근거로 활용 가능
         }
 
-    # state 병합
-    interim = dict(state.get("interim", {}))
-    interim["barriers"] = normalized
-    return {"interim": interim}
+    # state 병합 (interim 리듀서가 기존 law/market/competition 결과와 합침)
+    return {"interim": {"barriers": normalized}}
@@ -2,33 +2,46 @@
 from __future__ import annotations
 
 from copy import deepcopy
-from typing import Any, Dict
+from typing import Any, Dict, List, Mapping
 
+from tools.concurrency import gather_countries
 from tools.parsing import extract_competitors
-from tools.web_search import search_pages
+from tools.search_planner import SearchIntent, planned_search
+
+COMPETITION_SEARCH_K = 6
+
+
+def competition_query(country: str, segment: str) -> str:
+    return f"{country} {segment} top companies market share"
+
+
+def search_intents(state: Mapping[str, Any], country: str) -> List[SearchIntent]:
+    query = competition_query(country, state.get("segment", ""))
+    return [SearchIntent("competition", country, query, COMPETITION_SEARCH_K)]
 
 
 async def competition_analyzer(state: Dict[str, Any]) -> Dict[str, Any]:
     """Identify major competitors and supporting evidence per country."""
     segment = state.get("segment", "")
-    results: Dict[str, Any] = {}
-    competition_entries: Dict[str, Any] = {}
 
-    for country in state.get("countries", []):
-        query = f"{country} {segment} top companies market share"
-        pages = await search_pages(query=query, k=6)
+    async def _analyze(country: str) -> Dict[str, Any]:
+        pages = await planned_search(state, country, competition_query(country, segment), COMPETITION_SEARCH_K)
         competitors, evidence = extract_competitors(pages)
-        payload = {
-            "players": deepcopy(competitors),
-            "competitors": competitors,
-            "evidence": evidence,
+        return {"competitors": competitors, "evidence": evidence}
+
+    results = await gather_countries(
+        state,
+        _analyze,
+        on_error=lambda _country, _exc: {"competitors": [], "evidence": []},
+    )
+
+    competition_entries: Dict[str, Any] = {}
+    for country, payload in results.items():
+        competition_entries[country] = {
+            "players": deepcopy(payload["competitors"]),
+            "competitors": payload["competitors"],
+            "evidence": payload["evidence"],
         }
-        competition_entries[country] = payload
-        results[country] = {"competitors": competitors, "evidence": evidence}
-
-    updates: Dict[str, Any] = {"competition": competition_entries}
-    if "interim" in state:
-        interim = dict(state.get("interim") or {})
-        interim["competition"] = results
-        updates["interim"] = interim
-    return updates
+
+    # ``interim`` is only declared by the insight pipeline state; the report graph drops it.
+    return {"competition": competition_entries, "interim": {"competition": results}}
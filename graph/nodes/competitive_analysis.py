@@ -1,26 +1,41 @@
 """Multi-agent competitive landscape collector."""
 from __future__ import annotations
 
-from typing import Any, Dict
+from typing import Any, Dict, List, Mapping
 
+from tools.concurrency import gather_countries
 from tools.parsing import extract_competitors
-from tools.web_search import search_pages
+from tools.search_planner import SearchIntent, planned_search
+
+COMPETITIVE_SEARCH_K = 6
+
+
+def competitive_query(country: str, segment: str) -> str:
+    return f"{country} {segment} leading companies market share strategy"
+
+
+def search_intents(state: Mapping[str, Any], country: str) -> List[SearchIntent]:
+    query = competitive_query(country, state.get("segment", ""))
+    return [SearchIntent("competitive_analysis", country, query, COMPETITIVE_SEARCH_K)]
 
 
 async def competitive_analysis(state: Dict[str, Any]) -> Dict[str, Any]:
     """Aggregate competitor profiles for the extended report."""
     segment = state.get("segment", "")
-    results: Dict[str, Any] = {}
 
-    for country in state.get("countries", []):
-        query = f"{country} {segment} leading companies market share strategy"
-        pages = await search_pages(query=query, k=6)
+    async def _analyze(country: str) -> Dict[str, Any]:
+        pages = await planned_search(state, country, competitive_query(country, segment), COMPETITIVE_SEARCH_K)
         players, evidence = extract_competitors(pages)
         structure = "concentrated" if len(players) <= 5 else "fragmented"
-        results[country] = {
+        return {
             "players": players,
             "structure": structure,
             "evidence": evidence,
         }
 
+    results = await gather_countries(
+        state,
+        _analyze,
+        on_error=lambda _country, _exc: {"players": [], "structure": "concentrated", "evidence": []},
+    )
     return {"competition": results}
@@ -1,65 +1,136 @@
 """Collect market overviews, regulatory snippets, and evidence per country."""
 from __future__ import annotations
 
-from typing import Any, Dict
+import asyncio
+import logging
+from typing import Any, Collection, Dict, List, Mapping, Optional
 
-from tools.fetchers import fetch_market_reports
+from tools.coalesce import coalesce
+from tools.concurrency import gather_countries
+from tools.fetchers import fetch_market_reports, market_search_k, planned_market_queries
 from tools.parsing import compute_gdp_proxy, extract_barrier_evidence, extract_market_numbers
-from tools.sources.worldbank import get_macro
+from tools.search_planner import SearchIntent
+from tools.sources.worldbank import get_macro, get_macro_bulk
+
+logger = logging.getLogger(__name__)
 
 LAW_PROMPT = "law_guideline.md"
 
 
+def research_max_results(min_evidence: Optional[int]) -> int:
+    return max(8, min_evidence or 0)
+
+
+def search_intents(state: Mapping[str, Any], country: str) -> List[SearchIntent]:
+    max_results = research_max_results((state.get("rules") or {}).get("min_evidence", 0))
+    queries = planned_market_queries(country, state.get("segment", ""), max_results=max_results)
+    return [SearchIntent("market", country, query, market_search_k(max_results)) for query in queries]
+
+
+# Concurrent reports (e.g. a batch) researching the same (country, segment) share one run;
+# ``prefetched`` planner pages (and which were ``reused``) are identical for the same key, so
+# they stay out of it.
+@coalesce(
+    lambda country, segment, *, min_evidence=0, widen=False, prefetched=None, reused=(): (country, segment, min_evidence, widen)
+)
+async def research_country(
+    country: str,
+    segment: str,
+    *,
+    min_evidence: int = 0,
+    widen: bool = False,
+    prefetched: Optional[Mapping[str, List[Dict[str, Any]]]] = None,
+    reused: Collection[str] = (),
+) -> Dict[str, Any]:
+    """Collect the market snapshot, barriers and evidence for a single country.
+
+    ``widen`` adds broader search queries and a larger result budget; the evidence
+    retry path uses it for countries that came back below ``min_evidence``.
+    """
+    max_results = research_max_results(min_evidence)
+    macro, reports = await asyncio.gather(
+        get_macro(country),
+        fetch_market_reports(
+            country,
+            segment,
+            prefer_official=True,
+            max_results=max_results * 2 if widen else max_results,
+            widen=widen,
+            prefetched=prefetched,
+            reused=reused,
+        ),
+    )
+    size, cagr, period, market_evidence = extract_market_numbers(reports)
+    barriers, barrier_evidence = extract_barrier_evidence(reports, prompt=LAW_PROMPT)
+
+    proxy = compute_gdp_proxy(macro, segment)
+    proxy_note = None
+    if size is None and proxy.get("market_size_usd") is not None:
+        size = proxy["market_size_usd"]
+        market_evidence.append(
+            {
+                "fact": f"GDP \ucd94\uc815 \ube44\uc728 \uae30\ubc18 \uc2dc\uc7a5\uaddc\ubaa0 \ud504\ub85d\uc2dc: {proxy['note']}",
+                "source_url": proxy.get("source", ""),
+            }
+        )
+        proxy_note = proxy.get("note")
+    if cagr is None and proxy.get("cagr_pct") is not None:
+        cagr = proxy["cagr_pct"]
+        market_evidence.append(
+            {
+                "fact": f"GDP \uae30\ubc18 \ucd94\uc815 \uc131\uc7a5\ub960 \uc801\uc6a9: {cagr}%",
+                "source_url": proxy.get("source", ""),
+            }
+        )
+
+    return {
+        "market_overview": {
+            "segment": segment,
+            "size_usd": size,
+            "cagr_pct": cagr,
+            "period": period,
+            "trend": [],
+            "macro": macro,
+            "proxy_note": proxy_note,
+        },
+        "barriers": barriers,
+        "evidence": market_evidence + barrier_evidence,
+    }
+
+
+def empty_research(segment: str) -> Dict[str, Any]:
+    barriers, _ = extract_barrier_evidence([], prompt=LAW_PROMPT)
+    return {
+        "market_overview": {
+            "segment": segment,
+            "size_usd": None,
+            "cagr_pct": None,
+            "period": None,
+            "trend": [],
+            "macro": {},
+            "proxy_note": None,
+        },
+        "barriers": barriers,
+        "evidence": [],
+    }
+
+
 async def country_market_research(state: Dict[str, Any]) -> Dict[str, Any]:
     """Populate the extended report state with market snapshots."""
-    countries = state.get("countries", [])
     segment = state.get("segment", "")
     min_evidence = state.get("rules", {}).get("min_evidence", 0)
-    market_payload: Dict[str, Any] = {}
 
-    for country in countries:
-        macro = await get_macro(country)
-        reports = await fetch_market_reports(
-            country,
-            segment,
-            prefer_official=True,
-            max_results=max(8, min_evidence or 0),
+    async def _research(country: str) -> Dict[str, Any]:
+        prefetched = (state.get("search_results") or {}).get(country)
+        reused = (state.get("search_reused") or {}).get(country, ())
+        return await research_country(
+            country, segment, min_evidence=min_evidence, prefetched=prefetched, reused=reused
         )
-        size, cagr, period, market_evidence = extract_market_numbers(reports)
-        barriers, barrier_evidence = extract_barrier_evidence(reports, prompt=LAW_PROMPT)
-
-        proxy = compute_gdp_proxy(macro, segment)
-        proxy_note = None
-        if size is None and proxy.get("market_size_usd") is not None:
-            size = proxy["market_size_usd"]
-            market_evidence.append(
-                {
-                    "fact": f"GDP \ucd94\uc815 \ube44\uc728 \uae30\ubc18 \uc2dc\uc7a5\uaddc\ubaa0 \ud504\ub85d\uc2dc: {proxy['note']}",
-                    "source_url": proxy.get("source", ""),
-                }
-            )
-            proxy_note = proxy.get("note")
-        if cagr is None and proxy.get("cagr_pct") is not None:
-            cagr = proxy["cagr_pct"]
-            market_evidence.append(
-                {
-                    "fact": f"GDP \uae30\ubc18 \ucd94\uc815 \uc131\uc7a5\ub960 \uc801\uc6a9: {cagr}%",
-                    "source_url": proxy.get("source", ""),
-                }
-            )
-
-        market_payload[country] = {
-            "market_overview": {
-                "segment": segment,
-                "size_usd": size,
-                "cagr_pct": cagr,
-                "period": period,
-                "trend": [],
-                "macro": macro,
-                "proxy_note": proxy_note,
-            },
-            "barriers": barriers,
-            "evidence": market_evidence + barrier_evidence,
-        }
 
+    # One batched World Bank round-trip for every country; per-country lookups then hit the cache.
+    try:
+        await get_macro_bulk(state.get("countries", []) or [])
+    except Exception as exc:  # the warm-up is an optimisation; each country retries on its own
+        logger.warning("World Bank warm-up failed: %r", exc)
+    market_payload = await gather_countries(state, _research, on_error=lambda _country, _exc: empty_research(segment))
     return {"market": market_payload}
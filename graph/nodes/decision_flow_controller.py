@@ -3,6 +3,8 @@ from __future__ import annotations
 
 from typing import Any, Dict, List
 
+from tools.config import retry_settings
+
 MODE_LABELS = {
     "direct_investment": "\uc9c1\uc811 \ud22c\uc790",
     "joint_venture": "\uc870\uc778\ud2b8 \ubca4\ucc98",
@@ -59,8 +61,18 @@ def decision_flow_controller(state: Dict[str, Any]) -> Dict[str, Any]:
             "rationale": rationale,
         }
 
-    payload: Dict[str, Any] = {"decision": decisions}
-    if shortages and not state.get("_retry_performed"):
+    budget = state.get("rules", {}).get("max_retries")
+    if budget is None:
+        budget = retry_settings()["max_attempts"]
+    can_retry = int(state.get("retry_attempts") or 0) < int(budget)
+
+    payload: Dict[str, Any] = {"decision": decisions, "trigger_retry": False, "retry_countries": []}
+    if shortages and can_retry:
         payload["retry_countries"] = shortages
         payload["trigger_retry"] = True
     return payload
+
+
+def route_after_decision(state: Dict[str, Any]) -> str:
+    """Send shortfall countries back for re-collection while the retry budget lasts."""
+    return "evidence_retry" if state.get("trigger_retry") else "report_builder"
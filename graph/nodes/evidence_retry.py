@@ -0,0 +1,80 @@
+"""Re-collect market evidence only for the countries that fell short of the threshold."""
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import Any, Dict, List
+
+from graph.nodes.country_market_research import research_country
+from tools.concurrency import gather_bounded, resolve_country_concurrency
+from tools.config import retry_settings
+from tools.metrics import METRICS
+
+logger = logging.getLogger(__name__)
+
+
+def _merge_evidence(*groups: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    merged: List[Dict[str, Any]] = []
+    seen: set[tuple] = set()
+    for group in groups:
+        for item in group or []:
+            key = (item.get("fact"), item.get("source_url"))
+            if key in seen:
+                continue
+            seen.add(key)
+            merged.append(item)
+    return merged
+
+
+def _merge_research(previous: Dict[str, Any], refreshed: Dict[str, Any]) -> Dict[str, Any]:
+    """Combine a retry result with the earlier snapshot without losing evidence already found."""
+    if not previous:
+        return refreshed
+    overview = dict(previous.get("market_overview") or {})
+    for key, value in (refreshed.get("market_overview") or {}).items():
+        if value not in (None, [], {}) or key not in overview:
+            overview[key] = value
+
+    barriers = dict(previous.get("barriers") or {})
+    for key, value in (refreshed.get("barriers") or {}).items():
+        if value:
+            barriers[key] = value
+
+    return {
+        **previous,
+        "market_overview": overview,
+        "barriers": barriers,
+        "evidence": _merge_evidence(previous.get("evidence", []), refreshed.get("evidence", [])),
+    }
+
+
+async def evidence_retry(state: Dict[str, Any]) -> Dict[str, Any]:
+    """Widen the search for ``retry_countries`` after an exponential backoff.
+
+    Only the shortfall countries are re-fetched; their results are merged into the
+    existing ``market`` entries so the other countries' work is kept as-is.
+    """
+    countries = list(dict.fromkeys(state.get("retry_countries") or []))
+    attempts = int(state.get("retry_attempts") or 0)
+    segment = state.get("segment", "")
+    min_evidence = state.get("rules", {}).get("min_evidence", 0)
+
+    METRICS.inc("evidence_retries_total", len(countries))
+    delay = retry_settings()["backoff_seconds"] * (2**attempts)
+    if countries and delay > 0:
+        logger.info("evidence retry #%d for %s in %.1fs", attempts + 1, countries, delay)
+        await asyncio.sleep(delay)
+
+    async def _research(country: str) -> Dict[str, Any]:
+        return await research_country(country, segment, min_evidence=min_evidence, widen=True)
+
+    # Failed countries are dropped so their earlier snapshot stays untouched.
+    refreshed = await gather_bounded(countries, _research, limit=resolve_country_concurrency(state))
+
+    market = state.get("market", {})
+    updates = {country: _merge_research(market.get(country, {}), payload) for country, payload in refreshed.items()}
+    return {
+        "market": updates,
+        "retry_attempts": attempts + 1,
+        "trigger_retry": False,
+    }
@@ -1,26 +1,43 @@
 """Node responsible for collecting regulatory evidence."""
 from __future__ import annotations
 
-from typing import Any, Dict
+from typing import Any, Dict, List, Mapping
 
+from tools.concurrency import gather_countries
+from tools.page_fetcher import attach_full_text
 from tools.parsing import extract_barrier_evidence
-from tools.web_search import search_pages
+from tools.search_planner import SearchIntent, planned_search
 
 LAW_PROMPT_NAME = "law_guideline.md"
+LAW_SEARCH_K = 8
+
+
+def law_query(country: str, segment: str) -> str:
+    return f"{country} {segment} foreign investment restriction data localization tax labor permit"
+
+
+def search_intents(state: Mapping[str, Any], country: str) -> List[SearchIntent]:
+    return [SearchIntent("law", country, law_query(country, state.get("segment", "")), LAW_SEARCH_K)]
 
 
 async def law_analyzer(state: Dict[str, Any]) -> Dict[str, Any]:
     """Gather regulatory constraints for each country via web search stubs."""
-    countries = state.get("countries", [])
     segment = state.get("segment", "")
-    results: Dict[str, Any] = {}
 
-    for country in countries:
-        query = f"{country} {segment} foreign investment restriction data localization tax labor permit"
-        pages = await search_pages(query=query, k=8)
+    async def _analyze(country: str) -> Dict[str, Any]:
+        pages = await attach_full_text(await planned_search(state, country, law_query(country, segment), LAW_SEARCH_K))
         barriers, evidence = extract_barrier_evidence(pages, prompt=LAW_PROMPT_NAME)
-        results[country] = {"barriers": barriers, "evidence": evidence}
+        # Fetched page texts (full-text stage) feed barrier_normalizer's classifiers.
+        documents = [
+            {"url": page.get("url", ""), "full_text": page["full_text"]} for page in pages if page.get("full_text")
+        ]
+        return {"barriers": barriers, "evidence": evidence, "pages": documents}
+
+    def _fallback(country: str, exc: BaseException) -> Dict[str, Any]:
+        barriers, evidence = extract_barrier_evidence([], prompt=LAW_PROMPT_NAME)
+        return {"barriers": barriers, "evidence": evidence}
+
+    results = await gather_countries(state, _analyze, on_error=_fallback)
 
-    interim = dict(state.get("interim", {}))
-    interim["law"] = results
-    return {"interim": interim}
+    # Only this node's slice; the ``interim`` reducer merges it with sibling collectors.
+    return {"interim": {"law": results}}
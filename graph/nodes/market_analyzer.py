@@ -1,21 +1,61 @@
 """Node collating market size and growth figures."""
 from __future__ import annotations
 
-from typing import Any, Dict
+import asyncio
+import logging
+from typing import Any, Dict, List, Mapping
 
-from tools.fetchers import fetch_market_reports, fetch_worldbank_macro
+from tools.concurrency import gather_countries
+from tools.fetchers import (
+    fetch_market_reports,
+    fetch_worldbank_macro,
+    fetch_worldbank_macro_bulk,
+    market_search_k,
+    planned_market_queries,
+)
 from tools.parsing import compute_gdp_proxy, extract_market_numbers
+from tools.search_planner import SearchIntent
+
+logger = logging.getLogger(__name__)
+
+MARKET_MAX_RESULTS = 12
+
+
+def search_intents(state: Mapping[str, Any], country: str) -> List[SearchIntent]:
+    queries = planned_market_queries(country, state.get("segment", ""), max_results=MARKET_MAX_RESULTS)
+    return [SearchIntent("market", country, query, market_search_k(MARKET_MAX_RESULTS)) for query in queries]
+
+
+def _empty_result(segment: str) -> Dict[str, Any]:
+    return {
+        "market": {
+            "segment": segment,
+            "market_size_usd": None,
+            "cagr_pct": None,
+            "period": None,
+            "aux_indicators": {},
+            "proxy_note": None,
+        },
+        "evidence": [],
+    }
 
 
 async def market_analyzer(state: Dict[str, Any]) -> Dict[str, Any]:
     """Fetch macro indicators and market metrics for each country."""
-    countries = state.get("countries", [])
     segment = state.get("segment", "")
-    results: Dict[str, Any] = {}
 
-    for country in countries:
-        wb_indicators = await fetch_worldbank_macro(country)
-        reports = await fetch_market_reports(country, segment, prefer_official=True)
+    async def _analyze(country: str) -> Dict[str, Any]:
+        wb_indicators, reports = await asyncio.gather(
+            fetch_worldbank_macro(country),
+            fetch_market_reports(
+                country,
+                segment,
+                prefer_official=True,
+                max_results=MARKET_MAX_RESULTS,
+                prefetched=(state.get("search_results") or {}).get(country),
+                reused=(state.get("search_reused") or {}).get(country, ()),
+            ),
+        )
         size, cagr, period, evidence = extract_market_numbers(reports)
 
         proxy = compute_gdp_proxy(wb_indicators, segment)
@@ -40,7 +80,7 @@ async def market_analyzer(state: Dict[str, Any]) -> Dict[str, Any]:
                     }
                 )
 
-        results[country] = {
+        return {
             "market": {
                 "segment": segment,
                 "market_size_usd": size,
@@ -52,6 +92,11 @@ async def market_analyzer(state: Dict[str, Any]) -> Dict[str, Any]:
             "evidence": evidence,
         }
 
-    interim = dict(state.get("interim", {}))
-    interim["market"] = results
-    return {"interim": interim}
+    # One batched World Bank round-trip for every country; per-country lookups then hit the cache.
+    try:
+        await fetch_worldbank_macro_bulk(state.get("countries", []) or [])
+    except Exception as exc:  # the warm-up is an optimisation; each country retries on its own
+        logger.warning("World Bank warm-up failed: %r", exc)
+    results = await gather_countries(state, _analyze, on_error=lambda _country, _exc: _empty_result(segment))
+
+    return {"interim": {"market": results}}
@@ -1,32 +1,46 @@
 """Identify potential local partners and advisors."""
 from __future__ import annotations
 
-from typing import Any, Dict
+from typing import Any, Dict, List, Mapping
 
-from tools.web_search import search_pages
+from tools.concurrency import gather_countries
+from tools.search_planner import SearchIntent, planned_search
+
+PARTNER_SEARCH_K = 5
+
+
+def partner_query(country: str, segment: str) -> str:
+    return f"{country} {segment} logistics partners investor consulting"
+
+
+def search_intents(state: Mapping[str, Any], country: str) -> List[SearchIntent]:
+    return [SearchIntent("partners", country, partner_query(country, state.get("segment", "")), PARTNER_SEARCH_K)]
+
+
+def _empty_partners() -> Dict[str, Any]:
+    return {
+        "local_firms": [],
+        "investors": [],
+        "consultants": [],
+        "evidence": [],
+    }
 
 
 async def partner_sourcing(state: Dict[str, Any]) -> Dict[str, Any]:
     """Return placeholder partner suggestions for each country."""
     segment = state.get("segment", "")
-    partners: Dict[str, Any] = {}
 
-    for country in state.get("countries", []):
-        query = f"{country} {segment} logistics partners investor consulting"
-        pages = await search_pages(query=query, k=5)
-        evidence = []
+    async def _source(country: str) -> Dict[str, Any]:
+        pages = await planned_search(state, country, partner_query(country, segment), PARTNER_SEARCH_K)
+        payload = _empty_partners()
         for page in pages:
-            evidence.append(
+            payload["evidence"].append(
                 {
                     "fact": (page.get("snippet") or page.get("title") or "")[:200],
                     "source_url": page.get("url") or page.get("source") or "",
                 }
             )
-        partners[country] = {
-            "local_firms": [],
-            "investors": [],
-            "consultants": [],
-            "evidence": evidence,
-        }
+        return payload
 
+    partners = await gather_countries(state, _source, on_error=lambda _country, _exc: _empty_partners())
     return {"partners": partners}
@@ -1,13 +1,21 @@
 ﻿"""Synthesize the final multi-part strategy report."""
 from __future__ import annotations
 
+import asyncio
+import logging
+import os
 from datetime import datetime
 from pathlib import Path
 from typing import Any, Dict, Iterable, List
 
 import shutil
-from tools.export import to_html, to_pdf
-from tools.templating import markdown_to_html, render_md
+from tools.executors import PDF_BACKGROUND, run_export, submit_pdf
+from tools.export import render_report_html, to_pdf
+from tools.templating import arender_md, project_state
+
+OUTPUT_DIR = Path(os.getenv("REPORT_OUTPUT_DIR", Path(__file__).resolve().parents[2] / "data" / "outputs"))
+# Country lists longer than this are abbreviated in file names (file systems cap names at 255 bytes).
+MAX_NAME_COUNTRIES = 5
 
 SUMMARY_PROMPT = "prompts/summary.md"
 MARKET_PROMPTS = ["prompts/market_overview.md"]
@@ -34,22 +42,65 @@ SECTION_SPECS: list[tuple[str, list[str]]] = [
     ("market_guideline", ["prompts/market_guideline.md"]),
 ]
 
-
-def _render_sections(prompts: Iterable[str], state: Dict[str, Any]) -> str:
-    fragments: List[str] = []
-    for prompt in prompts:
-        content = render_md(prompt, state).strip()
-        if content:
-            fragments.append(content)
+# State keys sent to the LLM per section (REPORT_RENDER_MODE=llm). Every section also gets
+# BASE_STATE_KEYS; keep these in sync with the ``state.*`` references in each prompt.
+BASE_STATE_KEYS: tuple[str, ...] = ("countries", "segment", "language", "company")
+SECTION_STATE_KEYS: dict[str, tuple[str, ...]] = {
+    "summary": ("market", "competition", "barriers", "rules", "decision", "partners", "references"),
+    "market": ("market", "rules", "decision", "partners", "references"),
+    "barriers": ("market", "barriers", "rules", "partners"),
+    "competition": ("market", "competition", "rules", "decision", "partners", "references"),
+    "competition_guideline": (),
+    "competitive_landscape": ("market", "competition", "rules", "decision", "partners", "references"),
+    "entry": ("market", "barriers", "firm", "rules", "decision", "references"),
+    "entry_modes": (),
+    "entry_assessment": ("market", "barriers", "firm", "rules", "decision"),
+    "decision_flow": ("market", "barriers", "firm", "rules"),
+    "ksf": (),
+    "risk": ("market", "barriers", "firm", "rules", "decision", "references"),
+    "ai": ("market", "competition", "rules", "decision", "partners", "references"),
+    "next_steps": (),
+    "market_guideline": (),
+}
+# Company fields that only matter for scraping, not for writing sections.
+COMPANY_PROMPT_EXCLUDES = {"raw_excerpt"}
+
+logger = logging.getLogger(__name__)
+
+
+def _section_state(name: str, state: Dict[str, Any]) -> Dict[str, Any]:
+    keys = BASE_STATE_KEYS + SECTION_STATE_KEYS.get(name, ())
+    projected = project_state(state, keys)
+    company = projected.get("company")
+    if isinstance(company, dict):
+        projected["company"] = {k: v for k, v in company.items() if k not in COMPANY_PROMPT_EXCLUDES}
+    return projected
+
+
+async def _render_sections(prompts: Iterable[str], state: Dict[str, Any], **llm_kwargs: Any) -> str:
+    rendered = await asyncio.gather(*(arender_md(prompt, state, **llm_kwargs) for prompt in prompts))
+    fragments: List[str] = [content.strip() for content in rendered if content.strip()]
     return "\n\n".join(fragments)
 
 
-def _render_prompt_block(prompts: List[str], state: Dict[str, Any]) -> str:
+async def _render_prompt_block(prompts: List[str], state: Dict[str, Any], **llm_kwargs: Any) -> str:
     if not prompts:
         return ""
     if len(prompts) == 1:
-        return render_md(prompts[0], state).strip()
-    return _render_sections(prompts, state)
+        return (await arender_md(prompts[0], state, **llm_kwargs)).strip()
+    return await _render_sections(prompts, state, **llm_kwargs)
+
+
+async def _render_section(name: str, prompts: List[str], state: Dict[str, Any]) -> tuple[str, int]:
+    """Render one section with its projected LLM state; return markdown and prompt tokens."""
+    token_log: List[int] = []
+    block = await _render_prompt_block(
+        prompts,
+        state,
+        llm_state=_section_state(name, state),
+        token_log=token_log,
+    )
+    return block, sum(token_log)
 
 
 def _collect_evidence(state: Dict[str, Any]) -> List[Dict[str, Any]]:
@@ -81,7 +132,7 @@ def _slug(value: str) -> str:
     return "_".join(filter(None, cleaned.split("_"))) or "report"
 
 
-def report_writer(state: Dict[str, Any]) -> Dict[str, Any]:
+async def report_writer(state: Dict[str, Any]) -> Dict[str, Any]:
     """Render markdown/HTML strategy report tailored to the provided company."""
     company = state.get("company", {}) or {}
     company_name = company.get("name", "Target Company")
@@ -107,10 +158,15 @@ def report_writer(state: Dict[str, Any]) -> Dict[str, Any]:
         company_outline_md_lines.append(f"- **Target Segments:** {targets}")
 
     company_outline_md = _cleanup_text("\n".join(company_outline_md_lines).strip())
+    # Sections are independent; render them concurrently (LLM calls are bounded by tools.llm).
+    rendered = await asyncio.gather(*(_render_section(name, prompts, state) for name, prompts in SECTION_SPECS))
     section_markdown: Dict[str, str] = {}
-    for name, prompts in SECTION_SPECS:
-        block = _render_prompt_block(prompts, state)
+    prompt_tokens: Dict[str, int] = {}
+    for (name, _), (block, tokens) in zip(SECTION_SPECS, rendered):
         section_markdown[name] = _cleanup_text(block)
+        prompt_tokens[name] = tokens
+    if any(prompt_tokens.values()):
+        logger.info("report_builder prompt_tokens total=%d per_section=%s", sum(prompt_tokens.values()), prompt_tokens)
 
     summary_md = section_markdown.get("summary", "")
     market_md = section_markdown.get("market", "")
@@ -128,31 +184,6 @@ def report_writer(state: Dict[str, Any]) -> Dict[str, Any]:
     next_steps_md = section_markdown.get("next_steps", "")
     market_guideline_md = section_markdown.get("market_guideline", "")
 
-    summary_html = markdown_to_html(summary_md) if summary_md else ""
-    market_html = markdown_to_html(market_md) if market_md else ""
-    barriers_html = markdown_to_html(barriers_md) if barriers_md else ""
-    competition_guideline_html = (
-        markdown_to_html(competition_guideline_md) if competition_guideline_md else ""
-    )
-    competitive_landscape_html = (
-        markdown_to_html(competitive_landscape_md) if competitive_landscape_md else ""
-    )
-    ai_html = markdown_to_html(ai_md) if ai_md else ""
-    competition_html = markdown_to_html(competition_md) if competition_md else ""
-    entry_html = markdown_to_html(entry_md) if entry_md else ""
-    entry_modes_html = markdown_to_html(entry_modes_md) if entry_modes_md else ""
-    entry_assessment_html = (
-        markdown_to_html(entry_assessment_md) if entry_assessment_md else ""
-    )
-    decision_flow_html = markdown_to_html(decision_flow_md) if decision_flow_md else ""
-    ksf_html = markdown_to_html(ksf_md) if ksf_md else ""
-    risk_html = markdown_to_html(risk_md) if risk_md else ""
-    company_outline_html = markdown_to_html(company_outline_md) if company_outline_md else ""
-    next_steps_html = markdown_to_html(next_steps_md) if next_steps_md else ""
-    market_guideline_html = (
-        markdown_to_html(market_guideline_md) if market_guideline_md else ""
-    )
-
     markdown_sections = [f"# {company_name} Market Entry Strategy Report"]
     if company_outline_md:
         markdown_sections.append(company_outline_md)
@@ -166,25 +197,13 @@ def report_writer(state: Dict[str, Any]) -> Dict[str, Any]:
     segment = state.get("segment", "market")
     generated_at = datetime.now()
 
-    html_report = to_html(
+    # Markdown conversion and templating are CPU-bound: one hop to the export process pool.
+    section_html_sources = {"company_outline": company_outline_md, **section_markdown}
+    _, html_report = await run_export(
+        render_report_html,
         "report.html",
+        section_html_sources,
         {
-            "company_outline": company_outline_html,
-            "summary": summary_html,
-            "market": market_html,
-            "barriers": barriers_html,
-            "ai": ai_html,
-            "competition": competition_html,
-            "competition_guideline": competition_guideline_html,
-            "competitive_landscape": competitive_landscape_html,
-            "entry": entry_html,
-            "entry_modes": entry_modes_html,
-            "entry_assessment": entry_assessment_html,
-            "decision_flow": decision_flow_html,
-            "ksf": ksf_html,
-            "risk": risk_html,
-            "next_steps": next_steps_html,
-            "market_guideline": market_guideline_html,
             "company_name": company_name,
             "company_headline": company_headline,
             "company_url": company_url,
@@ -194,12 +213,18 @@ def report_writer(state: Dict[str, Any]) -> Dict[str, Any]:
         },
     )
 
-    out_dir = Path(__file__).resolve().parents[2] / "data" / "outputs"
+    out_dir = OUTPUT_DIR
     out_dir.mkdir(parents=True, exist_ok=True)
     stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    countries = "_".join(_slug(c) for c in state.get("countries", []))
+    country_slugs = [_slug(c) for c in state.get("countries", [])]
+    if len(country_slugs) > MAX_NAME_COUNTRIES:
+        country_slugs = country_slugs[:MAX_NAME_COUNTRIES] + [f"and_{len(country_slugs) - MAX_NAME_COUNTRIES}_more"]
+    countries = "_".join(country_slugs)
     segment = _slug(state.get("segment", "segment"))
     base_name = f"report_{countries}_{segment}_{stamp}"
+    if state.get("job_id"):
+        # Batch runs produce many reports per second; the job id keeps their files apart.
+        base_name = f"{base_name}_{_slug(str(state['job_id']))}"
 
     markdown_path = out_dir / f"{base_name}.md"
     markdown_path.write_text(markdown_report, encoding="utf-8")
@@ -216,43 +241,48 @@ def report_writer(state: Dict[str, Any]) -> Dict[str, Any]:
         except Exception:
             pass
 
+    pdf_out_path = str(out_dir / f"{base_name}.pdf")
     pdf_result = None
-    try:
-        pdf_result = to_pdf(
-            html_report,
-            out_path=out_dir / f"{base_name}.pdf",
-            base_url=out_dir,
-        )
-    except Exception:
-        pdf_result = None
+    pdf_background = state.get("pdf_background")
+    if pdf_background is None:
+        pdf_background = PDF_BACKGROUND
+    if not pdf_background:
+        try:
+            pdf_result = await run_export(to_pdf, html_report, out_path=pdf_out_path, base_url=str(out_dir))
+        except Exception:
+            pdf_result = None
 
     evidence = _collect_evidence(state)
 
-    return {
-        "report": {
-            "summary": summary_md,
-            "markdown": markdown_report,
-            "markdown_path": str(markdown_path),
-            "html": html_report,
-            "html_path": str(html_path),
-            "pdf_path": pdf_result,
-            "company_outline": company_outline_md,
-            "market": market_md,
-            "barriers": barriers_md,
-            "competition_guideline": competition_guideline_md,
-            "competitive_landscape": competitive_landscape_md,
-            "ai": ai_md,
-            "competition": competition_md,
-            "entry": entry_md,
-            "entry_modes": entry_modes_md,
-            "entry_assessment": entry_assessment_md,
-            "decision_flow": decision_flow_md,
-            "ksf": ksf_md,
-            "risk": risk_md,
-            "next_steps": next_steps_md,
-            "market_guideline": market_guideline_md,
-        },
-        "evidence": evidence,
+    report = {
+        "summary": summary_md,
+        "markdown": markdown_report,
+        "markdown_path": str(markdown_path),
+        "html": html_report,
+        "html_path": str(html_path),
+        "pdf_path": pdf_result,
+        "company_outline": company_outline_md,
+        "market": market_md,
+        "barriers": barriers_md,
+        "competition_guideline": competition_guideline_md,
+        "competitive_landscape": competitive_landscape_md,
+        "ai": ai_md,
+        "competition": competition_md,
+        "entry": entry_md,
+        "entry_modes": entry_modes_md,
+        "entry_assessment": entry_assessment_md,
+        "decision_flow": decision_flow_md,
+        "ksf": ksf_md,
+        "risk": risk_md,
+        "next_steps": next_steps_md,
+        "market_guideline": market_guideline_md,
+        "prompt_tokens": prompt_tokens,
     }
+    if pdf_background:
+        # Fire-and-forget: pdf_path is filled in when the export finishes (see tools.executors.wait_for_pdf).
+        report["pdf_pending_path"] = pdf_out_path
+        submit_pdf(html_report, pdf_out_path, str(out_dir), target=report)
+
+    return {"report": report, "evidence": evidence}
 
 
@@ -0,0 +1,56 @@
+"""Plan every collector's web searches once, before the collectors fan out."""
+from __future__ import annotations
+
+import asyncio
+from typing import Any, Callable, Dict, List, Mapping, Sequence
+
+from graph.nodes import (
+    competition_analyzer,
+    country_market_research,
+    law_analyzer,
+    market_analyzer,
+    partner_sourcing,
+)
+from tools.search_planner import SearchIntent, execute_plan, plan_searches, planner_settings
+
+IntentSource = Callable[[Mapping[str, Any], str], List[SearchIntent]]
+
+# Collectors whose searches are planned, per graph.
+INSIGHT_INTENTS: Sequence[IntentSource] = (
+    law_analyzer.search_intents,
+    market_analyzer.search_intents,
+    competition_analyzer.search_intents,
+)
+REPORT_INTENTS: Sequence[IntentSource] = (
+    country_market_research.search_intents,
+    competition_analyzer.search_intents,
+    partner_sourcing.search_intents,
+)
+
+
+def _intents(state: Mapping[str, Any], sources: Sequence[IntentSource]) -> List[SearchIntent]:
+    return [
+        intent
+        for country in state.get("countries", []) or []
+        for source in sources
+        for intent in source(state, country)
+    ]
+
+
+async def _plan(state: Dict[str, Any], sources: Sequence[IntentSource]) -> Dict[str, Any]:
+    # Market intents read the query-yield store (SQLite), so they are built off the loop.
+    intents = await asyncio.to_thread(_intents, state, sources)
+    settings = planner_settings()
+    plan = plan_searches(intents, threshold=settings["similarity"])
+    routed = await execute_plan(plan, limit=settings["concurrency"])
+    return {"search_results": routed, "search_reused": plan.reused_intents()}
+
+
+async def plan_insight_searches(state: Dict[str, Any]) -> Dict[str, Any]:
+    """Prefetch the law, market and competition searches of the insight graph."""
+    return await _plan(state, INSIGHT_INTENTS)
+
+
+async def plan_report_searches(state: Dict[str, Any]) -> Dict[str, Any]:
+    """Prefetch the market, competition and partner searches of the report graph."""
+    return await _plan(state, REPORT_INTENTS)
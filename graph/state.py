@@ -1,7 +1,14 @@
 """Typed Dict schemas describing the agent state containers."""
 from __future__ import annotations
 
-from typing import Any, Dict, List, Literal, Optional, TypedDict
+from typing import Annotated, Any, Dict, List, Literal, Mapping, Optional, TypedDict
+
+
+def merge_dicts(left: Optional[Mapping[str, Any]], right: Optional[Mapping[str, Any]]) -> Dict[str, Any]:
+    """Reducer merging per-key updates written by branches that run in parallel."""
+    merged: Dict[str, Any] = dict(left or {})
+    merged.update(right or {})
+    return merged
 
 
 EntryBarrier = TypedDict(
@@ -85,10 +92,13 @@ class State(TypedDict, total=False):
     countries: List[str]
     segment: str
     language: Literal["ko", "en"]
-    interim: Dict[str, Any]
+    interim: Annotated[Dict[str, Any], merge_dicts]
     insights: List[InsightLayer]
     company: CompanyProfile
     references: Dict[str, Any]
+    search_results: Dict[str, Any]
+    search_reused: Dict[str, List[str]]
+    max_country_concurrency: int
 
 
 class FirmProfile(TypedDict, total=False):
@@ -103,6 +113,7 @@ class RuleThresholds(TypedDict, total=False):
     min_evidence: int
     cagr_good: float
     barrier_high: List[str]
+    max_retries: int
 
 
 class ReportState(TypedDict, total=False):
@@ -114,11 +125,19 @@ class ReportState(TypedDict, total=False):
     firm: FirmProfile
     rules: RuleThresholds
     company: CompanyProfile
-    references: Dict[str, Any]
-    market: Dict[str, Any]
-    competition: Dict[str, Any]
+    references: Annotated[Dict[str, Any], merge_dicts]
+    search_results: Dict[str, Any]
+    search_reused: Dict[str, List[str]]
+    market: Annotated[Dict[str, Any], merge_dicts]
+    competition: Annotated[Dict[str, Any], merge_dicts]
     barriers: Dict[str, Any]
     strategies: Dict[str, Any]
-    partners: Dict[str, Any]
+    partners: Annotated[Dict[str, Any], merge_dicts]
     decision: Dict[str, Any]
     report: Dict[str, Any]
+    max_country_concurrency: int
+    retry_countries: List[str]
+    trigger_retry: bool
+    retry_attempts: int
+    job_id: str
+    pdf_background: bool
@@ -0,0 +1,259 @@
+"""Batch runner generating many strategy reports concurrently from a JSONL job list."""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+from uuid import uuid4
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+# Importing run_report also applies its LangGraph checkpoint compatibility patch.
+from scripts.run_report import _get_builder, build_report_state  # noqa: E402
+from tools.cache import set_cache_mode  # noqa: E402
+from tools.executors import prewarm_export_pool, shutdown_export_pool, wait_for_pdf  # noqa: E402
+from tools.http_client import http_clients  # noqa: E402
+from tools.metrics import EXPORTER_FORMATS, build_exporters, export_metrics  # noqa: E402
+from tools.tracing import trace_run  # noqa: E402
+
+DEFAULT_BATCH_CONCURRENCY = int(os.getenv("BATCH_CONCURRENCY", 4))
+OUTPUT_DIR = PROJECT_ROOT / "data" / "outputs"
+
+
+def load_jobs(path: str | Path) -> List[Dict[str, Any]]:
+    """Parse a JSONL job list; blank lines and ``#`` comments are skipped.
+
+    Each job needs ``countries``, ``segment`` and ``company_name`` (or ``company.name``);
+    ``job_id`` defaults to the line number.
+    """
+    jobs: List[Dict[str, Any]] = []
+    seen: set[str] = set()
+    for lineno, line in enumerate(Path(path).read_text(encoding="utf-8-sig").splitlines(), start=1):
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        try:
+            job = json.loads(line)
+        except json.JSONDecodeError as exc:
+            raise ValueError(f"line {lineno}: invalid JSON ({exc})") from exc
+        if not isinstance(job, dict):
+            raise ValueError(f"line {lineno}: expected a JSON object")
+
+        company = job.get("company") or {}
+        job.setdefault("company_name", company.get("name"))
+        job.setdefault("company_url", company.get("url"))
+        job.setdefault("company_notes", company.get("notes"))
+        if isinstance(job.get("countries"), str):
+            job["countries"] = [job["countries"]]
+        missing = [key for key in ("countries", "segment", "company_name") if not job.get(key)]
+        if missing:
+            raise ValueError(f"line {lineno}: missing {', '.join(missing)}")
+
+        job_id = str(job.get("job_id") or f"job-{lineno:04d}")
+        if job_id in seen:
+            raise ValueError(f"line {lineno}: duplicate job_id {job_id!r}")
+        seen.add(job_id)
+        job["job_id"] = job_id
+        jobs.append(job)
+    return jobs
+
+
+def _job_state(
+    job: Dict[str, Any],
+    max_country_concurrency: Optional[int],
+    pdf_background: bool = False,
+) -> Dict[str, Any]:
+    state = build_report_state(
+        countries=job["countries"],
+        segment=job["segment"],
+        company_name=job["company_name"],
+        company_url=job.get("company_url"),
+        company_notes=job.get("company_notes"),
+        lang=job.get("lang", "ko"),
+        firm=job.get("firm"),
+        rules=job.get("rules"),
+        max_country_concurrency=job.get("max_country_concurrency") or max_country_concurrency,
+        pdf_background=bool(job.get("pdf_background", pdf_background)),
+    )
+    state["job_id"] = job["job_id"]
+    return state
+
+
+def _now() -> str:
+    return datetime.now().isoformat(timespec="seconds")
+
+
+class BatchManifest:
+    """Per-job status file, rewritten atomically on every status change."""
+
+    def __init__(self, path: Path, batch_id: str, jobs: List[Dict[str, Any]]) -> None:
+        self.path = path
+        self.data: Dict[str, Any] = {
+            "batch_id": batch_id,
+            "created_at": _now(),
+            "jobs": {
+                job["job_id"]: {
+                    "job_id": job["job_id"],
+                    "status": "pending",
+                    "countries": job["countries"],
+                    "segment": job["segment"],
+                    "company_name": job["company_name"],
+                }
+                for job in jobs
+            },
+        }
+
+    def update(self, job_id: str, **fields: Any) -> None:
+        self.data["jobs"][job_id].update(fields)
+        self.write()
+
+    def counts(self) -> Dict[str, int]:
+        counts: Dict[str, int] = {}
+        for entry in self.data["jobs"].values():
+            counts[entry["status"]] = counts.get(entry["status"], 0) + 1
+        return counts
+
+    def write(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(self.path.suffix + ".tmp")
+        tmp_path.write_text(json.dumps(self.data, ensure_ascii=False, indent=2), encoding="utf-8")
+        tmp_path.replace(self.path)
+
+
+async def run_batch(
+    jobs: List[Dict[str, Any]],
+    *,
+    concurrency: int = DEFAULT_BATCH_CONCURRENCY,
+    manifest_path: Optional[Path] = None,
+    max_country_concurrency: Optional[int] = None,
+    pdf_background: bool = False,
+    graph: Any = None,
+    trace: Optional[bool] = None,
+) -> BatchManifest:
+    """Run every job through one compiled report graph, ``concurrency`` reports at a time.
+
+    All jobs share the pooled HTTP clients and the on-disk caches; overlapping
+    (country, segment) lookups from concurrent jobs are coalesced into one fetch.
+    """
+    batch_id = datetime.now().strftime("%Y%m%d_%H%M%S") + f"_{uuid4().hex[:6]}"
+    manifest = BatchManifest(manifest_path or OUTPUT_DIR / f"batch_{batch_id}.json", batch_id, jobs)
+    manifest.write()
+
+    compiled = graph if graph is not None else _get_builder()().compile()
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+
+    async def _run_job(job: Dict[str, Any]) -> None:
+        job_id = job["job_id"]
+        async with semaphore:
+            manifest.update(job_id, status="running", started_at=_now())
+            started = time.perf_counter()
+            run_id = f"report-{job_id}-{uuid4().hex[:8]}"
+            run_config = {"configurable": {"run_id": run_id}}
+            try:
+                state = _job_state(job, max_country_concurrency, pdf_background)
+                with trace_run(run_id, name=f"job {job_id}", enabled=trace, out_dir=manifest.path.parent):
+                    result = await compiled.ainvoke(state, config=run_config)
+            except Exception as exc:  # one failing job must not abort the batch
+                manifest.update(
+                    job_id,
+                    status="failed",
+                    finished_at=_now(),
+                    elapsed_s=round(time.perf_counter() - started, 3),
+                    error=repr(exc),
+                )
+                return
+
+        # Background PDFs finish in the export pool while the slot serves the next job.
+        report = result.get("report", {}) or {}
+        await wait_for_pdf(report)
+        manifest.update(
+            job_id,
+            status="succeeded",
+            finished_at=_now(),
+            elapsed_s=round(time.perf_counter() - started, 3),
+            run_id=run_id,
+            outputs={key: report.get(key) for key in ("markdown_path", "html_path", "pdf_path")},
+            prompt_tokens=report.get("prompt_tokens"),
+        )
+
+    if graph is None:
+        prewarm_export_pool()
+    try:
+        async with http_clients():
+            await asyncio.gather(*(_run_job(job) for job in jobs))
+    finally:
+        shutdown_export_pool()
+    return manifest
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Generate strategy reports for every job in a JSONL file")
+    parser.add_argument("--jobs", required=True, help="JSONL file, one report job per line")
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=DEFAULT_BATCH_CONCURRENCY,
+        help="Number of reports generated at the same time",
+    )
+    parser.add_argument("--manifest", help="Path of the per-job status manifest (default: data/outputs/batch_<id>.json)")
+    parser.add_argument(
+        "--max-country-concurrency",
+        type=int,
+        default=None,
+        help="Default per-node country concurrency for jobs that do not set their own",
+    )
+    parser.add_argument(
+        "--cache-mode",
+        choices=["off", "read", "write", "readwrite", "refresh"],
+        default=None,
+        help="Persistent cache behaviour for search results (default: CACHE_MODE env or readwrite)",
+    )
+    parser.add_argument(
+        "--pdf-background",
+        action="store_true",
+        help="Generate PDFs in the export pool without holding a job slot",
+    )
+    parser.add_argument(
+        "--metrics",
+        action="append",
+        choices=EXPORTER_FORMATS,
+        default=[],
+        help="Export metrics for the whole batch (repeatable); files go next to the manifest",
+    )
+    parser.add_argument(
+        "--trace",
+        action="store_true",
+        default=None,
+        help="Write one Chrome trace-event file per job (trace_<run_id>.json) next to the manifest",
+    )
+    args = parser.parse_args()
+
+    jobs = load_jobs(args.jobs)
+    set_cache_mode(args.cache_mode)
+    manifest = asyncio.run(
+        run_batch(
+            jobs,
+            concurrency=args.concurrency,
+            manifest_path=Path(args.manifest) if args.manifest else None,
+            max_country_concurrency=args.max_country_concurrency,
+            pdf_background=args.pdf_background,
+            trace=args.trace,
+        )
+    )
+    if args.metrics:
+        export_metrics(build_exporters(args.metrics, manifest.path.parent, f"batch_{manifest.data['batch_id']}"))
+    print(json.dumps({"manifest": str(manifest.path), **manifest.counts()}, ensure_ascii=False))
+    if manifest.counts().get("failed"):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""Offline pipeline benchmark: replay recorded provider responses through both graphs."""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import logging
+import sys
+from pathlib import Path
+from typing import List
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from benchmarks.harness import DEFAULT_SIZES, GRAPHS, ScenarioResult, compare, configure_offline  # noqa: E402
+
+
+def _print_table(results: List[ScenarioResult]) -> None:
+    for result in results:
+        print(
+            f"{result.graph:<8} countries={result.countries:<3} elapsed={result.elapsed_s:8.3f}s "
+            f"throughput={result.countries_per_s:7.3f}/s peak_rss={result.peak_rss_mb}MB "
+            f"requests={sum(result.http_requests.values())} llm_tokens={result.llm_tokens}",
+            file=sys.stderr,
+        )
+        slowest = sorted(result.node_seconds.items(), key=lambda item: item[1], reverse=True)
+        for node, seconds in slowest:
+            print(f"    {node:<24} {seconds:8.3f}s", file=sys.stderr)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the insight/report graphs against recorded fixtures")
+    parser.add_argument("--graphs", nargs="+", choices=GRAPHS, default=list(GRAPHS))
+    parser.add_argument("--sizes", nargs="+", type=int, default=list(DEFAULT_SIZES), help="Country counts to run")
+    parser.add_argument(
+        "--latency-scale",
+        type=float,
+        default=1.0,
+        help="Multiplier for the recorded provider latencies (0 measures CPU/orchestration only)",
+    )
+    parser.add_argument("--output", help="Write the results JSON to this path")
+    parser.add_argument("--baseline", help="Results JSON from an earlier run to compare against")
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.2,
+        help="Allowed elapsed-time regression over --baseline before exiting non-zero (0.2 = 20%%)",
+    )
+    parser.add_argument("--verbose", action="store_true", help="Keep per-node start/done logs")
+    args = parser.parse_args()
+
+    configure_offline()
+
+    from benchmarks.harness import run_suite
+    from graph.logging_utils import logger as node_logger
+    from tools.executors import prewarm_export_pool, shutdown_export_pool
+
+    if not args.verbose:
+        node_logger.setLevel(logging.WARNING)
+
+    prewarm_export_pool()
+    try:
+        results = asyncio.run(run_suite(args.graphs, args.sizes, latency_scale=args.latency_scale))
+    finally:
+        shutdown_export_pool()
+
+    _print_table(results)
+    payload = json.dumps([result.to_dict() for result in results], ensure_ascii=False, indent=2)
+    print(payload)
+    if args.output:
+        path = Path(args.output)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(payload, encoding="utf-8")
+
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text(encoding="utf-8"))
+        regressions = compare(results, baseline, args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -7,7 +7,7 @@ import json
 import sys
 from pathlib import Path
 from platform import system
-from typing import Any, Dict
+from typing import Any, Callable, Dict, List, Sequence, Tuple
 
 from dotenv import load_dotenv
 
@@ -18,6 +18,10 @@ from graph.nodes.market_analyzer import market_analyzer
 from graph.nodes.competition_analyzer import competition_analyzer
 from graph.nodes.barrier_extractor import barrier_extractor
 from graph.nodes.insight_integrator import insight_integrator
+from graph.nodes.search_planner import plan_insight_searches
+from graph.state import merge_dicts
+from tools.cache import set_cache_mode
+from tools.http_client import http_clients
 
 load_dotenv()
 if system().lower().startswith("win"):
@@ -29,14 +33,18 @@ if str(PROJECT_ROOT) not in sys.path:
 if hasattr(sys.stdout, "reconfigure"):
     sys.stdout.reconfigure(encoding="utf-8")
 
-INSIGHT_PIPELINE = [
-    ("company_loader", company_profile),
-    ("reference_loader", reference_loader),
-    ("law_analysis", law_analyzer),
-    ("market_analysis", market_analyzer),
-    ("competition_analysis", competition_analyzer),
-    ("barrier_normalizer", barrier_extractor),
-    ("insight_integrator", insight_integrator),
+# (node name, callable, names of the nodes whose outputs it reads)
+PipelineNode = Tuple[str, Callable[..., Any], Tuple[str, ...]]
+
+INSIGHT_PIPELINE: List[PipelineNode] = [
+    ("company_loader", company_profile, ()),
+    ("reference_loader", reference_loader, ()),
+    ("search_planner", plan_insight_searches, ()),
+    ("law_analysis", law_analyzer, ("search_planner",)),
+    ("market_analysis", market_analyzer, ("search_planner",)),
+    ("competition_analysis", competition_analyzer, ("search_planner",)),
+    ("barrier_normalizer", barrier_extractor, ("law_analysis", "market_analysis", "competition_analysis")),
+    ("insight_integrator", insight_integrator, ("company_loader", "reference_loader", "barrier_normalizer")),
 ]
 
 
@@ -55,15 +63,47 @@ def _compact_state(state: Dict[str, Any]) -> Dict[str, Any]:
 
 
 def _merge_state(state: Dict[str, Any], update: Dict[str, Any]) -> None:
+    """Fold a node's update into the state; dict values merge key-wise like the graph reducers.
+
+    Nested dicts are replaced rather than updated in place, so snapshots handed to nodes
+    running in the same level never observe each other's writes.
+    """
     if not update:
         return
     for key, value in update.items():
         if key in state and isinstance(state[key], dict) and isinstance(value, dict):
-            state[key].update(value)
+            state[key] = merge_dicts(state[key], value)
         else:
             state[key] = value
 
 
+def _execution_levels(pipeline: Sequence[PipelineNode]) -> List[List[PipelineNode]]:
+    """Group pipeline nodes into levels whose dependencies are all satisfied by earlier levels."""
+    names = {name for name, _func, _deps in pipeline}
+    for name, _func, deps in pipeline:
+        unknown = set(deps) - names
+        if unknown:
+            raise ValueError(f"{name} depends on unknown nodes: {sorted(unknown)}")
+
+    done: set[str] = set()
+    pending = list(pipeline)
+    levels: List[List[PipelineNode]] = []
+    while pending:
+        level = [node for node in pending if set(node[2]) <= done]
+        if not level:
+            raise ValueError(f"Dependency cycle among: {[name for name, _f, _d in pending]}")
+        levels.append(level)
+        done.update(name for name, _func, _deps in level)
+        pending = [node for node in pending if node not in level]
+    return levels
+
+
+async def _call_node(func: Callable[..., Any], state: Dict[str, Any]) -> Any:
+    if asyncio.iscoroutinefunction(func):
+        return await func(state)
+    return func(state)
+
+
 def _run_stepwise(state: Dict[str, Any], name: str, output: Dict[str, Any], step: bool) -> None:
     if step:
         print(f"### [on_chain_end] {name}")
@@ -80,21 +120,34 @@ def _parse_args() -> argparse.Namespace:
     parser.add_argument("--lang", default="ko")
     parser.add_argument("--step", action="store_true", help="Print step-by-step progress")
     parser.add_argument("--out", help="Save insights JSON to this path (optional)")
+    parser.add_argument(
+        "--max-country-concurrency",
+        type=int,
+        default=None,
+        help="Maximum number of countries processed concurrently inside each node",
+    )
+    parser.add_argument(
+        "--cache-mode",
+        choices=["off", "read", "write", "readwrite", "refresh"],
+        default=None,
+        help="Persistent cache behaviour for search results (default: CACHE_MODE env or readwrite)",
+    )
     return parser.parse_args()
 
 
 async def _run(state: Dict[str, Any], step: bool, out_path: str | None) -> None:
     working_state = dict(state)
-    for name, func in INSIGHT_PIPELINE:
-        if step:
-            print(f"### [on_chain_start] {name}")
-        if asyncio.iscoroutinefunction(func):
-            output = await func(working_state)
-        else:
-            output = func(working_state)
-        if isinstance(output, dict):
-            _merge_state(working_state, output)
-        _run_stepwise(working_state, name, output or {}, step)
+    async with http_clients():
+        for level in _execution_levels(INSIGHT_PIPELINE):
+            if step:
+                for name, _func, _deps in level:
+                    print(f"### [on_chain_start] {name}")
+            # Nodes in one level are independent: each gets a snapshot and runs concurrently.
+            outputs = await asyncio.gather(*(_call_node(func, dict(working_state)) for _name, func, _deps in level))
+            for (name, _func, _deps), output in zip(level, outputs):
+                if isinstance(output, dict):
+                    _merge_state(working_state, output)
+                _run_stepwise(working_state, name, output or {}, step)
 
     insights = working_state.get("insights", [])
     payload = json.dumps(insights, ensure_ascii=False, indent=2)
@@ -120,6 +173,9 @@ def main() -> None:
         "language": args.lang,
         "company": company,
     }
+    if args.max_country_concurrency:
+        state["max_country_concurrency"] = args.max_country_concurrency
+    set_cache_mode(args.cache_mode)
     asyncio.run(_run(state, args.step, args.out))
 
 
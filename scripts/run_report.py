@@ -7,7 +7,7 @@ import json
 import sys
 from collections import defaultdict
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, Dict, List, Optional
 from uuid import uuid4
 
 from dotenv import load_dotenv
@@ -79,11 +79,68 @@ def _parse_json(value: str) -> Dict[str, Any]:
     raise argparse.ArgumentTypeError("Expected a JSON object")
 
 
-async def _run(state: Dict[str, Any], step: bool) -> None:
+async def _run(
+    state: Dict[str, Any],
+    step: bool,
+    cache_mode: str | None = None,
+    resume: str | None = None,
+    from_node: str | None = None,
+    metrics_formats: List[str] | None = None,
+    trace: bool | None = None,
+) -> None:
+    from tools.cache import set_cache_mode
+    from tools.checkpoint import checkpoint_session
+    from tools.executors import drain_exports, prewarm_export_pool, shutdown_export_pool
+    from tools.http_client import http_clients
+    from tools.metrics import METRICS
+    from tools.tracing import trace_run
+
+    set_cache_mode(cache_mode)
+    METRICS.reset()
+
     build_report_graph = _get_builder()
-    graph = build_report_graph().compile()
-    run_config = {"configurable": {"run_id": f"report-{uuid4()}"}}
+    builder = build_report_graph()
+    force = _forced_nodes(builder, from_node)
+    graph = builder.compile()
+    run_id = resume or f"report-{uuid4()}"
+    run_config = {"configurable": {"run_id": run_id}}
+    print(f"run_id={run_id} (resume with --resume {run_id})", file=sys.stderr)
+
+    prewarm_export_pool()
+    try:
+        with trace_run(run_id, enabled=trace), checkpoint_session(run_id, resume=bool(resume), force=force):
+            async with http_clients():
+                await _invoke(graph, state, run_config, step)
+                await drain_exports()
+    finally:
+        shutdown_export_pool()
+        _report_metrics(run_id, metrics_formats or [])
+
+
+def _report_metrics(run_id: str, formats: List[str]) -> None:
+    """Write the run's metrics in each requested format and print a per-provider summary."""
+    from tools.metrics import build_exporters, export_metrics, summarize
+
+    out_dir = PROJECT_ROOT / "data" / "outputs"
+    snapshot = export_metrics(build_exporters(formats, out_dir, run_id))
+    for provider, totals in sorted(summarize(snapshot).items()):
+        print(
+            f"metrics provider={provider} requests={int(totals['requests'])} "
+            f"bytes={int(totals['bytes'])} seconds={totals['seconds']:.3f}",
+            file=sys.stderr,
+        )
 
+
+def _forced_nodes(builder: Any, from_node: str | None) -> set[str]:
+    """Nodes that must re-run when resuming ``--from-node``: the node and its descendants."""
+    if not from_node:
+        return set()
+    from graph.builder import downstream_nodes
+
+    return downstream_nodes(builder, from_node)
+
+
+async def _invoke(graph: Any, state: Dict[str, Any], run_config: Dict[str, Any], step: bool) -> None:
     if step:
         try:
             async for ev in graph.astream_events(state, config=run_config):
@@ -101,8 +158,54 @@ async def _run(state: Dict[str, Any], step: bool) -> None:
             print(json.dumps(_compact(result), ensure_ascii=False, indent=2))
             return
 
+    from tools.executors import wait_for_pdf
+
     result = await graph.ainvoke(state, config=run_config)
-    print(json.dumps(result.get("report", {}), ensure_ascii=False, indent=2))
+    report = result.get("report", {})
+    await wait_for_pdf(report)
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+
+
+def build_report_state(
+    *,
+    countries: List[str],
+    segment: str,
+    company_name: str,
+    company_url: Optional[str] = None,
+    company_notes: Optional[str] = None,
+    lang: str = "ko",
+    firm: Optional[Dict[str, Any]] = None,
+    rules: Optional[Dict[str, Any]] = None,
+    max_country_concurrency: Optional[int] = None,
+    pdf_background: bool = False,
+) -> Dict[str, Any]:
+    """Assemble the initial ReportState from CLI (or batch job) arguments."""
+    company: Dict[str, Any] = {"name": company_name}
+    if company_url:
+        company["url"] = company_url
+    if company_notes:
+        company["notes"] = company_notes
+
+    firm_state: Dict[str, Any] = dict(firm or {})
+    firm_state.setdefault("name", company_name)
+    if company_url and "url" not in firm_state:
+        firm_state["url"] = company_url
+    if company_notes and "notes" not in firm_state:
+        firm_state["notes"] = company_notes
+
+    state: Dict[str, Any] = {
+        "countries": list(countries),
+        "segment": segment,
+        "language": lang,
+        "firm": firm_state,
+        "rules": dict(rules or {}),
+        "company": company,
+    }
+    if max_country_concurrency:
+        state["max_country_concurrency"] = max_country_concurrency
+    if pdf_background:
+        state["pdf_background"] = True
+    return state
 
 
 def main() -> None:
@@ -116,30 +219,62 @@ def main() -> None:
     parser.add_argument("--firm", type=_parse_json, default=_parse_json("{}"))
     parser.add_argument("--rules", type=_parse_json, default=_parse_json("{}"))
     parser.add_argument("--step", action="store_true", help="Print step-by-step progress")
+    parser.add_argument(
+        "--max-country-concurrency",
+        type=int,
+        default=None,
+        help="Maximum number of countries processed concurrently inside each node",
+    )
+    parser.add_argument(
+        "--cache-mode",
+        choices=["off", "read", "write", "readwrite", "refresh"],
+        default=None,
+        help="Persistent cache behaviour for search results (default: CACHE_MODE env or readwrite)",
+    )
+    parser.add_argument(
+        "--pdf-background",
+        action="store_true",
+        help="Generate the PDF in the export pool without blocking report completion",
+    )
+    parser.add_argument(
+        "--resume",
+        metavar="RUN_ID",
+        help="Reuse node outputs checkpointed under RUN_ID when their inputs and code are unchanged",
+    )
+    parser.add_argument(
+        "--from-node",
+        help="With --resume, force this node and everything downstream to re-run (e.g. report_builder)",
+    )
+    parser.add_argument(
+        "--metrics",
+        action="append",
+        choices=["json", "prometheus", "otel"],
+        default=[],
+        help="Export run metrics (repeatable); files go to data/outputs/metrics_<run_id>.*",
+    )
+    parser.add_argument(
+        "--trace",
+        action="store_true",
+        default=None,
+        help="Write a Chrome trace-event file to data/outputs/trace_<run_id>.json (or set TRACE_ENABLED=1)",
+    )
     args = parser.parse_args()
-
-    company: Dict[str, Any] = {"name": args.company_name}
-    if args.company_url:
-        company["url"] = args.company_url
-    if args.company_notes:
-        company["notes"] = args.company_notes
-
-    firm: Dict[str, Any] = dict(args.firm)
-    firm.setdefault("name", args.company_name)
-    if args.company_url and "url" not in firm:
-        firm["url"] = args.company_url
-    if args.company_notes and "notes" not in firm:
-        firm["notes"] = args.company_notes
-
-    state: Dict[str, Any] = {
-        "countries": args.countries,
-        "segment": args.segment,
-        "language": args.lang,
-        "firm": firm,
-        "rules": args.rules,
-        "company": company,
-    }
-    asyncio.run(_run(state, args.step))
+    if args.from_node and not args.resume:
+        parser.error("--from-node requires --resume")
+
+    state = build_report_state(
+        countries=args.countries,
+        segment=args.segment,
+        company_name=args.company_name,
+        company_url=args.company_url,
+        company_notes=args.company_notes,
+        lang=args.lang,
+        firm=args.firm,
+        rules=args.rules,
+        max_country_concurrency=args.max_country_concurrency,
+        pdf_background=args.pdf_background,
+    )
+    asyncio.run(_run(state, args.step, args.cache_mode, args.resume, args.from_node, args.metrics, args.trace))
 
 
 if __name__ == "__main__":
@@ -25,3 +25,19 @@ def test_barrier_extractor_normalizes_keys() -> None:
     assert barriers["tax_regime"]["corp_tax_pct"] == 25
     assert barriers["labor_regulation"]["overtime_limit"] == 20
     assert barriers["other"] == ["custom clearance"]
+
+
+def test_barrier_extractor_classifies_fetched_full_text() -> None:
+    full_text = (
+        "Welcome to the official portal. "
+        "A local partner required rule applies to foreign investors in freight forwarding. "
+        "Companies pay VAT of 10% and must obtain a work permit for each foreign employee."
+    )
+    state = {"interim": {"law": {"Mongolia": {"pages": [{"url": "https://invest.mn/guide", "full_text": full_text}]}}}}
+
+    barriers = barrier_extractor(state)["interim"]["barriers"]["Mongolia"]
+    assert barriers["fdi_restriction"] == "medium"
+    assert barriers["tax_regime"]["vat"] == "exists"
+    assert barriers["labor_regulation"]["work_permit_quota"] == "exists"
+    assert all(item["source_url"] == "https://invest.mn/guide" for item in barriers["evidence"])
+    assert not any(item["fact"].startswith("Welcome") for item in barriers["evidence"])
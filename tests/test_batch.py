@@ -0,0 +1,57 @@
+import asyncio
+import json
+
+import pytest
+
+from scripts.run_batch import load_jobs, run_batch
+
+
+def test_load_jobs_validates_and_assigns_ids(tmp_path) -> None:
+    path = tmp_path / "jobs.jsonl"
+    path.write_text(
+        "\n".join(
+            [
+                json.dumps({"job_id": "a", "countries": ["MNG"], "segment": "logistics", "company_name": "Acme"}),
+                "# skipped",
+                json.dumps({"countries": "KOR", "segment": "logistics", "company": {"name": "Beta"}}),
+            ]
+        ),
+        encoding="utf-8",
+    )
+    jobs = load_jobs(path)
+    assert [job["job_id"] for job in jobs] == ["a", "job-0003"]
+    assert jobs[1]["countries"] == ["KOR"]
+    assert jobs[1]["company_name"] == "Beta"
+
+    path.write_text(json.dumps({"countries": ["MNG"], "segment": "logistics"}), encoding="utf-8")
+    with pytest.raises(ValueError, match="company_name"):
+        load_jobs(path)
+
+
+def test_run_batch_shares_one_graph_and_records_status(tmp_path) -> None:
+    in_flight = 0
+    peak = 0
+
+    class FakeGraph:
+        async def ainvoke(self, state, config=None):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.05)
+            in_flight -= 1
+            if state["job_id"] == "bad":
+                raise RuntimeError("boom")
+            return {"report": {"html_path": f"{state['job_id']}.html"}}
+
+    jobs = [
+        {"job_id": job_id, "countries": ["MNG"], "segment": "logistics", "company_name": "Acme"}
+        for job_id in ("a", "b", "bad", "c")
+    ]
+    manifest_path = tmp_path / "manifest.json"
+    manifest = asyncio.run(run_batch(jobs, concurrency=2, manifest_path=manifest_path, graph=FakeGraph()))
+
+    assert peak == 2
+    assert manifest.counts() == {"succeeded": 3, "failed": 1}
+    saved = json.loads(manifest_path.read_text(encoding="utf-8"))
+    assert saved["jobs"]["a"]["outputs"]["html_path"] == "a.html"
+    assert "boom" in saved["jobs"]["bad"]["error"]
@@ -0,0 +1,43 @@
+import asyncio
+
+import graph.nodes.report_writer as report_writer
+import tools.cache as cache
+import tools.http_client as http_client
+import tools.web_search as web_search
+from benchmarks.harness import compare, configure_offline, run_scenario
+from benchmarks.transports import install_fixture_transports, uninstall_fixture_transports
+
+
+def test_register_transport_replaces_the_network() -> None:
+    async def run() -> int:
+        install_fixture_transports(latency_scale=0)
+        try:
+            resp = await http_client.get_client("worldbank").get(
+                "https://api.worldbank.org/v2/country/MNG;KOR/indicator/SP.POP.TOTL"
+            )
+            return len(resp.json()[1])
+        finally:
+            uninstall_fixture_transports()
+            await http_client.shutdown_clients()
+
+    assert asyncio.run(run()) == 2
+    assert not http_client._TRANSPORTS
+
+
+def test_insight_graph_runs_offline_against_fixtures(tmp_path, monkeypatch) -> None:
+    for name in ("TAVILY_API_KEY", "OPENAI_API_KEY", "REPORT_RENDER_MODE", "REPORT_OUTPUT_DIR"):
+        monkeypatch.setenv(name, "")
+    monkeypatch.setattr(web_search, "TAVILY_API_KEY", None)
+    monkeypatch.setattr(report_writer, "OUTPUT_DIR", report_writer.OUTPUT_DIR)
+    monkeypatch.setattr(cache, "_cache_mode", cache.get_cache_mode())
+    configure_offline(tmp_path)
+
+    result = asyncio.run(run_scenario("insight", 2, latency_scale=0))
+
+    assert result.countries == 2
+    assert set(result.node_seconds) >= {"market_analysis", "competition_analysis", "insight_aggregator"}
+    assert result.http_requests["tavily"] > 0
+    assert result.http_requests["worldbank"] > 0
+    assert result.http_requests["openai"] == 1
+    assert compare([result], [{"graph": "insight", "countries": 2, "elapsed_s": result.elapsed_s / 2}], 0.2)
+    assert not compare([result], [{"graph": "insight", "countries": 2, "elapsed_s": result.elapsed_s}], 0.2)
@@ -0,0 +1,83 @@
+import asyncio
+import time
+
+from tools.cache import DiskCache, cached_call, make_key
+
+
+def test_disk_cache_ttl_and_lru_eviction(tmp_path) -> None:
+    cache = DiskCache("test", path=tmp_path / "test.sqlite3", max_entries=2)
+    cache.set("a", {"v": 1})
+    cache.set("b", {"v": 2})
+    assert cache.get("a") == {"v": 1}  # touch "a" so "b" becomes least recently used
+    time.sleep(0.01)
+    cache.set("c", {"v": 3})
+    assert cache.get("b") is None
+    assert cache.get("a") == {"v": 1}
+
+    cache.set("short", [1], ttl=0.01)
+    time.sleep(0.02)
+    assert cache.get("short") is None
+    stats = cache.stats()
+    assert stats["hits"] == 2
+    assert stats["misses"] == 2
+
+
+def test_cached_call_respects_modes(tmp_path) -> None:
+    cache = DiskCache("modes", path=tmp_path / "modes.sqlite3")
+    key = make_key("query", 5)
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        return [len(calls)]
+
+    async def run(mode: str):
+        return await cached_call(cache, key, fetch, mode=mode)
+
+    assert asyncio.run(run("read")) == [1]  # nothing cached, nothing stored
+    assert asyncio.run(run("readwrite")) == [2]
+    assert asyncio.run(run("readwrite")) == [2]  # served from cache
+    assert asyncio.run(run("write")) == [3]  # fetched but existing entry kept
+    assert asyncio.run(run("read")) == [2]
+    assert asyncio.run(run("refresh")) == [4]
+    assert asyncio.run(run("read")) == [4]
+    assert asyncio.run(run("off")) == [5]
+    assert len(calls) == 5
+
+
+def test_cached_call_keeps_empty_results_briefly(tmp_path) -> None:
+    cache = DiskCache("empty", path=tmp_path / "empty.sqlite3", default_ttl=7 * 24 * 3600)
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        return [] if len(calls) == 1 else ["hit"]
+
+    async def run(**kwargs):
+        return await cached_call(cache, "query", fetch, mode="readwrite", **kwargs)
+
+    assert asyncio.run(run(empty_ttl=0.01)) == []
+    assert asyncio.run(run()) == []  # briefly served from cache
+    time.sleep(0.02)
+    assert asyncio.run(run()) == ["hit"]  # the empty entry expired instead of lasting a week
+    assert asyncio.run(run()) == ["hit"]
+    assert len(calls) == 2
+
+    cache.clear()
+    calls.clear()
+    assert asyncio.run(run(empty_ttl=0)) == []  # 0 disables storing empty results
+    assert asyncio.run(run(empty_ttl=0)) == ["hit"]
+
+
+def test_write_mode_replaces_an_expired_entry(tmp_path) -> None:
+    cache = DiskCache("expired", path=tmp_path / "expired.sqlite3")
+    cache.set("query", ["stale"], ttl=0.01)
+    time.sleep(0.02)
+
+    async def fetch():
+        return ["fresh"]
+
+    assert asyncio.run(cached_call(cache, "query", fetch, mode="write")) == ["fresh"]
+    assert cache.get("query") == ["fresh"]
+    cache.set("query", ["ignored"], overwrite=False)  # a live entry is still kept
+    assert cache.get("query") == ["fresh"]
@@ -0,0 +1,63 @@
+import asyncio
+import importlib
+
+import tools.checkpoint as checkpoint
+from graph.builder import build_report_graph, downstream_nodes
+from graph.nodes.entry_strategy import entry_strategy
+from tools.checkpoint import CheckpointStore, checkpoint_session, checkpointed, code_version, local_dependencies
+
+
+def test_checkpointed_node_reuses_outputs_on_resume(tmp_path) -> None:
+    calls = []
+
+    def node(state):
+        calls.append(state["segment"])
+        return {"market": {"segment": state["segment"]}}
+
+    wrapped = checkpointed("market_assessment", node, inputs=("countries", "segment"))
+    store = CheckpointStore(tmp_path / "checkpoints.sqlite3")
+    state = {"countries": ["MNG"], "segment": "logistics", "language": "ko"}
+
+    async def run(resume: bool, force=(), **changes):
+        with checkpoint_session("run-1", resume=resume, force=force, store=store):
+            return await wrapped({**state, **changes})
+
+    assert asyncio.run(run(False)) == {"market": {"segment": "logistics"}}
+    assert asyncio.run(run(True, language="en")) == {"market": {"segment": "logistics"}}  # unread key
+    assert calls == ["logistics"]
+
+    asyncio.run(run(True, segment="retail"))  # input changed
+    asyncio.run(run(True, force={"market_assessment"}))  # forced re-run
+    assert calls == ["logistics", "retail", "logistics"]
+
+    assert asyncio.run(wrapped(state)) == {"market": {"segment": "logistics"}}  # no session: plain call
+    assert len(calls) == 4
+
+
+def test_downstream_nodes_follow_joins_and_branches() -> None:
+    graph = build_report_graph()
+    assert downstream_nodes(graph, "report_builder") == {"report_builder"}
+    assert downstream_nodes(graph, "market_assessment") == {
+        "market_assessment",
+        "strategy_planner",
+        "decision_router",
+        "evidence_retry",
+        "report_builder",
+    }
+
+
+def test_code_version_covers_transitively_imported_project_modules(monkeypatch, tmp_path) -> None:
+    assert checkpoint.PROJECT_ROOT / "tools" / "scoring.py" in local_dependencies(entry_strategy.__module__)
+
+    package = tmp_path / "ckpt_pkg"
+    package.mkdir()
+    (package / "__init__.py").write_text("")
+    (package / "scoring.py").write_text("WEIGHTS = {'market': 0.5}\n")
+    (package / "node.py").write_text("from .scoring import WEIGHTS\n\ndef strategy_planner(state):\n    return WEIGHTS\n")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    monkeypatch.setattr(checkpoint, "PROJECT_ROOT", tmp_path)
+    node = importlib.import_module("ckpt_pkg.node").strategy_planner
+
+    before = code_version(node)
+    (package / "scoring.py").write_text("WEIGHTS = {'market': 0.7}\n")
+    assert code_version(node) != before
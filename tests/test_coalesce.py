@@ -0,0 +1,39 @@
+import asyncio
+
+from tools.coalesce import coalesce
+
+
+def test_coalesce_shares_one_call_per_key() -> None:
+    calls = []
+
+    @coalesce(lambda key: key)
+    async def fetch(key: str) -> dict:
+        calls.append(key)
+        await asyncio.sleep(0.01)
+        return {"key": key, "items": []}
+
+    async def run():
+        return await asyncio.gather(fetch("a"), fetch("a"), fetch("b"), fetch("a"))
+
+    results = asyncio.run(run())
+    assert calls == ["a", "b"]
+    assert [item["key"] for item in results] == ["a", "a", "b", "a"]
+    # Followers get their own copy, so mutating one result does not leak into another.
+    results[0]["items"].append(1)
+    assert results[1]["items"] == []
+
+    asyncio.run(fetch("a"))
+    assert calls == ["a", "b", "a"]  # nothing is cached once the flight has landed
+
+
+def test_coalesce_propagates_errors_to_all_waiters() -> None:
+    @coalesce()
+    async def fail(key: str) -> None:
+        await asyncio.sleep(0.01)
+        raise ValueError(key)
+
+    async def run():
+        return await asyncio.gather(fail("x"), fail("x"), return_exceptions=True)
+
+    outcomes = asyncio.run(run())
+    assert all(isinstance(outcome, ValueError) for outcome in outcomes)
@@ -0,0 +1,31 @@
+import asyncio
+
+from tools.concurrency import gather_bounded, resolve_country_concurrency
+
+
+def test_gather_bounded_keeps_order_and_isolates_failures() -> None:
+    in_flight = 0
+    peak = 0
+
+    async def worker(country: str) -> str:
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01 if country != "A" else 0.03)
+        in_flight -= 1
+        if country == "C":
+            raise RuntimeError("boom")
+        return country.lower()
+
+    result = asyncio.run(
+        gather_bounded(["A", "B", "C", "D"], worker, limit=2, on_error=lambda c, _e: f"failed:{c}")
+    )
+    assert list(result) == ["A", "B", "C", "D"]
+    assert result["A"] == "a"
+    assert result["C"] == "failed:C"
+    assert peak == 2
+
+
+def test_resolve_country_concurrency_reads_state() -> None:
+    assert resolve_country_concurrency({"max_country_concurrency": 7}) == 7
+    assert resolve_country_concurrency({"max_country_concurrency": 0}) == 1
@@ -1,4 +1,7 @@
-from graph.nodes.decision_flow_controller import decision_flow_controller
+import asyncio
+
+from graph.nodes import evidence_retry as evidence_retry_module
+from graph.nodes.decision_flow_controller import decision_flow_controller, route_after_decision
 
 
 def test_decision_flow_selects_best_candidate() -> None:
@@ -51,3 +54,51 @@ def test_decision_flow_flags_low_evidence() -> None:
     result = decision_flow_controller(state)
     assert result.get("trigger_retry")
     assert "MNG" in result.get("retry_countries", [])
+
+
+def test_decision_flow_respects_retry_budget() -> None:
+    state = {
+        "countries": ["MNG"],
+        "rules": {"min_evidence": 3, "max_retries": 2},
+        "market": {"MNG": {"evidence": []}},
+        "strategies": {},
+        "retry_attempts": 2,
+    }
+
+    result = decision_flow_controller(state)
+    assert result["trigger_retry"] is False
+    assert route_after_decision({**state, **result}) == "report_builder"
+
+
+def test_evidence_retry_refetches_only_shortfall_countries(monkeypatch) -> None:
+    fetched = []
+
+    async def fake_research(country, segment, *, min_evidence=0, widen=False):
+        fetched.append((country, widen))
+        return {
+            "market_overview": {"segment": segment, "cagr_pct": None},
+            "barriers": {},
+            "evidence": [{"fact": "new", "source_url": "https://example.org/new"}],
+        }
+
+    monkeypatch.setattr(evidence_retry_module, "research_country", fake_research)
+    monkeypatch.setattr(evidence_retry_module, "retry_settings", lambda: {"backoff_seconds": 0, "max_attempts": 1})
+
+    state = {
+        "segment": "logistics",
+        "countries": ["MNG", "KOR"],
+        "retry_countries": ["MNG"],
+        "market": {
+            "MNG": {"market_overview": {"cagr_pct": 5.0}, "evidence": [{"fact": "old", "source_url": ""}]},
+            "KOR": {"market_overview": {"cagr_pct": 3.0}, "evidence": []},
+        },
+    }
+
+    result = asyncio.run(evidence_retry_module.evidence_retry(state))
+    assert fetched == [("MNG", True)]
+    assert set(result["market"]) == {"MNG"}
+    mng = result["market"]["MNG"]
+    assert mng["market_overview"]["cagr_pct"] == 5.0
+    assert [item["fact"] for item in mng["evidence"]] == ["old", "new"]
+    assert result["retry_attempts"] == 1
+    assert result["trigger_retry"] is False
@@ -0,0 +1,38 @@
+import asyncio
+
+from tools import executors, export
+
+
+def test_render_report_html_runs_in_process_pool(monkeypatch) -> None:
+    monkeypatch.setattr(executors, "EXPORT_WORKERS", 1)
+
+    async def run():
+        try:
+            return await executors.run_export(
+                export.render_report_html,
+                "report.html",
+                {"summary": "## Summary\n\n- point", "market": ""},
+                {"company_name": "Acme"},
+            )
+        finally:
+            executors.shutdown_export_pool()
+
+    sections, html = asyncio.run(run())
+    assert "<li>point</li>" in sections["summary"]
+    assert sections["market"] == ""
+    assert "Acme" in html
+
+
+def test_background_pdf_fills_pdf_path(monkeypatch) -> None:
+    monkeypatch.setattr(executors, "EXPORT_WORKERS", 0)  # thread fallback keeps the fake to_pdf in-process
+    monkeypatch.setattr(export, "to_pdf", lambda html, out_path=None, base_url=None: out_path)
+
+    async def run():
+        report = {"pdf_path": None, "pdf_pending_path": "out/report.pdf"}
+        executors.submit_pdf("<html></html>", "out/report.pdf", target=report)
+        assert report["pdf_path"] is None
+        return report, await executors.wait_for_pdf(report)
+
+    report, pdf_path = asyncio.run(run())
+    assert pdf_path == "out/report.pdf"
+    assert report == {"pdf_path": "out/report.pdf"}
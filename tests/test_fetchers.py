@@ -0,0 +1,200 @@
+import asyncio
+
+import httpx
+
+import tools.fetchers as fetchers
+import tools.query_stats as query_stats
+import tools.web_search as web_search
+from tools.cache import DiskCache
+from tools.query_stats import QueryYieldStore, plan_filters
+
+
+def _isolated_stats(monkeypatch, tmp_path) -> QueryYieldStore:
+    store = QueryYieldStore(tmp_path / "query_stats.sqlite3")
+    monkeypatch.setattr(query_stats, "QUERY_STATS", store)
+    return store
+
+
+def test_fetch_market_reports_dedupes_and_stops_early(monkeypatch, tmp_path) -> None:
+    _isolated_stats(monkeypatch, tmp_path)
+    calls = []
+
+    async def fake_search(query: str, k: int = 5):
+        calls.append(query)
+        await asyncio.sleep(0)
+        return [
+            {"url": "https://example.com/shared", "title": "shared"},
+            {"url": "https://example.com/" + query.replace(" ", "-"), "title": query},
+        ]
+
+    monkeypatch.setattr(fetchers, "search_pages_or_raise", fake_search)
+
+    results = asyncio.run(fetchers.fetch_market_reports("Mongolia", "logistics", max_results=4, wave_size=2))
+
+    urls = [page["url"] for page in results]
+    assert len(results) == 4
+    assert len(set(urls)) == 4
+    assert all("query" in page for page in results)
+    # Two waves of two queries are enough to collect four unique hits.
+    assert len(calls) <= 4
+
+
+def test_fetch_market_reports_uses_prefetched_pages_first(monkeypatch, tmp_path) -> None:
+    _isolated_stats(monkeypatch, tmp_path)
+    calls = []
+
+    async def fake_search(query: str, k: int = 5):
+        calls.append(query)
+        return [{"url": "https://example.com/" + query.replace(" ", "-"), "title": query}]
+
+    monkeypatch.setattr(fetchers, "search_pages_or_raise", fake_search)
+    (planned,) = fetchers.planned_market_queries("Mongolia", "logistics", max_results=4)
+
+    full = {planned: [{"url": f"https://example.com/{i}", "title": planned} for i in range(4)]}
+    results = asyncio.run(fetchers.fetch_market_reports("Mongolia", "logistics", max_results=4, prefetched=full))
+    assert len(results) == 4
+    assert calls == []
+
+    # A short prefetch continues with the remaining queries, never re-running the planned one.
+    short = {planned: full[planned][:1]}
+    results = asyncio.run(fetchers.fetch_market_reports("Mongolia", "logistics", max_results=4, prefetched=short))
+    assert len(results) == 4
+    assert calls and planned not in calls
+
+
+def test_filter_yields_order_skip_and_widen(monkeypatch, tmp_path) -> None:
+    store = _isolated_stats(monkeypatch, tmp_path)
+    settings = {"adaptive": True, "exploration": 0.0, "min_trials": 2, "min_filters": 2}
+    filters = ["site:.gov", "site:.go.kr", "site:oecd.org"]
+
+    for _ in range(2):
+        store.record("Mongolia", "logistics", "site:.go.kr", hits=0, numbers=0, latency=0.4)
+        store.record("Mongolia", "logistics", "site:oecd.org", hits=4, numbers=3, latency=0.3)
+    plan = plan_filters("Mongolia", "logistics", filters, settings=settings)
+    # oecd.org produced numbers, .gov is unexplored (optimistic), .go.kr never returned anything.
+    assert plan.filters == ["site:oecd.org", "site:.gov"]
+    assert plan.skipped == ["site:.go.kr"]
+    assert not plan.widen
+    assert plan_filters("Vietnam", "logistics", filters, settings=settings).filters == filters
+
+    store.record("Mongolia", "logistics", "site:.gov", hits=0, numbers=0)
+    store.record("Mongolia", "logistics", "site:.gov", hits=0, numbers=0)
+    assert plan_filters("Mongolia", "logistics", filters, settings=settings).widen
+    explored = plan_filters("Mongolia", "logistics", filters, settings={**settings, "exploration": 1.0})
+    assert explored.skipped == []
+    oecd = store.stats("mongolia", "LOGISTICS")["site:oecd.org"]
+    assert (oecd.runs, oecd.hits, oecd.numbers) == (2, 8, 6)
+    assert round(oecd.mean_latency, 3) == 0.3
+
+
+def test_fetch_market_reports_records_filter_yields(monkeypatch, tmp_path) -> None:
+    store = _isolated_stats(monkeypatch, tmp_path)
+
+    async def fake_search(query: str, k: int = 5):
+        if "site:worldbank.org" in query:
+            return [{"url": "https://worldbank.org/mng", "content": "market size $2.5 billion, 7.1% CAGR"}]
+        return []
+
+    monkeypatch.setattr(fetchers, "search_pages_or_raise", fake_search)
+    monkeypatch.setattr(fetchers, "provider_chain", lambda: ["stub"])
+    asyncio.run(fetchers.fetch_market_reports("Mongolia", "logistics", max_results=4, wave_size=20))
+
+    stats = store.stats("Mongolia", "logistics")
+    assert set(stats) == set(fetchers.OFFICIAL_FILTERS)
+    assert (stats["site:worldbank.org"].hits, stats["site:worldbank.org"].numbers) == (1, 1)
+    assert stats["site:.go.kr"].hits == 0 and stats["site:.go.kr"].latency_samples == 1
+    assert fetchers.adaptive_market_queries("Mongolia", "logistics")[0].endswith("site:worldbank.org")
+
+
+def test_failed_searches_are_not_recorded_as_empty_filters(monkeypatch, tmp_path) -> None:
+    store = _isolated_stats(monkeypatch, tmp_path)
+
+    async def fake_search(query: str, k: int = 5):
+        if "site:.gov" in query:
+            raise httpx.HTTPStatusError("429", request=httpx.Request("POST", "https://api.test"), response=httpx.Response(429))
+        if "site:oecd.org" in query:
+            return [{"url": "https://oecd.org/mng", "content": "logistics market $1.2 billion"}]
+        return []
+
+    monkeypatch.setattr(fetchers, "search_pages_or_raise", fake_search)
+    monkeypatch.setattr(fetchers, "provider_chain", lambda: ["stub"])
+    asyncio.run(fetchers.fetch_market_reports("Mongolia", "logistics", max_results=4, wave_size=20))
+
+    stats = store.stats("Mongolia", "logistics")
+    assert "site:.gov" not in stats
+    assert stats["site:oecd.org"].numbers == 1 and stats["site:.go.kr"].runs == 1
+
+
+def test_exhausted_filters_are_still_explored_in_later_windows(monkeypatch, tmp_path) -> None:
+    store = _isolated_stats(monkeypatch, tmp_path)
+    settings = {"adaptive": True, "exploration": 0.1, "min_trials": 3, "min_filters": 2, "reseed_seconds": 3600}
+    for filter_clause in fetchers.OFFICIAL_FILTERS:
+        for _ in range(3):
+            store.record("Mongolia", "logistics", filter_clause, hits=0, numbers=0)
+
+    plans = []
+    for window in range(20):
+        monkeypatch.setattr(query_stats, "_seed_window", lambda seconds, window=window: window)
+        plans.append(plan_filters("Mongolia", "logistics", fetchers.OFFICIAL_FILTERS, settings=settings))
+    assert all(plan.widen for plan in plans)
+    # Nothing new is recorded between windows, yet the draw changes and filters get retried.
+    assert any(plan.filters for plan in plans)
+    assert len({tuple(plan.filters) for plan in plans}) > 1
+    monkeypatch.setattr(query_stats, "_seed_window", lambda seconds: 7)
+    assert plan_filters("Mongolia", "logistics", fetchers.OFFICIAL_FILTERS, settings=settings) == plans[7]
+
+
+def test_widened_queries_run_before_the_default_set() -> None:
+    default = fetchers.build_market_queries("Mongolia", "logistics")
+    widened = fetchers.build_market_queries("Mongolia", "logistics", widen=True)
+    extra = len(fetchers.WIDENED_QUERY_TEMPLATES)
+    assert widened[:extra] == [t.format(country="Mongolia", segment="logistics") for t in fetchers.WIDENED_QUERY_TEMPLATES]
+    assert widened[extra:] == default
+
+
+def test_run_waves_returns_priority_order_and_logs_failures(monkeypatch, caplog) -> None:
+    queries = ["slow first", "broken second", "fast third"]
+
+    async def fake_search(query: str, k: int = 5):
+        if query == "broken second":
+            raise RuntimeError("provider exploded")
+        await asyncio.sleep(0.03 if query == "slow first" else 0)
+        return [{"url": f"https://example.com/{query.replace(' ', '-')}/{i}", "title": query} for i in range(2)]
+
+    monkeypatch.setattr(fetchers, "search_pages_or_raise", fake_search)
+    results = asyncio.run(fetchers._run_waves(queries, k=2, max_results=4, wave_size=3))
+
+    assert [page["query"] for page in results] == ["slow first", "slow first", "fast third", "fast third"]
+    assert "broken second" in caplog.text and "provider exploded" in caplog.text
+
+
+def test_cached_and_reused_answers_are_not_new_filter_trials(monkeypatch, tmp_path) -> None:
+    store = _isolated_stats(monkeypatch, tmp_path)
+    cache = DiskCache("search", path=tmp_path / "search.sqlite3")
+
+    class EmptyProvider:
+        name = "stub"
+        calls = 0
+
+        async def search(self, query: str, k: int):
+            EmptyProvider.calls += 1
+            return []
+
+    monkeypatch.setattr(web_search, "SEARCH_CACHE", cache)
+    monkeypatch.setattr(web_search, "provider_chain", lambda: [EmptyProvider()])
+    monkeypatch.setattr(fetchers, "provider_chain", lambda: ["stub"])
+
+    for _ in range(4):  # one real empty run, then three answered from the search cache
+        asyncio.run(fetchers.fetch_market_reports("Mongolia", "logistics", max_results=4, wave_size=20))
+    stats = store.stats("Mongolia", "logistics")
+    assert EmptyProvider.calls == len(fetchers.OFFICIAL_FILTERS) + 2
+    assert {name: (s.runs, s.latency_samples) for name, s in stats.items()} == {
+        name: (1, 1) for name in fetchers.OFFICIAL_FILTERS
+    }
+    assert not plan_filters("Mongolia", "logistics", fetchers.OFFICIAL_FILTERS).skipped
+
+    # Planner pages served from the cache are consumed but not recorded either.
+    (planned,) = fetchers.planned_market_queries("Mongolia", "logistics", max_results=4)
+    prefetched = {planned: [{"url": f"https://example.com/{i}"} for i in range(4)]}
+    asyncio.run(fetchers.fetch_market_reports("Mongolia", "logistics", max_results=4, prefetched=prefetched, reused=[planned]))
+    assert store.stats("Mongolia", "logistics")[fetchers._official_filter(planned)].runs == 1
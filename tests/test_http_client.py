@@ -0,0 +1,49 @@
+import asyncio
+
+import httpx
+
+from tools import http_client
+
+
+def _ok(request: httpx.Request) -> httpx.Response:
+    return httpx.Response(200)
+
+
+def test_clients_are_closed_when_their_loop_shuts_down() -> None:
+    http_client.register_transport("web", httpx.MockTransport(_ok))
+
+    async def run() -> httpx.AsyncClient:
+        client = http_client.get_client("web")
+        await client.get("https://example.test/")
+        return client  # no shutdown_clients(): asyncio.run's teardown must close it
+
+    try:
+        client = asyncio.run(run())
+        assert client.is_closed
+    finally:
+        http_client.register_transport("web", None)
+
+
+def test_dropped_clients_are_closed_on_their_own_loop() -> None:
+    http_client.register_transport("web", httpx.MockTransport(_ok))
+    idle = asyncio.new_event_loop()
+
+    async def get() -> httpx.AsyncClient:
+        return http_client.get_client("web")
+
+    async def take_over() -> tuple:
+        # A new loop takes over: the idle loop's pool is closed, not just forgotten.
+        fresh = http_client.get_client("web")
+        http_client.register_transport("web", httpx.MockTransport(_ok))
+        await asyncio.sleep(0)
+        return fresh, http_client.get_client("web")
+
+    try:
+        stale = idle.run_until_complete(get())
+        fresh, latest = asyncio.run(take_over())
+        assert stale.is_closed
+        assert fresh.is_closed  # dropped by register_transport on the running loop
+        assert latest is not fresh and latest.is_closed  # closed at the loop's shutdown
+    finally:
+        http_client.register_transport("web", None)
+        idle.close()
@@ -0,0 +1,135 @@
+import asyncio
+import json
+import time
+
+import httpx
+import openai
+import pytest
+
+from benchmarks.mock_server import _sse_chunks
+from benchmarks.transports import FixtureTransport, openai_handler
+from tools import llm
+from tools.cache import DiskCache
+from tools.http_client import register_transport, shutdown_clients
+from tools.resilience import reset_resilience_state
+
+
+class _TrackingTransport(FixtureTransport):
+    """Fixture transport that records peak concurrency and can delay per prompt."""
+
+    def __init__(self, handler, delays=None) -> None:
+        super().__init__(handler)
+        self.delays = delays or {}
+        self.in_flight = 0
+        self.peak = 0
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        self.requests += 1
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        try:
+            await request.aread()
+            prompt = json.loads(request.content)["messages"][-1]["content"]
+            await asyncio.sleep(self.delays.get(prompt, 0.02))
+            return self._handler(request)
+        finally:
+            self.in_flight -= 1
+
+
+def _echo_handler(request: httpx.Request) -> httpx.Response:
+    prompt = json.loads(request.content)["messages"][-1]["content"]
+    if prompt == "broken":
+        return httpx.Response(400, json={"error": {"message": "bad prompt", "type": "invalid_request_error"}})
+    response = openai_handler(request)
+    body = response.json()
+    body["choices"][0]["message"]["content"] = f"echo:{prompt}"
+    return httpx.Response(200, json=body)
+
+
+def _streaming_handler(request: httpx.Request) -> httpx.Response:
+    return httpx.Response(
+        200,
+        content=b"".join(_sse_chunks(openai_handler(request))),
+        headers={"content-type": "text/event-stream"},
+    )
+
+
+@pytest.fixture
+def openai_transport(monkeypatch, tmp_path):
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    monkeypatch.setattr(llm, "COMPLETION_CACHE", DiskCache("llm", path=tmp_path / "llm.sqlite3"))
+    monkeypatch.setattr(llm, "_async_client", None)
+    monkeypatch.setattr(llm, "_LIMITER", llm._Limiter())
+    reset_resilience_state()
+
+    def install(transport: httpx.AsyncBaseTransport) -> httpx.AsyncBaseTransport:
+        register_transport("openai", transport)
+        return transport
+
+    yield install
+    register_transport("openai", None)
+
+
+def test_token_bucket_waits_for_refill() -> None:
+    bucket = llm._TokenBucket(6_000)  # 100 tokens per second
+
+    async def run() -> float:
+        await bucket.acquire(6_000)
+        started = time.perf_counter()
+        await bucket.acquire(10)
+        return time.perf_counter() - started
+
+    assert asyncio.run(run()) >= 0.08
+
+
+def test_limiter_caps_concurrent_completions(monkeypatch, openai_transport) -> None:
+    monkeypatch.setattr(llm, "MAX_CONCURRENCY", 2)
+    transport = openai_transport(_TrackingTransport(_echo_handler))
+
+    async def run():
+        try:
+            return await llm.acomplete_many([f"section {index}" for index in range(6)])
+        finally:
+            await shutdown_clients()
+
+    assert asyncio.run(run()) == [f"echo:section {index}" for index in range(6)]
+    assert transport.peak == 2
+
+
+def test_streaming_assembles_deltas_and_replays_from_cache(openai_transport) -> None:
+    transport = openai_transport(_TrackingTransport(_streaming_handler))
+    deltas, replayed = [], []
+
+    async def run():
+        try:
+            first = await llm.acomplete_markdown("market section", stream=True, on_delta=deltas.append)
+            second = await llm.acomplete_markdown("market section", stream=True, on_delta=replayed.append)
+            return first, second
+        finally:
+            await shutdown_clients()
+
+    first, second = asyncio.run(run())
+    assert len(deltas) > 1
+    assert "".join(deltas) == first == second
+    assert replayed == [first]
+    assert transport.requests == 1
+
+
+def test_acomplete_many_keeps_input_order_and_surfaces_failures(openai_transport) -> None:
+    # Later prompts answer first, so completion order differs from input order.
+    delays = {"first": 0.06, "second": 0.03, "third": 0.0}
+    openai_transport(_TrackingTransport(_echo_handler, delays))
+
+    async def run(prompts, **kwargs):
+        try:
+            return await llm.acomplete_many(prompts, **kwargs)
+        finally:
+            await shutdown_clients()
+
+    assert asyncio.run(run(["first", "second", "third"])) == ["echo:first", "echo:second", "echo:third"]
+
+    results = asyncio.run(run(["second", "broken", "third"], return_exceptions=True))
+    assert results[0] == "echo:second" and results[2] == "echo:third"
+    assert isinstance(results[1], openai.BadRequestError)
+    with pytest.raises(openai.BadRequestError):
+        asyncio.run(run(["broken"]))
@@ -0,0 +1,43 @@
+import asyncio
+
+from tools import llm
+from tools.cache import DiskCache
+
+
+def _use_cache(monkeypatch, tmp_path, model: str) -> DiskCache:
+    cache = DiskCache("llm", path=tmp_path / "llm.sqlite3")
+    monkeypatch.setattr(llm, "COMPLETION_CACHE", cache)
+    monkeypatch.setattr(llm, "MODEL", model)
+    return cache
+
+
+def test_completion_cache_reuses_identical_prompts(monkeypatch, tmp_path) -> None:
+    cache = _use_cache(monkeypatch, tmp_path, "model-a")
+    calls = []
+
+    async def fake_uncached(prompt, system, *, stream, on_delta):
+        calls.append(prompt)
+        return f"answer:{prompt}"
+
+    monkeypatch.setattr(llm, "_acomplete_uncached", fake_uncached)
+
+    async def run():
+        first = await llm.acomplete_markdown("section A")
+        second = await llm.acomplete_markdown("section A")
+        third = await llm.acomplete_markdown("section B")
+        return first, second, third
+
+    assert asyncio.run(run()) == ("answer:section A", "answer:section A", "answer:section B")
+    assert calls == ["section A", "section B"]
+    stats = llm.completion_cache_stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 2
+
+    # A different model misses (the model is part of the key) without wiping the old entries.
+    monkeypatch.setattr(llm, "MODEL", "model-b")
+    asyncio.run(llm.acomplete_markdown("section A"))
+    assert calls == ["section A", "section B", "section A"]
+    assert cache.stats()["entries"] == 3
+    monkeypatch.setattr(llm, "MODEL", "model-a")
+    asyncio.run(llm.acomplete_markdown("section B"))
+    assert len(calls) == 3
@@ -0,0 +1,52 @@
+import asyncio
+
+import httpx
+
+from tools.metrics import InstrumentedTransport, MetricsRegistry, node_scope, summarize, to_prometheus
+
+
+def test_registry_labels_samples_with_current_node() -> None:
+    registry = MetricsRegistry()
+    registry.inc("cache_hits_total", cache="search")
+    with node_scope("market_researcher"):
+        registry.inc("cache_hits_total", cache="search")
+        registry.inc("cache_hits_total", 2, cache="search")
+        registry.observe("node_seconds", 0.5)
+        registry.observe("node_seconds", 0.1)
+
+    assert registry.value("cache_hits_total") == 4
+    assert registry.value("cache_hits_total", node="market_researcher") == 3
+    timing = registry.snapshot()["timings"][0]
+    assert timing["labels"] == {"node": "market_researcher"}
+    assert (timing["count"], timing["sum"], timing["min"], timing["max"]) == (2, 0.6, 0.1, 0.5)
+
+    text = to_prometheus(registry.snapshot())
+    assert "# TYPE cache_hits_total counter" in text
+    assert 'cache_hits_total{cache="search",node="market_researcher"} 3' in text
+    assert 'node_seconds_count{node="market_researcher"} 2' in text
+
+
+def test_instrumented_transport_counts_requests_and_bytes() -> None:
+    registry = MetricsRegistry()
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        status = 500 if request.url.path == "/fail" else 200
+        return httpx.Response(status, content=b"x" * 10)
+
+    async def run() -> None:
+        transport = InstrumentedTransport("tavily", httpx.MockTransport(handler), registry)
+        async with httpx.AsyncClient(transport=transport, base_url="https://api.test") as client:
+            with node_scope("competition_analyzer"):
+                await client.post("/search", content=b"abcd")
+                await client.get("/fail")
+
+    asyncio.run(run())
+
+    assert registry.value("http_requests_total", provider="tavily", node="competition_analyzer") == 2
+    assert registry.value("http_requests_total", status=500) == 1
+    assert registry.value("http_request_bytes_total") == 4
+    assert registry.value("http_response_bytes_total") == 20
+    summary = summarize(registry.snapshot())
+    assert summary["tavily"]["requests"] == 2
+    assert summary["tavily"]["bytes"] == 20
+    assert summary["tavily"]["seconds"] >= 0
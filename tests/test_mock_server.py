@@ -0,0 +1,52 @@
+import random
+
+import httpx
+import pytest
+
+from benchmarks.mock_server import LatencySpec, MockConfig, start_server
+
+
+def test_latency_spec_parses_and_samples() -> None:
+    rng = random.Random(1)
+    assert LatencySpec.parse("fixed:200").sample(rng) == 0.2
+    assert 0.1 <= LatencySpec.parse("uniform:100,300").sample(rng) <= 0.3
+    assert LatencySpec.parse("lognormal:200,0.5").scaled(0.5).params == (100.0, 0.5)
+    with pytest.raises(ValueError):
+        LatencySpec.parse("pareto:1")
+    with pytest.raises(ValueError):
+        LatencySpec.parse("uniform:100")
+
+
+def test_mock_server_serves_providers_and_rate_limits() -> None:
+    config = MockConfig.build(
+        latency={"*": "fixed:0"},
+        error_rate={"web": 1.0},
+        rate_limit={"tavily": 1},
+        burst={"tavily": 2},
+    )
+    server, thread = start_server(config)
+    env = server.env()
+    try:
+        with httpx.Client(timeout=5) as client:
+            statuses = [
+                client.post(env["TAVILY_ENDPOINT"], json={"query": "mongolia logistics", "max_results": 3})
+                for _ in range(3)
+            ]
+            bank = client.get(f"{env['WORLDBANK_BASE_URL']}/country/MNG/indicator/SP.POP.TOTL", params={"format": "json"})
+            chat = client.post(
+                f"{env['OPENAI_BASE_URL']}/chat/completions",
+                json={"model": "m", "messages": [{"role": "system", "content": "x"}, {"role": "user", "content": "hi"}]},
+            )
+            page = client.get(f"{server.base_url}/company")
+    finally:
+        server.shutdown()
+        server.server_close()
+        thread.join(timeout=5)
+
+    assert [resp.status_code for resp in statuses] == [200, 200, 429]
+    assert len(statuses[0].json()["results"]) == 3
+    assert int(statuses[2].headers["Retry-After"]) >= 1
+    assert bank.json()[1][0]["countryiso3code"] == "MNG"
+    assert chat.json()["choices"][0]["message"]["content"]
+    assert page.status_code == 500
+    assert config.stats["tavily"] == {"200": 2, "429": 1}
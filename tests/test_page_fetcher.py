@@ -0,0 +1,100 @@
+import asyncio
+
+import httpx
+
+import tools.page_fetcher as page_fetcher
+from tools.cache import DiskCache
+from tools.http_client import register_transport
+from tools.page_fetcher import DEFAULT_FULL_TEXT_SETTINGS, attach_full_text, extract_main_text
+from tools.parsing import extract_market_numbers
+from tools.resilience import reset_resilience_state
+
+ARTICLE = (
+    "<html><head><script>var x = 1;</script></head><body><nav>Home | About</nav>"
+    "<article><h1>Mongolia logistics</h1><p>{}</p></article><footer>Contact +976 7011 2233</footer></body></html>"
+)
+BODY = "The Mongolia logistics market was valued at USD 1.8 billion in 2023 and is set to grow at a 6.4% CAGR. " * 3
+
+
+def test_extract_main_text_keeps_the_article_and_drops_boilerplate() -> None:
+    text = extract_main_text(ARTICLE.format(BODY))
+    assert text.startswith("Mongolia logistics The Mongolia logistics market")
+    assert "var x" not in text and "Home | About" not in text and "Contact" not in text
+
+
+def test_attach_full_text_caps_bytes_limits_hosts_and_revalidates(monkeypatch, tmp_path) -> None:
+    monkeypatch.setattr(page_fetcher, "PAGE_CACHE", DiskCache("pages", path=tmp_path / "pages.sqlite3"))
+    monkeypatch.setattr(page_fetcher, "PAGE_FRESH_SECONDS", 0)
+    reset_resilience_state()
+    in_flight = {"stats.example": 0, "other.example": 0}
+    peak = {"stats.example": 0, "other.example": 0}
+    seen_headers = []
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        seen_headers.append(request.headers.get("if-none-match"))
+        if request.url.path == "/report.pdf":
+            return httpx.Response(200, content=b"%PDF", headers={"content-type": "application/pdf"})
+        if request.headers.get("if-none-match") == '"v1"':
+            return httpx.Response(304)
+        host = request.url.host
+        in_flight[host] += 1
+        peak[host] = max(peak[host], in_flight[host])
+        await asyncio.sleep(0.02)
+        in_flight[host] -= 1
+        html = ARTICLE.format(BODY) if request.url.path != "/huge" else "<p>" + "x" * 50_000 + "</p>"
+        return httpx.Response(200, text=html, headers={"content-type": "text/html; charset=utf-8", "etag": '"v1"'})
+
+    settings = {**DEFAULT_FULL_TEXT_SETTINGS, "enabled": True, "top_n": 4, "per_host": 1, "max_bytes": 4_096}
+    pages = [
+        {"url": "https://stats.example/a"},
+        {"url": "https://stats.example/huge"},
+        {"url": "https://stats.example/report.pdf"},
+        {"url": "https://other.example/b"},
+        {"url": "https://other.example/not-fetched"},
+    ]
+    register_transport("pages", httpx.MockTransport(handler))
+    try:
+        enriched = asyncio.run(attach_full_text(pages, settings=settings))
+        again = asyncio.run(attach_full_text(pages[:1], settings=settings))
+    finally:
+        register_transport("pages", None)
+
+    assert "6.4% CAGR" in enriched[0]["full_text"]
+    assert len(enriched[1]["full_text"]) < 4_096
+    assert "full_text" not in enriched[2] and "full_text" not in enriched[4]
+    assert peak == {"stats.example": 1, "other.example": 1}  # per_host=1
+    assert seen_headers[-1] == '"v1"' and again[0]["full_text"] == enriched[0]["full_text"]
+    assert "full_text" not in pages[0]
+
+
+def test_market_numbers_use_full_text_sentences_with_figures() -> None:
+    report = {
+        "url": "https://stats.example/a",
+        "content": "Mongolia logistics overview",
+        "full_text": "Call us on 976 7011 2233. " + BODY,
+    }
+    size, cagr, _period, evidence = extract_market_numbers([report])
+    assert size == 1_800_000_000
+    assert cagr == 6.4
+    assert evidence[1]["fact"].startswith("The Mongolia logistics market was valued")
+
+
+def test_full_text_ignores_years_and_shares_and_never_overrides_snippets() -> None:
+    share_page = {
+        "url": "https://news.example/b",
+        "content": "Mongolia logistics news",
+        "full_text": "In 2024 Mongolia's logistics market reached $450 million. "
+        "Market leader Tavan Bogd holds 38% of the market.",
+    }
+    size, cagr, _period, _evidence = extract_market_numbers([share_page])
+    assert size == 450_000_000
+    assert cagr is None
+
+    snippet_page = {
+        "url": "https://stats.example/a",
+        "content": "Mongolia logistics market worth $300 million, growing at a 5% CAGR",
+        "full_text": "The wider Asia logistics market is valued at USD 90 billion and grows 11% a year.",
+    }
+    size, cagr, _period, _evidence = extract_market_numbers([snippet_page, share_page])
+    assert size == 300_000_000
+    assert cagr == 5.0
@@ -7,3 +7,8 @@ def test_extract_numbers_parses_usd_and_cagr() -> None:
     assert result["usd"] == 1_500_000_000.0
     assert result["cagr_pct"] == 12.5
     assert result["period"] == "2023-2028"
+
+
+def test_extract_numbers_needs_a_word_boundary_after_the_multiplier() -> None:
+    result = extract_numbers("In 2024 Mongolia's logistics market reached $450 million.")
+    assert result["usd"] == 450_000_000.0
@@ -0,0 +1,104 @@
+import asyncio
+import time
+
+from graph import builder
+
+
+async def no_searches(state):
+    return {"search_results": {}}
+
+
+def test_report_graph_runs_independent_branches_concurrently(monkeypatch) -> None:
+    finished: list[str] = []
+
+    def slow(name: str, updates: dict):
+        async def node(state):
+            await asyncio.sleep(0.2)
+            finished.append(name)
+            return updates
+
+        return node
+
+    async def strategy(state):
+        # Joins must see every upstream branch merged into the state.
+        assert {"company_loader", "market_assessment", "competition_assessment"} <= set(finished)
+        assert state["market"] == {"MNG": {"evidence": []}}
+        finished.append("strategy_planner")
+        return {"strategies": {"MNG": {}}}
+
+    def decision(state):
+        finished.append("decision_router")
+        return {"decision": {"MNG": {"recommended": "partnership"}}}
+
+    async def report(state):
+        assert set(state["partners"]) == {"MNG"}
+        assert "logistics_glossary" in state["references"]
+        return {"report": {"decision": state["decision"]}}
+
+    monkeypatch.setattr(builder, "company_profile", slow("company_loader", {"company": {"name": "ACME"}}))
+    monkeypatch.setattr(builder, "reference_loader", slow("reference_loader", {"references": {"logistics_glossary": "-"}}))
+    monkeypatch.setattr(builder, "country_market_research", slow("market_assessment", {"market": {"MNG": {"evidence": []}}}))
+    monkeypatch.setattr(builder, "competition_analyzer", slow("competition_assessment", {"competition": {"MNG": {}}}))
+    monkeypatch.setattr(builder, "partner_sourcing", slow("partner_mapper", {"partners": {"MNG": {}}}))
+    monkeypatch.setattr(builder, "plan_report_searches", no_searches)
+    monkeypatch.setattr(builder, "entry_strategy", strategy)
+    monkeypatch.setattr(builder, "decision_flow_controller", decision)
+    monkeypatch.setattr(builder, "report_writer", report)
+
+    graph = builder.build_report_graph().compile()
+    started = time.perf_counter()
+    result = asyncio.run(graph.ainvoke({"countries": ["MNG"], "segment": "logistics"}))
+    elapsed = time.perf_counter() - started
+
+    assert result["report"]["decision"]["MNG"]["recommended"] == "partnership"
+    assert elapsed < 0.6  # five 0.2s branches overlap instead of running back to back
+
+
+def test_insight_graph_joins_collectors_before_barrier_normalizer(monkeypatch) -> None:
+    def collector(slice_name: str):
+        async def node(state):
+            await asyncio.sleep(0.2)
+            return {"interim": {slice_name: {"MNG": slice_name}}}
+
+        return node
+
+    async def barriers(state):
+        assert set(state["interim"]) == {"law", "market", "competition"}
+        return {"interim": {"barriers": {"MNG": {}}}}
+
+    def integrate(state):
+        return {"insights": sorted(state["interim"])}
+
+    async def load_company(state):
+        return {"company": {"name": "ACME"}}
+
+    async def load_references(state):
+        return {"references": {}}
+
+    monkeypatch.setattr(builder, "company_profile", load_company)
+    monkeypatch.setattr(builder, "reference_loader", load_references)
+    monkeypatch.setattr(builder, "plan_insight_searches", no_searches)
+    monkeypatch.setattr(builder, "law_analyzer", collector("law"))
+    monkeypatch.setattr(builder, "market_analyzer", collector("market"))
+    monkeypatch.setattr(builder, "competition_analyzer", collector("competition"))
+    monkeypatch.setattr(builder, "barrier_extractor", barriers)
+    monkeypatch.setattr(builder, "insight_integrator", integrate)
+
+    graph = builder.build_graph().compile()
+    started = time.perf_counter()
+    result = asyncio.run(graph.ainvoke({"countries": ["MNG"], "segment": "logistics"}))
+
+    assert result["insights"] == ["barriers", "competition", "law", "market"]
+    assert time.perf_counter() - started < 0.5
+
+
+def test_insight_runner_levels_follow_declared_dependencies() -> None:
+    from scripts.run_insights import INSIGHT_PIPELINE, _execution_levels
+
+    levels = [[name for name, _func, _deps in level] for level in _execution_levels(INSIGHT_PIPELINE)]
+    assert levels == [
+        ["company_loader", "reference_loader", "search_planner"],
+        ["law_analysis", "market_analysis", "competition_analysis"],
+        ["barrier_normalizer"],
+        ["insight_integrator"],
+    ]
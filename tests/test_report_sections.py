@@ -0,0 +1,28 @@
+import re
+from pathlib import Path
+
+from graph.nodes.report_writer import BASE_STATE_KEYS, SECTION_SPECS, SECTION_STATE_KEYS, _section_state
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+
+
+def test_section_state_keys_cover_prompt_references() -> None:
+    for name, prompts in SECTION_SPECS:
+        declared = set(BASE_STATE_KEYS) | set(SECTION_STATE_KEYS[name])
+        for prompt in prompts:
+            text = (PROJECT_ROOT / prompt).read_text(encoding="utf-8-sig")
+            referenced = set(re.findall(r"state\.([a-z_]+)", text))
+            assert referenced <= declared, f"{name}: {sorted(referenced - declared)} missing"
+
+
+def test_section_state_drops_unreferenced_keys() -> None:
+    state = {
+        "countries": ["MNG"],
+        "company": {"name": "Acme", "raw_excerpt": "<html>"},
+        "references": {"logistics_glossary": "long text"},
+        "strategies": {"MNG": {}},
+    }
+    projected = _section_state("ksf", state)
+    assert "references" not in projected
+    assert "strategies" not in projected
+    assert projected["company"] == {"name": "Acme"}
@@ -0,0 +1,171 @@
+import asyncio
+import time
+from dataclasses import replace
+from email.utils import formatdate
+
+import httpx
+import pytest
+
+from tools.metrics import METRICS
+from tools.resilience import (
+    CircuitOpenError,
+    ProviderPolicy,
+    ResilientTransport,
+    policy_for,
+    reset_resilience_state,
+    retry_after_seconds,
+)
+
+
+def _client(provider: str, handler, **policy) -> httpx.AsyncClient:
+    transport = ResilientTransport(provider, httpx.MockTransport(handler), ProviderPolicy(**policy))
+    return httpx.AsyncClient(transport=transport, base_url="https://api.test")
+
+
+def test_retries_retryable_statuses_honouring_retry_after() -> None:
+    reset_resilience_state()
+    METRICS.reset()
+    statuses = iter([429, 503, 200])
+    calls = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(time.perf_counter())
+        status = next(statuses)
+        return httpx.Response(status, headers={"Retry-After": "0"} if status == 429 else {})
+
+    async def run() -> int:
+        async with _client("retry-test", handler, max_retries=3, backoff_base=0.01) as client:
+            return (await client.post("/search", json={"query": "q"})).status_code
+
+    assert asyncio.run(run()) == 200
+    assert len(calls) == 3
+    assert METRICS.value("http_retries_total", provider="retry-test") == 2
+    assert METRICS.value("http_retries_total", reason="429") == 1
+
+
+def test_circuit_breaker_fails_fast_then_recovers() -> None:
+    reset_resilience_state()
+    METRICS.reset()
+    healthy = False
+    calls = 0
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        nonlocal calls
+        calls += 1
+        return httpx.Response(200 if healthy else 500)
+
+    async def run() -> None:
+        nonlocal healthy
+        async with _client("breaker-test", handler, max_retries=0, failure_threshold=2, reset_timeout=0.05) as client:
+            assert (await client.get("/")).status_code == 500
+            assert (await client.get("/")).status_code == 500
+            with pytest.raises(CircuitOpenError):
+                await client.get("/")
+            assert calls == 2
+            assert METRICS.gauge("circuit_breaker_state", provider="breaker-test") == 2
+
+            await asyncio.sleep(0.06)
+            healthy = True
+            assert (await client.get("/")).status_code == 200
+
+    asyncio.run(run())
+    assert METRICS.gauge("circuit_breaker_state", provider="breaker-test") == 0
+    assert METRICS.value("circuit_breaker_rejections_total", provider="breaker-test") == 1
+    assert METRICS.value("circuit_breaker_transitions_total", provider="breaker-test", state="half_open") == 1
+
+
+def test_half_open_trial_is_released_when_cancelled_or_failing_oddly() -> None:
+    reset_resilience_state()
+    mode = "down"
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        if mode == "slow":
+            await asyncio.sleep(10)
+        if mode == "protocol":
+            raise httpx.RemoteProtocolError("peer closed connection", request=request)
+        return httpx.Response(500 if mode == "down" else 200)
+
+    async def run() -> None:
+        nonlocal mode
+        async with _client("trial-test", handler, max_retries=0, failure_threshold=1, reset_timeout=0.02) as client:
+            assert (await client.get("/")).status_code == 500
+            await asyncio.sleep(0.03)
+            mode = "slow"
+            trial = asyncio.create_task(client.get("/"))
+            await asyncio.sleep(0.01)
+            trial.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await trial
+
+            mode = "protocol"
+            with pytest.raises(httpx.RemoteProtocolError):
+                await client.get("/")
+            with pytest.raises(CircuitOpenError):
+                await client.get("/")
+
+            await asyncio.sleep(0.03)
+            mode = "up"
+            assert (await client.get("/")).status_code == 200
+
+    asyncio.run(run())
+
+
+def test_half_open_trial_is_released_when_cancelled_waiting_for_the_limiter() -> None:
+    reset_resilience_state()
+    statuses = iter([500, 200])
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(next(statuses))
+
+    async def run() -> None:
+        async with _client(
+            "limited-trial-test", handler, max_retries=0, failure_threshold=1, reset_timeout=0.02, rate=5, burst=1
+        ) as client:
+            assert (await client.get("/")).status_code == 500
+            await asyncio.sleep(0.03)
+            # Half-open now, but the bucket is empty: the trial is claimed, then waits ~0.2s.
+            trial = asyncio.create_task(client.get("/"))
+            await asyncio.sleep(0.01)
+            trial.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await trial
+
+            assert (await client.get("/")).status_code == 200
+
+    asyncio.run(run())
+
+
+def test_page_fetches_never_open_a_breaker() -> None:
+    reset_resilience_state()
+    policy = policy_for("pages")
+    assert not policy.breaker and policy.max_retries == 1
+    policy = replace(policy, backoff_base=0.001)
+
+    async def run() -> list:
+        transport = ResilientTransport("pages", httpx.MockTransport(lambda request: httpx.Response(503)), policy)
+        async with httpx.AsyncClient(transport=transport) as client:
+            statuses = []
+            for index in range(policy.failure_threshold + 2):
+                statuses.append((await client.get(f"https://host{index}.test/")).status_code)
+            return statuses
+
+    assert asyncio.run(run()) == [503] * (policy.failure_threshold + 2)
+
+
+def test_rate_limiter_spaces_requests() -> None:
+    reset_resilience_state()
+
+    async def run() -> float:
+        async with _client("limit-test", lambda request: httpx.Response(200), rate=20, burst=1) as client:
+            started = time.perf_counter()
+            await asyncio.gather(*(client.get("/") for _ in range(4)))
+            return time.perf_counter() - started
+
+    assert asyncio.run(run()) >= 0.14
+
+
+def test_retry_after_parses_seconds_and_dates() -> None:
+    assert retry_after_seconds(httpx.Response(429, headers={"Retry-After": "3"})) == 3
+    future = formatdate(time.time() + 10, usegmt=True)
+    assert 8 <= retry_after_seconds(httpx.Response(429, headers={"Retry-After": future})) <= 10
+    assert retry_after_seconds(httpx.Response(429)) is None
@@ -0,0 +1,106 @@
+import asyncio
+
+import pytest
+
+import tools.query_stats as query_stats
+import tools.search_planner as search_planner
+from graph.nodes.competition_analyzer import competition_query
+from graph.nodes.competitive_analysis import competitive_query
+from graph.nodes.partner_sourcing import partner_query
+from graph.nodes.search_planner import INSIGHT_INTENTS, REPORT_INTENTS
+from tools.query_stats import QueryYieldStore
+from tools.search_planner import SearchIntent, execute_plan, plan_searches, planned_search, route_pages
+
+
+def test_plan_merges_overlapping_intents_per_country_and_filter() -> None:
+    intents = [
+        SearchIntent("competition", "Mongolia", competition_query("Mongolia", "logistics"), 6),
+        SearchIntent("competitive_analysis", "Mongolia", "mongolia  LOGISTICS market share top the companies", 8),
+        SearchIntent("partners", "Mongolia", partner_query("Mongolia", "logistics"), 5),
+        SearchIntent("strategy", "Mongolia", competitive_query("Mongolia", "logistics"), 6),
+        SearchIntent("competition", "Vietnam", competition_query("Vietnam", "logistics"), 6),
+        SearchIntent("market", "Mongolia", "Mongolia logistics market size CAGR site:.gov", 6),
+        SearchIntent("market", "Mongolia", "Mongolia logistics market size CAGR site:oecd.org", 6),
+        SearchIntent("market", "Mongolia", "Mongolia logistics market size CAGR", 6),
+    ]
+    plan = plan_searches(intents)
+
+    assert len(plan.queries) == 5
+    merged = plan.queries[0]
+    assert [intent.consumer for intent in merged.intents] == ["competition", "competitive_analysis", "strategy"]
+    assert merged.k == 8
+    # The seed's words are searched unchanged; no consumer's words leak into another's query.
+    assert merged.query == competition_query("Mongolia", "logistics")
+    # Site variants share one OR-ed search with room for each slice; unfiltered stays apart.
+    sites = plan.queries[3]
+    assert sites.query == "Mongolia logistics market size CAGR (site:.gov OR site:oecd.org)"
+    assert sites.k == 12
+    assert plan.queries[4].query == "Mongolia logistics market size CAGR"
+    assert len(plan_searches(intents, threshold=1.0).queries) == 6
+
+
+def test_route_pages_gives_each_site_its_own_slice() -> None:
+    gov = SearchIntent("market", "Mongolia", "Mongolia logistics market size CAGR site:.gov", 2)
+    oecd = SearchIntent("market", "Mongolia", "Mongolia logistics market size CAGR site:oecd.org", 2)
+    planned = plan_searches([gov, oecd]).queries[0]
+    pages = [
+        {"url": "https://stats.oecd.org/a"},
+        {"url": "https://example.com/b"},
+        {"url": "https://data.mof.gov/c"},
+        {"url": "https://oecd.org/d"},
+        {"url": "https://example.com/e"},
+    ]
+
+    routed = route_pages(planned, pages)
+    assert [page["url"] for page in routed[oecd.query]] == ["https://stats.oecd.org/a", "https://oecd.org/d"]
+    assert [page["url"] for page in routed[gov.query]] == ["https://data.mof.gov/c", "https://example.com/b"]
+
+
+@pytest.mark.parametrize("sources", [REPORT_INTENTS, INSIGHT_INTENTS])
+def test_real_collector_intents_share_searches(monkeypatch, tmp_path, sources) -> None:
+    monkeypatch.setattr(query_stats, "QUERY_STATS", QueryYieldStore(tmp_path / "query_stats.sqlite3"))
+    state = {"countries": ["Mongolia", "Vietnam"], "segment": "logistics", "rules": {"min_evidence": 0}}
+    intents = [intent for country in state["countries"] for source in sources for intent in source(state, country)]
+    calls = []
+
+    async def fake_search(query: str, k: int = 5):
+        calls.append(query)
+        return [{"url": f"https://example.com/{len(calls)}/{i}", "title": query} for i in range(k)]
+
+    monkeypatch.setattr(search_planner, "search_pages_or_raise", fake_search)
+    routed = asyncio.run(execute_plan(plan_searches(intents)))
+
+    assert len(calls) < len(intents)
+    for intent in intents:
+        assert len(routed[intent.country][intent.query]) == intent.k
+
+
+def test_execute_plan_routes_each_consumer_its_own_slice(monkeypatch) -> None:
+    calls = []
+
+    async def fake_search(query: str, k: int = 5):
+        calls.append((query, k))
+        return [{"url": f"https://example.com/{i}", "title": query} for i in range(k)]
+
+    monkeypatch.setattr(search_planner, "search_pages", fake_search)
+    monkeypatch.setattr(search_planner, "search_pages_or_raise", fake_search)
+    intents = [
+        SearchIntent("competition", "Mongolia", competition_query("Mongolia", "logistics"), 6),
+        SearchIntent("competitive_analysis", "Mongolia", competitive_query("Mongolia", "logistics"), 3),
+        SearchIntent("partners", "Mongolia", partner_query("Mongolia", "logistics"), 5),
+    ]
+
+    async def run():
+        routed = await execute_plan(plan_searches(intents), limit=2)
+        state = {"search_results": routed}
+        planned = await planned_search(state, "Mongolia", intents[1].query, 3)
+        live = await planned_search(state, "Mongolia", "unplanned query", 2)
+        return routed, planned, live
+
+    routed, planned, live = asyncio.run(run())
+    assert len(routed["Mongolia"][intents[0].query]) == 6
+    assert len(planned) == 3
+    assert len(live) == 2
+    assert planned == routed["Mongolia"][intents[0].query][:3]
+    # One merged search, the partner search and the unplanned fallback.
+    assert [k for _query, k in calls] == [6, 5, 2]
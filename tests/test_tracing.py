@@ -0,0 +1,44 @@
+import asyncio
+import json
+
+from tools.tracing import span, trace_run, traced
+
+
+@traced("leaf")
+async def _leaf(delay: float) -> float:
+    await asyncio.sleep(delay)
+    return delay
+
+
+@traced("node", cat="node")
+async def _node() -> list:
+    return await asyncio.gather(_leaf(0.01), _leaf(0.02))
+
+
+def test_trace_run_writes_nested_chrome_events(tmp_path) -> None:
+    async def run() -> None:
+        with trace_run("run-1", enabled=True, out_dir=tmp_path):
+            await _node()
+
+    asyncio.run(run())
+
+    data = json.loads((tmp_path / "trace_run-1.json").read_text(encoding="utf-8"))
+    events = {e["name"]: e for e in data["traceEvents"] if e["ph"] == "X"}
+    leaves = [e for e in data["traceEvents"] if e.get("name") == "leaf"]
+    assert data["otherData"]["run_id"] == "run-1"
+    assert events["node"]["args"]["parent_id"] == events["report_run"]["args"]["span_id"]
+    assert len(leaves) == 2
+    assert all(e["args"]["parent_id"] == events["node"]["args"]["span_id"] for e in leaves)
+    assert all(e["args"]["run_id"] == "run-1" for e in leaves)
+    # Concurrent leaves run in separate tasks, so they land on separate rows.
+    assert leaves[0]["tid"] != leaves[1]["tid"]
+    assert events["report_run"]["dur"] >= events["node"]["dur"] >= 20_000
+
+
+def test_spans_are_noops_outside_a_run(tmp_path) -> None:
+    with span("orphan") as current:
+        assert current is None
+    assert asyncio.run(_leaf(0)) == 0
+    with trace_run("off", enabled=False, out_dir=tmp_path) as tracer:
+        assert tracer is None
+    assert not list(tmp_path.iterdir())
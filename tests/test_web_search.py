@@ -0,0 +1,126 @@
+import asyncio
+import json
+import time
+
+import httpx
+import pytest
+
+import tools.web_search as web_search
+from tools.cache import DiskCache
+from tools.metrics import METRICS
+from tools.web_search import LatencyTracker, LocalIndexProvider, hedged_search
+
+
+class FakeProvider:
+    def __init__(self, name: str, delay: float, fail: bool = False) -> None:
+        self.name = name
+        self.delay = delay
+        self.fail = fail
+        self.calls = 0
+
+    def available(self) -> bool:
+        return True
+
+    async def search(self, query: str, k: int):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        if self.fail:
+            raise httpx.ConnectError("down")
+        return [{"title": self.name, "url": f"https://{self.name}.test/{query}"}]
+
+
+def test_hedged_search_takes_the_faster_provider() -> None:
+    METRICS.reset()
+    slow, fast = FakeProvider("slow", 0.5), FakeProvider("fast", 0.01)
+    started = time.perf_counter()
+    results = asyncio.run(hedged_search([slow, fast], "q", 3, delay=0.05))
+    assert results[0]["title"] == "fast"
+    assert time.perf_counter() - started < 0.3
+    assert METRICS.value("search_hedge_wins_total", provider="fast") == 1
+
+
+def test_hedged_search_skips_the_hedge_when_primary_is_fast_and_falls_back_on_errors() -> None:
+    primary, secondary = FakeProvider("primary", 0.0), FakeProvider("secondary", 0.0)
+    assert asyncio.run(hedged_search([primary, secondary], "q", 3, delay=0.2))[0]["title"] == "primary"
+    assert secondary.calls == 0
+
+    broken = FakeProvider("broken", 0.0, fail=True)
+    assert asyncio.run(hedged_search([broken, secondary], "q", 3, delay=1.0))[0]["title"] == "secondary"
+    with pytest.raises(httpx.ConnectError):
+        asyncio.run(hedged_search([broken, FakeProvider("also-broken", 0.0, fail=True)], "q", 3, delay=0.0))
+
+
+def test_hedge_delay_does_not_drift_down_when_slow_primaries_lose(monkeypatch) -> None:
+    tracker = LatencyTracker(window=20)
+    monkeypatch.setattr(web_search, "LATENCIES", tracker)
+    monkeypatch.setattr(web_search, "_search_config", lambda: {"hedge": {"min_delay_ms": 0}})
+    for _ in range(20):
+        tracker.record("primary", 0.03)
+    initial = web_search.hedge_delay("primary")
+
+    class AlternatingProvider(FakeProvider):
+        async def search(self, query: str, k: int):
+            self.delay = 0.0 if self.calls % 2 else 0.5  # every other call is slow and loses
+            return await super().search(query, k)
+
+    async def run() -> None:
+        primary, secondary = AlternatingProvider("primary", 0.0), FakeProvider("secondary", 0.0)
+        for _ in range(40):  # enough fast wins to fill the whole window
+            await hedged_search([primary, secondary], "q", 3)
+            await asyncio.sleep(0)  # let the cancelled primary record its elapsed time
+
+    asyncio.run(run())
+    assert web_search.hedge_delay("primary") >= initial
+
+
+def test_local_index_ranks_by_bm25(tmp_path) -> None:
+    index = tmp_path / "index.jsonl"
+    docs = [
+        {"title": "Mongolia logistics market", "url": "a", "content": "Mongolia logistics demand grows"},
+        {"title": "Vietnam retail", "url": "b", "content": "retail market in Vietnam"},
+        {"title": "Mongolia mining", "url": "c", "content": "copper exports"},
+    ]
+    index.write_text("\n".join(json.dumps(doc) for doc in docs), encoding="utf-8")
+    provider = LocalIndexProvider(index)
+    assert provider.available()
+    results = asyncio.run(provider.search("mongolia logistics", 2))
+    assert [doc["url"] for doc in results] == ["a", "c"]
+    assert not LocalIndexProvider(tmp_path / "missing.jsonl").available()
+
+
+def test_provider_chain_and_hedge_delay(monkeypatch) -> None:
+    monkeypatch.setattr(web_search, "TAVILY_API_KEY", None)
+    monkeypatch.setattr(web_search, "BRAVE_API_KEY", "key")
+    monkeypatch.setattr(web_search, "_PROVIDERS", None)
+    config = {"provider": "tavily", "fallback": ["local", "brave"]}
+    assert [p.name for p in web_search.provider_chain(config)] == ["brave"]
+
+    tracker = LatencyTracker()
+    monkeypatch.setattr(web_search, "LATENCIES", tracker)
+    assert web_search.hedge_delay("tavily", {"hedge": {"default_delay_ms": 800}}) == 0.8
+    for ms in range(1, 101):
+        tracker.record("tavily", ms / 1000)
+    assert web_search.hedge_delay("tavily", {"hedge": {"percentile": 95, "min_delay_ms": 0}}) == 0.095
+    assert web_search.hedge_delay("tavily", {"hedge": {"percentile": 50, "min_delay_ms": 200}}) == 0.2
+
+
+def test_search_reused_flags_cache_hits_and_shared_searches(monkeypatch, tmp_path) -> None:
+    provider = FakeProvider("primary", 0.02)
+    monkeypatch.setattr(web_search, "provider_chain", lambda: [provider])
+    monkeypatch.setattr(web_search, "SEARCH_CACHE", DiskCache("search", path=tmp_path / "search.sqlite3"))
+
+    async def search(query: str):
+        pages = await web_search.search_pages_or_raise(query, 3)
+        return pages, web_search.search_reused()
+
+    async def run():
+        first = await search("mongolia logistics")
+        cached = await search("Mongolia  logistics")
+        shared = await asyncio.gather(search("vietnam logistics"), search("vietnam logistics"))
+        return first, cached, shared
+
+    first, cached, shared = asyncio.run(run())
+    assert not first[1]
+    assert cached == (first[0], True)
+    assert sorted(reused for _pages, reused in shared) == [False, True]
+    assert provider.calls == 2
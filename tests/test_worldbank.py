@@ -0,0 +1,66 @@
+import asyncio
+
+import httpx
+
+import tools.sources.worldbank as worldbank
+from tools.cache import DiskCache
+
+
+def test_get_macro_bulk_batches_and_persists(monkeypatch, tmp_path) -> None:
+    requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        parts = request.url.path.split("/")
+        codes, indicators = parts[3].split(";"), parts[5].split(";")
+        rows = [
+            {"countryiso3code": code, "indicator": {"id": indicator}, "value": 2_000_000_000}
+            for code in codes
+            for indicator in indicators
+        ]
+        return httpx.Response(200, json=[{"page": 1, "pages": 1}, rows])
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    monkeypatch.setattr(worldbank, "get_client", lambda name: client)
+    monkeypatch.setattr(worldbank, "_MACRO_CACHE", DiskCache("wb", path=tmp_path / "wb.sqlite3"))
+    monkeypatch.setattr(worldbank, "_CACHE", {})
+
+    result = asyncio.run(worldbank.get_macro_bulk(["Mongolia", "USA", "South Korea"]))
+    assert len(requests) == 1
+    assert requests[0].url.params["source"] == "2"
+    assert result["Mongolia"]["gdp_usd_bil"] == 2.0
+
+    worldbank._CACHE.clear()
+    again = asyncio.run(worldbank.get_macro("USA"))
+    assert len(requests) == 1  # served from the persistent cache
+    assert again["population_m"] == 2000.0
+
+
+def test_bulk_fallback_bisects_around_an_unknown_code(monkeypatch, tmp_path) -> None:
+    requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        parts = request.url.path.split("/")
+        codes, indicators = parts[3].split(";"), parts[5].split(";")
+        if "ZZZ" in codes:
+            return httpx.Response(400, json=[{"message": [{"id": "120", "value": "Invalid value"}]}])
+        rows = [
+            {"countryiso3code": code, "indicator": {"id": indicator}, "value": 3_000_000_000}
+            for code in codes
+            for indicator in indicators
+        ]
+        return httpx.Response(200, json=[{"page": 1, "pages": 1}, rows])
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    monkeypatch.setattr(worldbank, "get_client", lambda name: client)
+    monkeypatch.setattr(worldbank, "_MACRO_CACHE", DiskCache("wb", path=tmp_path / "wb.sqlite3"))
+    monkeypatch.setattr(worldbank, "_CACHE", {})
+
+    countries = ["AA" + chr(ord("A") + index) for index in range(19)] + ["ZZZ"]
+    result = asyncio.run(worldbank.get_macro_bulk(countries))
+
+    assert result[countries[0]]["gdp_usd_bil"] == 3.0
+    assert result["ZZZ"]["gdp_usd_bil"] == 0.0
+    # Bisecting costs ~2*log2(20) bulk calls plus the bad code's indicators, not 60 pair calls.
+    assert len(requests) < 15
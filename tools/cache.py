@@ -0,0 +1,229 @@
+"""SQLite-backed, content-addressed cache with TTL and LRU eviction under ``data/cache``."""
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Optional, TypeVar
+
+from tools.metrics import METRICS
+
+_T = TypeVar("_T")
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+CACHE_DIR = Path(os.getenv("CACHE_DIR", PROJECT_ROOT / "data" / "cache"))
+
+CACHE_MODES = ("off", "read", "write", "readwrite", "refresh")
+_cache_mode = os.getenv("CACHE_MODE", "readwrite").strip().lower()
+
+# Empty results (no hits, throttled or blank responses) are kept only briefly so a single
+# bad fetch does not pin an empty answer for the full TTL; 0 disables storing them.
+EMPTY_RESULT_TTL = float(os.getenv("CACHE_EMPTY_TTL", "3600"))
+
+_MISSING = object()
+
+
+def get_cache_mode() -> str:
+    """Return the process-wide cache mode (see ``CACHE_MODES``)."""
+    return _cache_mode if _cache_mode in CACHE_MODES else "readwrite"
+
+
+def set_cache_mode(mode: Optional[str]) -> None:
+    """Override the cache mode for the current process; ``None`` keeps the env default."""
+    global _cache_mode
+    if mode is None:
+        return
+    normalized = mode.strip().lower()
+    if normalized not in CACHE_MODES:
+        raise ValueError(f"Unknown cache mode: {mode!r} (expected one of {', '.join(CACHE_MODES)})")
+    _cache_mode = normalized
+
+
+def cache_reads_enabled(mode: Optional[str] = None) -> bool:
+    """Return whether ``mode`` (default: the active mode) serves cached entries."""
+    return (mode or get_cache_mode()) in {"read", "readwrite"}
+
+
+def cache_writes_enabled(mode: Optional[str] = None) -> bool:
+    """Return whether ``mode`` (default: the active mode) stores fetched entries."""
+    return (mode or get_cache_mode()) in {"write", "readwrite", "refresh"}
+
+
+def make_key(*parts: Any) -> str:
+    """Return a stable SHA-256 key for JSON-serialisable ``parts``."""
+    payload = json.dumps(parts, ensure_ascii=False, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class DiskCache:
+    """Small key/value store persisted in SQLite.
+
+    Values are stored as JSON. Entries carry an optional expiry and an access timestamp;
+    when the store exceeds ``max_entries`` or ``max_bytes`` the least recently used rows are
+    evicted.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        *,
+        path: Optional[Path] = None,
+        default_ttl: Optional[float] = None,
+        max_entries: int = 10_000,
+        max_bytes: int = 256 * 1024 * 1024,
+    ) -> None:
+        self.name = name
+        self.path = Path(path) if path else CACHE_DIR / f"{name}.sqlite3"
+        self.default_ttl = default_ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.path), check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS entries (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL,
+                    created REAL NOT NULL,
+                    expires REAL,
+                    accessed REAL NOT NULL,
+                    size INTEGER NOT NULL
+                )
+                """
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed)")
+            self._conn = conn
+        return self._conn
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Return the cached value for ``key`` or ``default`` when missing/expired."""
+        now = time.time()
+        with self._lock:
+            conn = self._connection()
+            row = conn.execute("SELECT value, expires FROM entries WHERE key = ?", (key,)).fetchone()
+            if row is not None and row[1] is not None and row[1] <= now:
+                conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+                row = None
+            if row is None:
+                self.misses += 1
+            else:
+                conn.execute("UPDATE entries SET accessed = ? WHERE key = ?", (now, key))
+                self.hits += 1
+        METRICS.inc("cache_misses_total" if row is None else "cache_hits_total", cache=self.name)
+        return default if row is None else json.loads(row[0])
+
+    def set(self, key: str, value: Any, *, ttl: Optional[float] = None, overwrite: bool = True) -> None:
+        """Store ``value`` under ``key`` with an optional TTL in seconds."""
+        now = time.time()
+        ttl = self.default_ttl if ttl is None else ttl
+        expires = now + ttl if ttl else None
+        encoded = json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+        verb = "INSERT OR REPLACE" if overwrite else "INSERT OR IGNORE"
+        with self._lock:
+            conn = self._connection()
+            if not overwrite:
+                # An expired row must not block the insert (and then be evicted along with it).
+                conn.execute("DELETE FROM entries WHERE key = ? AND expires IS NOT NULL AND expires <= ?", (key, now))
+            conn.execute(
+                f"{verb} INTO entries (key, value, created, expires, accessed, size) VALUES (?, ?, ?, ?, ?, ?)",
+                (key, encoded, now, expires, now, len(encoded)),
+            )
+            self._evict(conn)
+
+    async def aget(self, key: str, default: Any = None) -> Any:
+        """``get`` run in a worker thread so SQLite I/O does not block the event loop."""
+        return await asyncio.to_thread(self.get, key, default)
+
+    async def aset(self, key: str, value: Any, *, ttl: Optional[float] = None, overwrite: bool = True) -> None:
+        """``set`` run in a worker thread so SQLite I/O does not block the event loop."""
+        await asyncio.to_thread(self.set, key, value, ttl=ttl, overwrite=overwrite)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._connection().execute("DELETE FROM entries WHERE key = ?", (key,))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._connection().execute("DELETE FROM entries")
+
+    def _evict(self, conn: sqlite3.Connection) -> None:
+        conn.execute("DELETE FROM entries WHERE expires IS NOT NULL AND expires <= ?", (time.time(),))
+        count, total = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries").fetchone()
+        if count > self.max_entries:
+            conn.execute(
+                "DELETE FROM entries WHERE key IN (SELECT key FROM entries ORDER BY accessed ASC LIMIT ?)",
+                (count - self.max_entries,),
+            )
+            total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        while total > self.max_bytes:
+            row = conn.execute("SELECT key, size FROM entries ORDER BY accessed ASC LIMIT 1").fetchone()
+            if row is None:
+                break
+            conn.execute("DELETE FROM entries WHERE key = ?", (row[0],))
+            total -= row[1]
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters and the current store size."""
+        with self._lock:
+            count, total = self._connection().execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries"
+            ).fetchone()
+        return {"name": self.name, "hits": self.hits, "misses": self.misses, "entries": count, "bytes": total}
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+async def cached_call(
+    cache: DiskCache,
+    key: str,
+    fetch: Callable[[], Awaitable[_T]],
+    *,
+    ttl: Optional[float] = None,
+    should_store: Callable[[_T], bool] = lambda value: value is not None,
+    mode: Optional[str] = None,
+    empty_ttl: float = EMPTY_RESULT_TTL,
+) -> _T:
+    """Return ``fetch()`` through ``cache`` honouring the active cache mode.
+
+    ``read``/``readwrite`` serve hits; ``write``/``readwrite`` store missing entries;
+    ``refresh`` always fetches and overwrites; ``off`` bypasses the cache entirely.
+    Empty results are stored for at most ``empty_ttl`` seconds (not at all when 0).
+    Disk access runs in a worker thread.
+    """
+    mode = mode or get_cache_mode()
+    if cache_reads_enabled(mode):
+        cached = await cache.aget(key, _MISSING)
+        if cached is not _MISSING:
+            return cached  # type: ignore[return-value]
+
+    value = await fetch()
+    if cache_writes_enabled(mode) and should_store(value):
+        if _is_empty(value):
+            if not empty_ttl:
+                return value
+            full_ttl = cache.default_ttl if ttl is None else ttl
+            ttl = min(full_ttl, empty_ttl) if full_ttl else empty_ttl
+        await cache.aset(key, value, ttl=ttl, overwrite=mode != "write")
+    return value
+
+
+def _is_empty(value: Any) -> bool:
+    return isinstance(value, (list, tuple, dict, str)) and not value
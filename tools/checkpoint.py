@@ -0,0 +1,273 @@
+"""Durable per-node output checkpoints so a report run can be resumed without re-collecting data."""
+from __future__ import annotations
+
+import ast
+import asyncio
+import contextvars
+import hashlib
+import importlib.util
+import inspect
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from functools import lru_cache, wraps
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from tools.cache import CACHE_DIR, make_key
+from tools.metrics import METRICS
+
+logger = logging.getLogger(__name__)
+
+CHECKPOINT_PATH = Path(os.getenv("CHECKPOINT_PATH", CACHE_DIR / "checkpoints.sqlite3"))
+CHECKPOINT_MAX_RUNS = int(os.getenv("CHECKPOINT_MAX_RUNS", 50))
+# Modules under this directory count towards a node's code version.
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+
+_MISSING = object()
+
+
+class CheckpointStore:
+    """SQLite table of node outputs keyed by (run_id, node, input hash, code version)."""
+
+    def __init__(self, path: Optional[Path] = None, *, max_runs: int = CHECKPOINT_MAX_RUNS) -> None:
+        self.path = Path(path) if path else CHECKPOINT_PATH
+        self.max_runs = max_runs
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.path), check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS node_outputs (
+                    run_id TEXT NOT NULL,
+                    node TEXT NOT NULL,
+                    input_hash TEXT NOT NULL,
+                    code_version TEXT NOT NULL,
+                    output TEXT NOT NULL,
+                    created REAL NOT NULL,
+                    PRIMARY KEY (run_id, node, input_hash, code_version)
+                )
+                """
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS node_outputs_created ON node_outputs (created)")
+            self._conn = conn
+        return self._conn
+
+    def get(self, run_id: str, node: str, input_hash: str, code_version: str) -> Any:
+        with self._lock:
+            row = self._connection().execute(
+                "SELECT output FROM node_outputs WHERE run_id=? AND node=? AND input_hash=? AND code_version=?",
+                (run_id, node, input_hash, code_version),
+            ).fetchone()
+        return _MISSING if row is None else json.loads(row[0])
+
+    def put(self, run_id: str, node: str, input_hash: str, code_version: str, output: Any) -> bool:
+        try:
+            payload = json.dumps(output, ensure_ascii=False)
+        except (TypeError, ValueError):
+            logger.warning("checkpoint skipped for %s: output is not JSON-serialisable", node)
+            return False
+        with self._lock:
+            self._connection().execute(
+                "INSERT OR REPLACE INTO node_outputs VALUES (?, ?, ?, ?, ?, ?)",
+                (run_id, node, input_hash, code_version, payload, time.time()),
+            )
+        return True
+
+    def runs(self) -> list[str]:
+        """Run ids, most recent first."""
+        with self._lock:
+            rows = self._connection().execute(
+                "SELECT run_id FROM node_outputs GROUP BY run_id ORDER BY MAX(created) DESC"
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def prune(self, keep: Optional[int] = None) -> None:
+        """Drop every run but the ``keep`` most recent ones."""
+        stale = self.runs()[keep if keep is not None else self.max_runs :]
+        if not stale:
+            return
+        with self._lock:
+            self._connection().executemany("DELETE FROM node_outputs WHERE run_id=?", [(run_id,) for run_id in stale])
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+@dataclass
+class CheckpointSession:
+    """Checkpoint settings for one graph run.
+
+    ``resume`` reuses outputs stored under ``run_id``; nodes named in ``force`` always re-run.
+    """
+
+    store: CheckpointStore
+    run_id: str
+    resume: bool = False
+    force: frozenset = field(default_factory=frozenset)
+    reused: list = field(default_factory=list)
+
+
+_SESSION: contextvars.ContextVar[Optional[CheckpointSession]] = contextvars.ContextVar("checkpoint_session", default=None)
+
+
+@contextmanager
+def checkpoint_session(
+    run_id: str,
+    *,
+    resume: bool = False,
+    force: Iterable[str] = (),
+    store: Optional[CheckpointStore] = None,
+) -> Iterator[CheckpointSession]:
+    """Activate checkpointing for graph nodes invoked inside this block."""
+    session = CheckpointSession(store or CheckpointStore(), run_id, resume, frozenset(force))
+    session.store.prune()
+    token = _SESSION.set(session)
+    try:
+        yield session
+    finally:
+        _SESSION.reset(token)
+
+
+def _hash_files(paths: Iterable[Path]) -> Iterator[str]:
+    for path in paths:
+        files = sorted(p for p in path.rglob("*") if p.is_file()) if path.is_dir() else [path]
+        for file in files:
+            if file.exists():
+                yield f"{file.name}:{hashlib.sha256(file.read_bytes()).hexdigest()}"
+
+
+def _local_module_file(name: str) -> Optional[Path]:
+    try:
+        spec = importlib.util.find_spec(name)
+    except (ImportError, ValueError):  # ``name`` is a function/class imported from a module
+        return None
+    origin = getattr(spec, "origin", None)
+    if not origin or not origin.endswith(".py"):
+        return None
+    path = Path(origin).resolve()
+    if PROJECT_ROOT not in path.parents or "site-packages" in path.parts:
+        return None
+    return path
+
+
+@lru_cache(maxsize=1024)
+def _imported_modules(path: Path, package: str, mtime_ns: int) -> Tuple[str, ...]:
+    """Module names ``path`` imports anywhere (top level or inside functions)."""
+    try:
+        tree = ast.parse(path.read_bytes())  # bytes: the tokenizer handles BOMs/coding cookies
+    except SyntaxError:
+        return ()
+    names: List[str] = []
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            names.extend(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom):
+            base = node.module or ""
+            if node.level:
+                try:
+                    base = importlib.util.resolve_name("." * node.level + base, package)
+                except ImportError:
+                    continue
+            names.append(base)
+            names.extend(f"{base}.{alias.name}" for alias in node.names)
+    return tuple(names)
+
+
+def local_dependencies(module_name: str) -> List[Path]:
+    """Source files of ``module_name`` and every project module it imports, transitively."""
+    seen: Dict[str, Optional[Path]] = {}
+    stack = [module_name]
+    while stack:
+        name = stack.pop()
+        if not name or name in seen:
+            continue
+        path = seen[name] = _local_module_file(name)
+        if path is None:
+            continue
+        package = name if path.name == "__init__.py" else name.rpartition(".")[0]
+        stack.extend(_imported_modules(path, package, path.stat().st_mtime_ns))
+    return sorted({path for path in seen.values() if path is not None})
+
+
+def code_version(func: Callable[..., Any], assets: Sequence[Path] = ()) -> str:
+    """Hash of the node's module and the project modules it (transitively) imports, plus any
+    template/prompt ``assets`` it renders -- so edits to e.g. ``tools/scoring.py`` re-run the node."""
+    module = inspect.getmodule(func)
+    sources = local_dependencies(module.__name__) if module else []
+    if sources:
+        digests = [f"{path.relative_to(PROJECT_ROOT)}:{hashlib.sha256(path.read_bytes()).hexdigest()}" for path in sources]
+    else:
+        try:
+            digests = [inspect.getsource(module) if module else inspect.getsource(func)]
+        except (OSError, TypeError):
+            digests = [getattr(func, "__qualname__", repr(func))]
+    return make_key(digests, list(_hash_files(assets)))[:16]
+
+
+def _select(state: Dict[str, Any], path: str) -> Any:
+    value: Any = state
+    for part in path.split("."):
+        if not isinstance(value, dict):
+            return None
+        value = value.get(part)
+    return value
+
+
+def input_hash(state: Dict[str, Any], inputs: Optional[Sequence[str]]) -> str:
+    """Hash the state paths a node reads (``None`` hashes the whole state)."""
+    if inputs is None:
+        return make_key(state)
+    return make_key({path: _select(state, path) for path in inputs})
+
+
+def checkpointed(
+    node_name: str,
+    func: Callable[..., Any],
+    *,
+    inputs: Optional[Sequence[str]] = None,
+    assets: Sequence[Path] = (),
+) -> Callable[..., Any]:
+    """Wrap a node so its output is stored, and reused on resume when inputs and code match.
+
+    Outside a ``checkpoint_session`` the node runs unchanged.
+    """
+    version = code_version(func, assets)
+
+    @wraps(func)
+    async def wrapper(state: Dict[str, Any], *args: Any, **kwargs: Any) -> Any:
+        session = _SESSION.get()
+        if session is None:
+            result = func(state, *args, **kwargs)
+            return await result if inspect.isawaitable(result) else result
+
+        digest = input_hash(state, inputs)
+        if session.resume and node_name not in session.force:
+            stored = await asyncio.to_thread(session.store.get, session.run_id, node_name, digest, version)
+            if stored is not _MISSING:
+                logger.info("checkpoint hit %s run_id=%s", node_name, session.run_id)
+                METRICS.inc("checkpoint_hits_total", node=node_name)
+                session.reused.append(node_name)
+                return stored
+
+        result = func(state, *args, **kwargs)
+        if inspect.isawaitable(result):
+            result = await result
+        await asyncio.to_thread(session.store.put, session.run_id, node_name, digest, version, result)
+        return result
+
+    return wrapper
@@ -0,0 +1,111 @@
+"""Single-flight request coalescing for concurrent async lookups of the same key."""
+from __future__ import annotations
+
+import asyncio
+import copy
+from functools import wraps
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple, TypeVar
+
+_T = TypeVar("_T")
+_FuncT = TypeVar("_FuncT", bound=Callable[..., Awaitable[Any]])
+
+
+def _consume_exception(future: asyncio.Future) -> None:
+    # Avoid "exception was never retrieved" warnings when nobody else was waiting.
+    if not future.cancelled():
+        future.exception()
+
+
+class SingleFlight:
+    """Track in-flight work per key so concurrent callers share one result.
+
+    Futures are scoped to the running event loop, so a ``SingleFlight`` kept at module
+    level stays safe across consecutive ``asyncio.run`` calls.
+    """
+
+    def __init__(self) -> None:
+        self._inflight: Dict[Tuple[int, Hashable], asyncio.Future] = {}
+
+    @staticmethod
+    def _scoped(key: Hashable) -> Tuple[int, Hashable]:
+        return id(asyncio.get_running_loop()), key
+
+    def claim(self, key: Hashable) -> Tuple[asyncio.Future, bool]:
+        """Return the future for ``key`` and whether the caller owns (must resolve) it."""
+        scoped = self._scoped(key)
+        future = self._inflight.get(scoped)
+        if future is not None and not future.done():
+            return future, False
+        future = asyncio.get_running_loop().create_future()
+        future.add_done_callback(_consume_exception)
+        self._inflight[scoped] = future
+        return future, True
+
+    def resolve(self, key: Hashable, result: Any) -> None:
+        future = self._inflight.pop(self._scoped(key), None)
+        if future is not None and not future.done():
+            future.set_result(result)
+
+    def reject(self, key: Hashable, exc: BaseException) -> None:
+        future = self._inflight.pop(self._scoped(key), None)
+        if future is None or future.done():
+            return
+        if isinstance(exc, asyncio.CancelledError):
+            future.cancel()
+        else:
+            future.set_exception(exc)
+
+    async def wait(self, future: asyncio.Future, *, copy_result: bool = True) -> Any:
+        """Await a future owned by another caller without letting our cancellation leak into it."""
+        result = await asyncio.shield(future)
+        return copy.deepcopy(result) if copy_result else result
+
+    def in_flight(self) -> int:
+        return sum(1 for future in self._inflight.values() if not future.done())
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[_T]], *, copy_result: bool = True) -> _T:
+        """Run ``fn`` once per key; concurrent callers await the same outcome.
+
+        Followers receive a deep copy so they can mutate results freely. If the owner is
+        cancelled, waiting followers retry and one of them becomes the new owner.
+        """
+        while True:
+            future, owner = self.claim(key)
+            if owner:
+                try:
+                    result = await fn()
+                except BaseException as exc:
+                    self.reject(key, exc)
+                    raise
+                self.resolve(key, result)
+                return result
+            try:
+                return await self.wait(future, copy_result=copy_result)
+            except asyncio.CancelledError:
+                if future.cancelled():
+                    continue
+                raise
+
+
+def coalesce(
+    key: Optional[Callable[..., Hashable]] = None,
+    *,
+    copy_result: bool = True,
+) -> Callable[[_FuncT], _FuncT]:
+    """Decorator giving an async function single-flight semantics per ``key(*args, **kwargs)``.
+
+    Without ``key`` the positional and keyword arguments themselves form the key.
+    """
+
+    def decorator(func: _FuncT) -> _FuncT:
+        flight = SingleFlight()
+
+        @wraps(func)
+        async def wrapper(*args: Any, **kwargs: Any) -> Any:
+            flight_key = key(*args, **kwargs) if key else (args, tuple(sorted(kwargs.items())))
+            return await flight.do(flight_key, lambda: func(*args, **kwargs), copy_result=copy_result)
+
+        wrapper.single_flight = flight  # type: ignore[attr-defined]
+        return wrapper  # type: ignore[return-value]
+
+    return decorator
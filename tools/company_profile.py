@@ -8,7 +8,10 @@ from typing import Dict, Optional
 import httpx
 from bs4 import BeautifulSoup
 
-from tools.llm import complete_markdown
+from tools.coalesce import coalesce
+from tools.http_client import get_client
+from tools.llm import acomplete_markdown
+from tools.tracing import traced
 
 DEFAULT_TIMEOUT = float(os.getenv("HTTP_TIMEOUT", 20))
 MAX_CHARS = 4000
@@ -24,17 +27,18 @@ def _extract_text(html: str) -> str:
     return text[:MAX_CHARS]
 
 
+@traced("_fetch_page")
+@coalesce(lambda url: url)
 async def _fetch_page(url: str) -> str:
     try:
-        async with httpx.AsyncClient(timeout=DEFAULT_TIMEOUT) as client:
-            response = await client.get(url)
-            response.raise_for_status()
-            return response.text
+        response = await get_client("web").get(url, timeout=DEFAULT_TIMEOUT)
+        response.raise_for_status()
+        return response.text
     except httpx.HTTPError:
         return ""
 
 
-def _summarise_with_llm(name: str, notes: Optional[str], raw_text: str) -> Dict[str, any]:
+async def _summarise_with_llm(name: str, notes: Optional[str], raw_text: str) -> Dict[str, any]:
     if not os.getenv("OPENAI_API_KEY"):
         raise RuntimeError("LLM disabled")
 
@@ -53,7 +57,7 @@ information is missing.
 [Additional Notes]
 {notes or "N/A"}
 """
-    completion = complete_markdown(prompt, system="Produce clean JSON for strategy teams.")
+    completion = await acomplete_markdown(prompt, system="Produce clean JSON for strategy teams.")
     json_text = completion.strip()
     start = json_text.find("{")
     end = json_text.rfind("}")
@@ -87,7 +91,7 @@ async def build_company_profile(
     raw_text = _extract_text(html)
 
     try:
-        profile = _summarise_with_llm(name, notes, raw_text)
+        profile = await _summarise_with_llm(name, notes, raw_text)
     except Exception:
         profile = _fallback_profile(name, notes, raw_text)
 
@@ -0,0 +1,73 @@
+"""Bounded-concurrency fan-out helpers shared by the per-country graph nodes."""
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+from typing import Any, Awaitable, Callable, Dict, Iterable, Mapping, Optional, TypeVar
+
+_T = TypeVar("_T")
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_COUNTRY_CONCURRENCY = int(os.getenv("MAX_COUNTRY_CONCURRENCY", 4))
+
+
+def resolve_country_concurrency(state: Optional[Mapping[str, Any]] = None) -> int:
+    """Return the per-country concurrency limit from state, falling back to the env default."""
+    value = (state or {}).get("max_country_concurrency")
+    try:
+        limit = int(value) if value is not None else DEFAULT_MAX_COUNTRY_CONCURRENCY
+    except (TypeError, ValueError):
+        limit = DEFAULT_MAX_COUNTRY_CONCURRENCY
+    return max(1, limit)
+
+
+async def gather_bounded(
+    items: Iterable[str],
+    worker: Callable[[str], Awaitable[_T]],
+    *,
+    limit: int = DEFAULT_MAX_COUNTRY_CONCURRENCY,
+    on_error: Optional[Callable[[str, BaseException], _T]] = None,
+) -> Dict[str, _T]:
+    """Run ``worker`` for every item with at most ``limit`` in flight.
+
+    The returned mapping preserves the input order. A failing item is logged and
+    replaced by ``on_error(item, exc)`` (or dropped when no fallback is given), so one
+    country never aborts the others.
+    """
+    keys = list(dict.fromkeys(items))
+    semaphore = asyncio.Semaphore(max(1, limit))
+
+    async def _run(key: str) -> _T:
+        async with semaphore:
+            return await worker(key)
+
+    outcomes = await asyncio.gather(*(_run(key) for key in keys), return_exceptions=True)
+
+    results: Dict[str, _T] = {}
+    for key, outcome in zip(keys, outcomes):
+        if isinstance(outcome, asyncio.CancelledError):
+            raise outcome
+        if isinstance(outcome, BaseException):
+            logger.warning("fan-out worker failed for %s: %r", key, outcome)
+            if on_error is not None:
+                results[key] = on_error(key, outcome)
+            continue
+        results[key] = outcome
+    return results
+
+
+async def gather_countries(
+    state: Mapping[str, Any],
+    worker: Callable[[str], Awaitable[_T]],
+    *,
+    on_error: Optional[Callable[[str, BaseException], _T]] = None,
+) -> Dict[str, _T]:
+    """Fan ``worker`` out over ``state['countries']`` using the state's concurrency limit."""
+    return await gather_bounded(
+        state.get("countries", []) or [],
+        worker,
+        limit=resolve_country_concurrency(state),
+        on_error=on_error,
+    )
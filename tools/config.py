@@ -0,0 +1,46 @@
+"""Helpers for reading the YAML settings under ``config/``."""
+from __future__ import annotations
+
+import os
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict
+
+import yaml
+
+CONFIG_DIR = Path(__file__).resolve().parents[1] / "config"
+SETTINGS_PATH = Path(os.getenv("SETTINGS_PATH", CONFIG_DIR / "settings.yaml"))
+SETTINGS_EXAMPLE_PATH = CONFIG_DIR / "settings.example.yaml"
+SOURCES_PATH = Path(os.getenv("SOURCES_PATH", CONFIG_DIR / "sources.yaml"))
+
+DEFAULT_RETRY_BACKOFF_SECONDS = 5.0
+DEFAULT_RETRY_MAX_ATTEMPTS = 1
+
+
+@lru_cache(maxsize=None)
+def load_yaml(path: Path) -> Dict[str, Any]:
+    """Return the mapping stored in ``path``, or an empty dict if it is missing or invalid."""
+    try:
+        data = yaml.safe_load(path.read_text(encoding="utf-8"))
+    except (OSError, yaml.YAMLError):
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def load_settings() -> Dict[str, Any]:
+    """Load ``settings.yaml``, falling back to the checked-in example settings."""
+    path = SETTINGS_PATH if SETTINGS_PATH.exists() else SETTINGS_EXAMPLE_PATH
+    return load_yaml(path)
+
+
+def load_sources() -> Dict[str, Any]:
+    return load_yaml(SOURCES_PATH)
+
+
+def retry_settings() -> Dict[str, Any]:
+    """Evidence re-collection settings: base backoff (seconds) and attempt budget."""
+    retry = load_settings().get("retry") or {}
+    return {
+        "backoff_seconds": float(retry.get("backoff_seconds", DEFAULT_RETRY_BACKOFF_SECONDS)),
+        "max_attempts": int(retry.get("max_attempts", DEFAULT_RETRY_MAX_ATTEMPTS)),
+    }
@@ -0,0 +1,121 @@
+"""Process-pool export stage for CPU-bound HTML/PDF rendering."""
+from __future__ import annotations
+
+import asyncio
+import logging
+import multiprocessing
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import partial
+from typing import Any, Callable, Dict, MutableMapping, Optional, Set, TypeVar
+
+from tools.metrics import METRICS
+
+_T = TypeVar("_T")
+
+logger = logging.getLogger(__name__)
+
+# 0 disables the process pool; conversions then run on a worker thread instead.
+EXPORT_WORKERS = int(os.getenv("EXPORT_WORKERS", min(4, os.cpu_count() or 1)))
+PDF_BACKGROUND = os.getenv("PDF_BACKGROUND", "0").strip().lower() in {"1", "true", "yes"}
+
+_POOL: Optional[ProcessPoolExecutor] = None
+_PENDING_PDFS: Dict[str, asyncio.Task] = {}
+_BACKGROUND_TASKS: Set[asyncio.Task] = set()
+
+
+def get_export_pool() -> Optional[Executor]:
+    """Return the shared export process pool, creating it on first use."""
+    global _POOL
+    if EXPORT_WORKERS <= 0:
+        return None
+    if _POOL is None:
+        # "spawn" keeps workers clear of the parent's event loop, threads and sqlite handles.
+        _POOL = ProcessPoolExecutor(max_workers=EXPORT_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+    return _POOL
+
+
+def _warm_worker() -> None:
+    import tools.export  # noqa: F401  (pays the import cost before the first real export)
+
+
+def prewarm_export_pool() -> None:
+    """Start the export workers in the background so the first report does not wait on spawn."""
+    pool = get_export_pool()
+    if pool is not None:
+        for _ in range(EXPORT_WORKERS):
+            pool.submit(_warm_worker)
+
+
+def shutdown_export_pool(wait: bool = True) -> None:
+    global _POOL
+    pool, _POOL = _POOL, None
+    if pool is not None:
+        pool.shutdown(wait=wait, cancel_futures=not wait)
+
+
+async def run_export(func: Callable[..., _T], *args: Any, **kwargs: Any) -> _T:
+    """Run a picklable CPU-bound export ``func`` off the event loop.
+
+    Falls back to a worker thread when the process pool is disabled or has broken.
+    """
+    call = partial(func, *args, **kwargs)
+    with METRICS.timer("export_seconds", func=getattr(func, "__name__", "export")):
+        pool = get_export_pool()
+        if pool is not None:
+            try:
+                return await asyncio.get_running_loop().run_in_executor(pool, call)
+            except BrokenProcessPool:
+                logger.warning("export process pool broke; falling back to a worker thread")
+                shutdown_export_pool(wait=False)
+        return await asyncio.to_thread(call)
+
+
+def submit_pdf(
+    html: str,
+    out_path: str,
+    base_url: Optional[str] = None,
+    *,
+    target: Optional[MutableMapping[str, Any]] = None,
+) -> asyncio.Task:
+    """Start PDF generation in the background and return immediately.
+
+    When it finishes, ``target["pdf_path"]`` (if given) is filled with the result. Call
+    ``wait_for_pdf``/``drain_exports`` before the event loop or pool shuts down.
+    """
+    from tools.export import to_pdf
+
+    async def _render() -> Optional[str]:
+        try:
+            result = await run_export(to_pdf, html, out_path=out_path, base_url=base_url)
+        except Exception:
+            logger.exception("background PDF export failed for %s", out_path)
+            result = None
+        if target is not None:
+            target["pdf_path"] = result
+        return result
+
+    task = asyncio.ensure_future(_render())
+    _PENDING_PDFS[out_path] = task
+    _BACKGROUND_TASKS.add(task)
+    task.add_done_callback(_BACKGROUND_TASKS.discard)
+    return task
+
+
+async def wait_for_pdf(report: MutableMapping[str, Any]) -> Optional[str]:
+    """Await a report's background PDF (if any) and return its final ``pdf_path``."""
+    pending = report.get("pdf_pending_path")
+    task = _PENDING_PDFS.pop(pending, None) if pending else None
+    if task is not None:
+        report["pdf_path"] = await task
+    report.pop("pdf_pending_path", None)
+    return report.get("pdf_path")
+
+
+async def drain_exports() -> Dict[str, Optional[str]]:
+    """Wait for every outstanding background PDF; returns ``{out_path: pdf_path}``."""
+    pending = dict(_PENDING_PDFS)
+    _PENDING_PDFS.clear()
+    results = await asyncio.gather(*pending.values(), return_exceptions=True)
+    return {path: (None if isinstance(result, BaseException) else result) for path, result in zip(pending, results)}
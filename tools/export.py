@@ -3,10 +3,11 @@
 from __future__ import annotations
 
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Optional, Tuple
 
 # _env가 함수일 수도, Environment 객체일 수도 있으므로 안전하게 래핑
 from tools.templating import _env as _tmpl_env
+from tools.templating import markdown_to_html
 
 def _get_env():
     return _tmpl_env() if callable(_tmpl_env) else _tmpl_env
@@ -26,6 +27,18 @@ def to_html(template_path: str, context: Dict[str, Any]) -> str:
     template = env.get_template(Path(template_path).name)
     return template.render(**context)
 
+def render_report_html(
+    template_path: str,
+    markdown_sections: Dict[str, str],
+    context: Dict[str, Any],
+) -> Tuple[Dict[str, str], str]:
+    """Convert every markdown section and render the HTML template in one call.
+
+    Top-level and picklable so the whole conversion costs a single process-pool hop.
+    """
+    html_sections = {name: markdown_to_html(text) if text else "" for name, text in markdown_sections.items()}
+    return html_sections, to_html(template_path, {**context, **html_sections})
+
 def to_pdf(html: str, out_path: str | Path | None = None, base_url: str | Path | None = None) -> Optional[str]:
     """Optional PDF export via WeasyPrint. Returns the output path if written."""
     try:
@@ -1,10 +1,20 @@
 """Data fetchers for macro indicators and market intelligence."""
 from __future__ import annotations
 
-from typing import Any, Dict, List
+import asyncio
+import logging
+import math
+import os
+import time
+from typing import Any, Callable, Collection, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
 
-from tools.sources.worldbank import get_macro
-from tools.web_search import search_pages
+from tools.page_fetcher import attach_full_text
+from tools.parsing import extract_numbers
+from tools.query_stats import QueryYieldStore, plan_filters, record_yields
+from tools.sources.worldbank import get_macro, get_macro_bulk
+from tools.web_search import SEARCH_ERRORS, provider_chain, search_pages_or_raise, search_reused
+
+logger = logging.getLogger(__name__)
 
 OFFICIAL_FILTERS = [
     "site:.gov",
@@ -18,40 +28,238 @@ OFFICIAL_FILTERS = [
     "site:un.org",
 ]
 
+# Number of queries launched together per priority wave.
+QUERY_WAVE_SIZE = int(os.getenv("MARKET_QUERY_WAVE_SIZE", 4))
+
 
 async def fetch_worldbank_macro(country: str) -> Dict[str, float]:
     """Return macro indicators sourced from the World Bank API."""
     return await get_macro(country)
 
 
-async def fetch_market_reports(
+async def fetch_worldbank_macro_bulk(countries: Iterable[str]) -> Dict[str, Dict[str, float]]:
+    """Warm and return World Bank macro indicators for many countries in batched requests."""
+    return await get_macro_bulk(countries)
+
+
+# Broader phrasings used when a country came back with too little evidence.
+WIDENED_QUERY_TEMPLATES = [
+    "{country} {segment} market outlook",
+    "{country} {segment} industry overview statistics",
+    "{country} {segment} foreign investment regulation",
+    "{country} {segment} market news",
+]
+
+
+def build_market_queries(
     country: str,
     segment: str,
     *,
     prefer_official: bool = True,
-    max_results: int = 12,
-) -> List[Dict[str, Any]]:
-    """Query web sources for market reports, prioritising official datasets when possible."""
-    results: List[Dict[str, Any]] = []
-    queries: List[str] = []
+    widen: bool = False,
+    filters: Optional[Sequence[str]] = None,
+) -> List[str]:
+    """Return the market-report queries for a country in priority order.
 
+    ``filters`` overrides ``OFFICIAL_FILTERS`` (order and subset). ``widen`` puts broader
+    queries that drop the size/CAGR phrasing first, for re-collection when the default set
+    produced too little evidence: the default queries are usually cached by then, and the
+    waves stop at ``max_results`` before reaching anything queued behind them.
+    """
+    queries: List[str] = []
+    if widen:
+        queries.extend(template.format(country=country, segment=segment) for template in WIDENED_QUERY_TEMPLATES)
     segment_clause = f"{segment} market size CAGR"
 
     if prefer_official:
-        for filter_clause in OFFICIAL_FILTERS:
+        for filter_clause in OFFICIAL_FILTERS if filters is None else filters:
             queries.append(f"{country} {segment_clause} {filter_clause}")
 
     queries.append(f"{country} {segment_clause} 2024 report")
     queries.append(f"{country} {segment_clause} analysis")
+    return queries
+
+
+def market_search_k(max_results: int) -> int:
+    """Results requested per market query."""
+    return min(6, max_results)
+
+
+def adaptive_market_queries(
+    country: str,
+    segment: str,
+    *,
+    widen: bool = False,
+    stats: Optional[QueryYieldStore] = None,
+) -> List[str]:
+    """Market queries with the official filters ordered/pruned by their recorded yield."""
+    plan = plan_filters(country, segment, OFFICIAL_FILTERS, store=stats)
+    return build_market_queries(country, segment, widen=widen or plan.widen, filters=plan.filters)
+
+
+def planned_market_queries(country: str, segment: str, *, max_results: int) -> List[str]:
+    """The leading queries whose results can already fill ``max_results``; the search planner
+    prefetches these and ``fetch_market_reports`` only continues in waves when they fall short."""
+    queries = adaptive_market_queries(country, segment)
+    return queries[: math.ceil(max_results / market_search_k(max_results))]
+
+
+def _official_filter(query: str) -> Optional[str]:
+    clause = query.rsplit(" ", 1)[-1]
+    return clause if clause in OFFICIAL_FILTERS else None
+
+
+def _has_numbers(page: Dict[str, Any]) -> bool:
+    text = " ".join(str(page.get(key, "")) for key in ("content", "summary", "snippet", "title"))
+    numbers = extract_numbers(text)
+    return numbers["usd"] is not None or numbers["cagr_pct"] is not None
+
+
+def _page_key(page: Dict[str, Any]) -> str:
+    url = page.get("url") or page.get("source") or ""
+    return url.strip().rstrip("/").lower()
+
+
+async def _run_waves(
+    queries: Sequence[str],
+    *,
+    k: int,
+    max_results: int,
+    wave_size: int,
+    prefetched: Optional[Mapping[str, List[Dict[str, Any]]]] = None,
+    reused: Collection[str] = (),
+    observe: Optional[Callable[[str, List[Dict[str, Any]], Optional[float]], None]] = None,
+) -> List[Dict[str, Any]]:
+    """Run ``queries`` in concurrent waves, stopping once ``max_results`` unique hits arrive.
+
+    Queries found in ``prefetched`` are consumed first without searching. ``observe`` is
+    called with the raw pages and latency (``None`` when prefetched) of every query a provider
+    actually answered: searches served from the search cache or shared with a concurrent
+    search, and prefetched queries listed in ``reused``, are consumed but not observed.
+    Searches that failed are logged and skipped. Hits are returned in query priority order
+    (then rank), whatever order the searches completed in.
+    """
+    priority = list(queries)
+    answered: Dict[str, List[Dict[str, Any]]] = {}
+    seen: set[str] = set()
+
+    def _collect(
+        query: str,
+        pages: Optional[List[Dict[str, Any]]],
+        latency: Optional[float] = None,
+        observed: bool = True,
+    ) -> bool:
+        if pages is None:
+            return False
+        if observe is not None and observed:
+            observe(query, pages, latency)
+        answered[query] = pages
+        seen.update(_page_key(page) or f"{query}#{index}" for index, page in enumerate(pages))
+        return len(seen) >= max_results
+
+    def _ordered() -> List[Dict[str, Any]]:
+        results: List[Dict[str, Any]] = []
+        keys: set[str] = set()
+        for query in priority:
+            for page in answered.get(query, []):
+                key = _page_key(page)
+                if key and key in keys:
+                    continue
+                if key:
+                    keys.add(key)
+                page = dict(page)
+                page.setdefault("query", query)
+                results.append(page)
+        return results[:max_results]
+
+    async def _search(query: str) -> Tuple[Optional[List[Dict[str, Any]]], float, bool]:
+        started = time.perf_counter()
+        try:
+            pages: Optional[List[Dict[str, Any]]] = await search_pages_or_raise(query=query, k=k)
+        except SEARCH_ERRORS as exc:
+            logger.warning("search failed for %r: %s", query, exc)
+            return None, time.perf_counter() - started, False
+        return pages, time.perf_counter() - started, not search_reused()
+
+    prefetched = prefetched or {}
+    for query in priority:
+        if query in prefetched and _collect(query, prefetched[query], observed=query not in reused):
+            return _ordered()
+    remaining = [query for query in priority if query not in prefetched]
+
+    wave_size = max(1, wave_size)
+    for start in range(0, len(remaining), wave_size):
+        tasks = {asyncio.ensure_future(_search(query)): query for query in remaining[start : start + wave_size]}
+        pending = set(tasks)
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in sorted(done, key=lambda task: priority.index(tasks[task])):
+                    if task.cancelled():
+                        continue
+                    if task.exception() is not None:
+                        logger.warning("market query %r failed: %r", tasks[task], task.exception())
+                        continue
+                    pages, latency, observed = task.result()
+                    if _collect(tasks[task], pages, latency, observed):
+                        return _ordered()
+        finally:
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    return _ordered()
+
+
+async def fetch_market_reports(
+    country: str,
+    segment: str,
+    *,
+    prefer_official: bool = True,
+    max_results: int = 12,
+    wave_size: int = QUERY_WAVE_SIZE,
+    widen: bool = False,
+    prefetched: Optional[Mapping[str, List[Dict[str, Any]]]] = None,
+    reused: Collection[str] = (),
+    stats: Optional[QueryYieldStore] = None,
+) -> List[Dict[str, Any]]:
+    """Query web sources for market reports, prioritising official datasets when possible.
+
+    Queries are issued in priority waves of ``wave_size``; hits are de-duplicated by URL as
+    they stream in and any outstanding queries are cancelled once ``max_results`` is reached.
+    ``prefetched`` maps queries the search planner already ran to their pages; ``reused``
+    lists those it served from the search cache rather than a provider.
+
+    Official filters are ordered, skipped or complemented by widened queries according to
+    their recorded yield for this (country, segment), and the outcome of each filter query a
+    provider actually answered is recorded back (see ``tools.query_stats``); cached and shared
+    answers are not new trials. With the full-text stage enabled the
+    top hits also carry their page text under ``full_text`` (see ``tools.page_fetcher``).
+    """
+    if prefer_official:
+        queries = await asyncio.to_thread(adaptive_market_queries, country, segment, widen=widen, stats=stats)
+    else:
+        queries = build_market_queries(country, segment, prefer_official=False, widen=widen)
+
+    outcomes: Dict[str, Dict[str, Any]] = {}
+
+    def _observe(query: str, pages: List[Dict[str, Any]], latency: Optional[float]) -> None:
+        filter_clause = _official_filter(query)
+        if filter_clause is not None:
+            numbers = sum(1 for page in pages if _has_numbers(page))
+            outcomes[filter_clause] = {"hits": len(pages), "numbers": numbers, "latency": latency}
 
-    for query in queries:
-        pages = await search_pages(query=query, k=min(6, max_results))
-        if not pages:
-            continue
-        for page in pages:
-            page.setdefault("query", query)
-        results.extend(pages)
-        if len(results) >= max_results:
-            break
-
-    return results[:max_results]
+    results = await _run_waves(
+        queries,
+        k=market_search_k(max_results),
+        max_results=max_results,
+        wave_size=wave_size,
+        prefetched=prefetched,
+        reused=reused,
+        observe=_observe,
+    )
+    # Only searches that actually succeeded are observed; with no provider configured,
+    # "nothing came back" says nothing about the filters themselves.
+    if provider_chain():
+        await asyncio.to_thread(record_yields, country, segment, outcomes, store=stats)
+    return await attach_full_text(results)
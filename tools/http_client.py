@@ -0,0 +1,180 @@
+"""Registry of pooled, long-lived ``httpx.AsyncClient`` instances per outbound provider."""
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import threading
+import weakref
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional, Set
+
+import httpx
+
+from tools.metrics import InstrumentedTransport
+from tools.resilience import ResilientTransport
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TIMEOUT = float(os.getenv("HTTP_TIMEOUT", 25))
+MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", 100))
+MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("HTTP_MAX_KEEPALIVE", 20))
+KEEPALIVE_EXPIRY = float(os.getenv("HTTP_KEEPALIVE_EXPIRY", 30))
+HTTP2_ENABLED = os.getenv("HTTP2_ENABLED", "1").strip().lower() not in {"0", "false", "no"}
+
+# Provider names used by the outbound tools; each gets its own connection pool.
+PROVIDERS = ("tavily", "brave", "worldbank", "web", "pages", "openai")
+
+_CLIENTS: Dict[str, httpx.AsyncClient] = {}
+_CLIENT_LOOP: Optional[asyncio.AbstractEventLoop] = None
+# Transports that replace the network for a provider (benchmarks, offline replays).
+_TRANSPORTS: Dict[str, httpx.AsyncBaseTransport] = {}
+# Per loop, an async generator whose finalisation closes that loop's clients.
+_LOOP_CLOSERS: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Any]" = weakref.WeakKeyDictionary()
+_BACKGROUND: Set["asyncio.Future[Any]"] = set()
+
+
+def _http2_available() -> bool:
+    if not HTTP2_ENABLED:
+        return False
+    try:
+        import h2  # type: ignore  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def _limits() -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=MAX_CONNECTIONS,
+        max_keepalive_connections=MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=KEEPALIVE_EXPIRY,
+    )
+
+
+def register_transport(name: str, transport: Optional[httpx.AsyncBaseTransport]) -> None:
+    """Route every request of provider ``name`` through ``transport`` (``None`` restores the network).
+
+    Already-built clients for ``name`` are dropped so the next ``get_client`` picks it up.
+    """
+    if transport is None:
+        _TRANSPORTS.pop(name, None)
+    else:
+        _TRANSPORTS[name] = transport
+    client = _CLIENTS.pop(name, None)
+    if client is not None:
+        _discard([client], _CLIENT_LOOP)
+
+
+def _build_client(name: str) -> httpx.AsyncClient:
+    # Retries/rate limits/breaker wrap the instrumented transport, so every attempt is counted.
+    transport = _TRANSPORTS.get(name) or httpx.AsyncHTTPTransport(limits=_limits(), http2=_http2_available())
+    return httpx.AsyncClient(
+        timeout=DEFAULT_TIMEOUT,
+        transport=ResilientTransport(name, InstrumentedTransport(name, transport)),
+    )
+
+
+def _current_loop() -> Optional[asyncio.AbstractEventLoop]:
+    try:
+        return asyncio.get_running_loop()
+    except RuntimeError:
+        return None
+
+
+async def _aclose_all(clients: Iterable[httpx.AsyncClient]) -> None:
+    await asyncio.gather(*(client.aclose() for client in clients), return_exceptions=True)
+
+
+def _discard(clients: List[httpx.AsyncClient], loop: Optional[asyncio.AbstractEventLoop]) -> None:
+    """Close clients dropped from the registry on ``loop``, the loop their connections live on."""
+    clients = [client for client in clients if not client.is_closed]
+    if not clients:
+        return
+    if loop is None or loop.is_closed():
+        # Normally closed by the loop's shutdown hook already; a closed loop can no longer
+        # await anything, so the sockets go with the objects.
+        logger.debug("dropping %d client(s) of a closed event loop", len(clients))
+    elif loop is _current_loop():
+        task = loop.create_task(_aclose_all(clients))
+        _BACKGROUND.add(task)
+        task.add_done_callback(_BACKGROUND.discard)
+    elif loop.is_running():
+        asyncio.run_coroutine_threadsafe(_aclose_all(clients), loop)
+    else:
+        # An idle loop (not running anywhere): drive it briefly off this thread, which may
+        # itself be running another loop.
+        worker = threading.Thread(target=loop.run_until_complete, args=(_aclose_all(clients),))
+        worker.start()
+        worker.join()
+
+
+def _close_at_loop_shutdown(loop: asyncio.AbstractEventLoop) -> None:
+    """Close the pooled clients when ``loop`` finalises its async generators, which
+    ``asyncio.run`` does before closing the loop -- so runs that never call
+    ``shutdown_clients`` do not leave connection pools behind."""
+    if loop in _LOOP_CLOSERS:
+        return
+
+    async def _closer() -> AsyncIterator[None]:
+        try:
+            yield
+        finally:
+            if _CLIENT_LOOP is asyncio.get_running_loop():
+                await shutdown_clients()
+
+    closer = _closer()
+    _LOOP_CLOSERS[loop] = closer
+    # Starting the generator on the loop registers it for ``shutdown_asyncgens``.
+    task = loop.create_task(closer.__anext__())
+    _BACKGROUND.add(task)
+    task.add_done_callback(_BACKGROUND.discard)
+
+
+def get_client(name: str = "web") -> httpx.AsyncClient:
+    """Return the shared client for ``name``, creating it lazily on the running loop.
+
+    Clients are bound to the event loop that created them and are closed when that loop
+    shuts down; when a new loop is in use (e.g. consecutive ``asyncio.run`` calls without
+    a shutdown) any stale pool still open is closed on its own loop and replaced.
+    """
+    global _CLIENT_LOOP
+    loop = _current_loop()
+    if _CLIENT_LOOP is not None and loop is not _CLIENT_LOOP:
+        stale = list(_CLIENTS.values())
+        _CLIENTS.clear()
+        _discard(stale, _CLIENT_LOOP)
+    _CLIENT_LOOP = loop
+
+    client = _CLIENTS.get(name)
+    if client is None or client.is_closed:
+        client = _build_client(name)
+        _CLIENTS[name] = client
+        if loop is not None:
+            _close_at_loop_shutdown(loop)
+    return client
+
+
+async def startup_clients(names: Iterable[str] = PROVIDERS) -> None:
+    """Eagerly create the pooled clients for ``names`` on the running loop."""
+    for name in names:
+        get_client(name)
+
+
+async def shutdown_clients() -> None:
+    """Close every pooled client and forget them."""
+    global _CLIENT_LOOP
+    clients = list(_CLIENTS.values())
+    _CLIENTS.clear()
+    _CLIENT_LOOP = None
+    await asyncio.gather(*(client.aclose() for client in clients), return_exceptions=True)
+
+
+@asynccontextmanager
+async def http_clients(names: Iterable[str] = PROVIDERS) -> AsyncIterator[None]:
+    """Own the pooled clients for the duration of a graph run."""
+    await startup_clients(names)
+    try:
+        yield
+    finally:
+        await shutdown_clients()
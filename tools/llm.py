@@ -1,13 +1,38 @@
 # tools/llm.py
 from __future__ import annotations
+import asyncio
 import os
-from typing import Optional
-from openai import OpenAI
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional
+from openai import AsyncOpenAI, OpenAI
+
+from tools.cache import DiskCache, cache_reads_enabled, cache_writes_enabled, cached_call, get_cache_mode, make_key
+from tools.http_client import get_client
+from tools.metrics import METRICS
+from tools.tracing import traced
 
 # 환경변수 OPENAI_MODEL 미설정 시 경량 모델 기본값
 MODEL = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
+TEMPERATURE = 0.2
+DEFAULT_SYSTEM = "You are a strategy analyst. Write clear, concise Markdown without code fences."
+
+# 동시 호출 수 / 분당 토큰 한도 (0이면 토큰 제한 없음)
+MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", 4))
+TOKENS_PER_MINUTE = int(os.getenv("LLM_TOKENS_PER_MINUTE", 0))
+# 응답 토큰 예산 추정치 (레이트 리밋 계산용)
+EXPECTED_COMPLETION_TOKENS = int(os.getenv("LLM_EXPECTED_COMPLETION_TOKENS", 800))
+
+# 동일 (model, system, prompt, temperature) 완성 결과 디스크 캐시
+COMPLETION_CACHE = DiskCache(
+    "llm",
+    default_ttl=float(os.getenv("LLM_CACHE_TTL", 30 * 24 * 3600)),
+    max_entries=int(os.getenv("LLM_CACHE_MAX_ENTRIES", 20_000)),
+    max_bytes=int(os.getenv("LLM_CACHE_MAX_BYTES", 128 * 1024 * 1024)),
+)
 
 _client: Optional[OpenAI] = None
+_async_client: Optional[AsyncOpenAI] = None
+
 
 def _client_lazy() -> OpenAI:
     global _client
@@ -15,15 +40,219 @@ def _client_lazy() -> OpenAI:
         _client = OpenAI()  # OPENAI_API_KEY 필요
     return _client
 
-def complete_markdown(prompt: str, system: str = "You are a strategy analyst. Write clear, concise Markdown without code fences.") -> str:
+
+def _async_client_lazy() -> AsyncOpenAI:
+    """공유 HTTP 풀(tools.http_client)의 'openai' 클라이언트를 사용하는 AsyncOpenAI."""
+    global _async_client
+    http_client = get_client("openai")
+    if _async_client is None or getattr(_async_client, "_client", None) is not http_client:
+        _async_client = AsyncOpenAI(http_client=http_client)  # OPENAI_API_KEY 필요
+    return _async_client
+
+
+def estimate_tokens(text: str) -> int:
+    """tiktoken이 있으면 정확히, 없으면 문자 기반으로 토큰 수를 추정."""
+    if not text:
+        return 0
+    try:
+        import tiktoken  # type: ignore
+
+        try:
+            encoding = tiktoken.encoding_for_model(MODEL)
+        except KeyError:
+            encoding = tiktoken.get_encoding("cl100k_base")
+        return len(encoding.encode(text))
+    except ImportError:
+        ascii_chars = sum(1 for ch in text if ord(ch) < 128)
+        # 영문은 대략 4자당 1토큰, 한글 등 비ASCII 문자는 문자당 약 1토큰
+        return ascii_chars // 4 + (len(text) - ascii_chars) + 1
+
+
+class _TokenBucket:
+    """분당 토큰 한도를 지키기 위한 단순 토큰 버킷."""
+
+    def __init__(self, tokens_per_minute: int) -> None:
+        self.capacity = float(tokens_per_minute)
+        self.tokens = float(tokens_per_minute)
+        self.rate = tokens_per_minute / 60.0
+        self.updated = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self, amount: int) -> None:
+        # 한 번의 요청이 버킷보다 크면 버킷 전체를 기다린 뒤 진행
+        amount = min(float(amount), self.capacity)
+        while True:
+            self._refill()
+            if self.tokens >= amount:
+                self.tokens -= amount
+                return
+            await asyncio.sleep((amount - self.tokens) / self.rate)
+
+
+class _Limiter:
+    """이벤트 루프별 동시성 세마포어 + 토큰 버킷."""
+
+    def __init__(self) -> None:
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._bucket: Optional[_TokenBucket] = None
+
+    def _bind(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._semaphore = asyncio.Semaphore(max(1, MAX_CONCURRENCY))
+            self._bucket = _TokenBucket(TOKENS_PER_MINUTE) if TOKENS_PER_MINUTE > 0 else None
+
+    def semaphore(self) -> asyncio.Semaphore:
+        self._bind()
+        assert self._semaphore is not None
+        return self._semaphore
+
+    async def reserve(self, tokens: int) -> None:
+        self._bind()
+        if self._bucket is not None:
+            await self._bucket.acquire(tokens)
+
+
+_LIMITER = _Limiter()
+
+
+def _completion_cache() -> DiskCache:
+    """완성 캐시. 키에 모델명이 포함되므로 OPENAI_MODEL이 바뀌어도 비울 필요가 없음(이전 모델 항목은 LRU로 밀려남)."""
+    return COMPLETION_CACHE
+
+
+def _completion_key(prompt: str, system: str) -> str:
+    return make_key("chat.completions", MODEL, system, prompt, TEMPERATURE)
+
+
+def completion_cache_stats() -> Dict[str, Any]:
+    """LLM 완성 캐시의 hit/miss 및 크기 통계."""
+    return _completion_cache().stats()
+
+
+def _record_usage(usage: Any, prompt: str, system: str, completion: str) -> None:
+    """Count prompt/completion tokens, falling back to estimates when the API omits usage."""
+    prompt_tokens = getattr(usage, "prompt_tokens", None)
+    completion_tokens = getattr(usage, "completion_tokens", None)
+    if prompt_tokens is None:
+        prompt_tokens = estimate_tokens(system) + estimate_tokens(prompt)
+    if completion_tokens is None:
+        completion_tokens = estimate_tokens(completion)
+    METRICS.inc("llm_requests_total", model=MODEL)
+    METRICS.inc("llm_prompt_tokens_total", prompt_tokens, model=MODEL)
+    METRICS.inc("llm_completion_tokens_total", completion_tokens, model=MODEL)
+
+
+def _messages(prompt: str, system: str) -> list:
+    return [
+        {"role": "system", "content": system},
+        {"role": "user", "content": prompt},
+    ]
+
+
+@traced("complete_markdown")
+def complete_markdown(prompt: str, system: str = DEFAULT_SYSTEM) -> str:
+    cache = _completion_cache()
+    key = _completion_key(prompt, system)
+    mode = get_cache_mode()
+    if cache_reads_enabled(mode):
+        cached = cache.get(key)
+        if cached:
+            return cached
+
     client = _client_lazy()
     # 최신 SDK 기준 chat.completions가 계속 지원됩니다.
     resp = client.chat.completions.create(
         model=MODEL,
-        messages=[
-            {"role": "system", "content": system},
-            {"role": "user", "content": prompt},
-        ],
-        temperature=0.2,
+        messages=_messages(prompt, system),
+        temperature=TEMPERATURE,
     )
-    return resp.choices[0].message.content or ""
+    content = resp.choices[0].message.content or ""
+    _record_usage(resp.usage, prompt, system, content)
+    if content and cache_writes_enabled(mode):
+        cache.set(key, content, overwrite=mode != "write")
+    return content
+
+
+@traced("acomplete_markdown")
+async def acomplete_markdown(
+    prompt: str,
+    system: str = DEFAULT_SYSTEM,
+    *,
+    stream: bool = False,
+    on_delta: Optional[Callable[[str], None]] = None,
+) -> str:
+    """complete_markdown의 비동기 버전. 전역 동시성/토큰 한도를 지키며 이벤트 루프를 막지 않음.
+
+    stream=True이면 스트리밍으로 받아 조각마다 on_delta를 호출하고 전체 텍스트를 반환.
+    결과는 (model, system, prompt, temperature) 키로 디스크에 캐시되며, 캐시 적중 시
+    스트리밍 요청은 전체 텍스트를 on_delta로 한 번에 전달.
+    """
+    async def _fetch() -> str:
+        return await _acomplete_uncached(prompt, system, stream=stream, on_delta=on_delta)
+
+    cache = _completion_cache()
+    key = _completion_key(prompt, system)
+    if stream and on_delta is not None and cache_reads_enabled():
+        cached = await cache.aget(key)
+        if cached:
+            on_delta(cached)
+            return cached
+    return await cached_call(cache, key, _fetch, should_store=bool)
+
+
+async def _acomplete_uncached(
+    prompt: str,
+    system: str,
+    *,
+    stream: bool,
+    on_delta: Optional[Callable[[str], None]],
+) -> str:
+    client = _async_client_lazy()
+    await _LIMITER.reserve(estimate_tokens(system) + estimate_tokens(prompt) + EXPECTED_COMPLETION_TOKENS)
+    async with _LIMITER.semaphore():
+        if not stream:
+            resp = await client.chat.completions.create(
+                model=MODEL,
+                messages=_messages(prompt, system),
+                temperature=TEMPERATURE,
+            )
+            content = resp.choices[0].message.content or ""
+            _record_usage(resp.usage, prompt, system, content)
+            return content
+
+        parts: List[str] = []
+        response = await client.chat.completions.create(
+            model=MODEL,
+            messages=_messages(prompt, system),
+            temperature=TEMPERATURE,
+            stream=True,
+        )
+        async for chunk in response:
+            if not chunk.choices:
+                continue
+            delta = chunk.choices[0].delta.content or ""
+            if delta:
+                parts.append(delta)
+                if on_delta is not None:
+                    on_delta(delta)
+        content = "".join(parts)
+        _record_usage(None, prompt, system, content)
+        return content
+
+
+async def acomplete_many(
+    prompts: Iterable[str],
+    system: str = DEFAULT_SYSTEM,
+    *,
+    return_exceptions: bool = False,
+) -> List[str]:
+    """여러 프롬프트를 동시에 완성. 순서는 입력 순서를 유지하고 동시성은 전역 한도를 따름."""
+    tasks = [acomplete_markdown(prompt, system) for prompt in prompts]
+    return await asyncio.gather(*tasks, return_exceptions=return_exceptions)  # type: ignore[return-value]
@@ -0,0 +1,359 @@
+"""In-process run metrics (per node and per external call) with JSON, Prometheus and OTel export."""
+from __future__ import annotations
+
+import contextvars
+import json
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, List, Protocol, Tuple
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+_LabelKey = Tuple[Tuple[str, str], ...]
+
+_CURRENT_NODE: contextvars.ContextVar[str] = contextvars.ContextVar("metrics_node", default="-")
+
+
+def current_node() -> str:
+    """Name of the graph node the caller runs under (``"-"`` outside a node)."""
+    return _CURRENT_NODE.get()
+
+
+@contextmanager
+def node_scope(node: str) -> Iterator[None]:
+    """Attribute metrics recorded inside this block to ``node``."""
+    token = _CURRENT_NODE.set(node)
+    try:
+        yield
+    finally:
+        _CURRENT_NODE.reset(token)
+
+
+def _label_key(labels: Dict[str, Any]) -> _LabelKey:
+    labels.setdefault("node", current_node())
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+class MetricsRegistry:
+    """Thread-safe counters, gauges and timing summaries keyed by metric name and labels.
+
+    Every sample is labelled with the current node (see ``node_scope``) unless the caller
+    passes ``node=`` explicitly.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._counters: Dict[str, Dict[_LabelKey, float]] = {}
+        self._gauges: Dict[str, Dict[_LabelKey, float]] = {}
+        self._timings: Dict[str, Dict[_LabelKey, List[float]]] = {}
+
+    def inc(self, name: str, value: float = 1, **labels: Any) -> None:
+        key = _label_key(labels)
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + value
+
+    def set(self, name: str, value: float, **labels: Any) -> None:
+        """Record the latest value of a gauge (e.g. a circuit breaker state)."""
+        key = _label_key(labels)
+        with self._lock:
+            self._gauges.setdefault(name, {})[key] = value
+
+    def gauge(self, name: str, **labels: Any) -> float | None:
+        wanted = {(key, str(value)) for key, value in labels.items()}
+        with self._lock:
+            matches = [v for key, v in self._gauges.get(name, {}).items() if wanted <= set(key)]
+        return matches[-1] if matches else None
+
+    def observe(self, name: str, seconds: float, **labels: Any) -> None:
+        """Record one duration sample; summaries keep count/sum/min/max."""
+        key = _label_key(labels)
+        with self._lock:
+            summary = self._timings.setdefault(name, {}).get(key)
+            if summary is None:
+                self._timings[name][key] = [1, seconds, seconds, seconds]
+            else:
+                summary[0] += 1
+                summary[1] += seconds
+                summary[2] = min(summary[2], seconds)
+                summary[3] = max(summary[3], seconds)
+
+    @contextmanager
+    def timer(self, name: str, **labels: Any) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - started, **labels)
+
+    def value(self, name: str, **labels: Any) -> float:
+        """Sum of a counter over every series matching ``labels``."""
+        wanted = {(key, str(value)) for key, value in labels.items()}
+        with self._lock:
+            return sum(v for key, v in self._counters.get(name, {}).items() if wanted <= set(key))
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counters.clear()
+            self._gauges.clear()
+            self._timings.clear()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """JSON-friendly view of every series."""
+        with self._lock:
+            counters = [
+                {"name": name, "labels": dict(key), "value": value}
+                for name, series in sorted(self._counters.items())
+                for key, value in series.items()
+            ]
+            gauges = [
+                {"name": name, "labels": dict(key), "value": value}
+                for name, series in sorted(self._gauges.items())
+                for key, value in series.items()
+            ]
+            timings = [
+                {
+                    "name": name,
+                    "labels": dict(key),
+                    "count": int(count),
+                    "sum": round(total, 6),
+                    "min": round(low, 6),
+                    "max": round(high, 6),
+                }
+                for name, series in sorted(self._timings.items())
+                for key, (count, total, low, high) in series.items()
+            ]
+        return {"generated_at": time.time(), "counters": counters, "gauges": gauges, "timings": timings}
+
+
+METRICS = MetricsRegistry()
+
+
+# --------------------------------------------------------------------------- exporters
+
+
+class MetricsExporter(Protocol):
+    def export(self, snapshot: Dict[str, Any]) -> None: ...
+
+
+def _prom_escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _prom_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_prom_escape(value)}"' for key, value in sorted(labels.items())) + "}"
+
+
+def to_prometheus(snapshot: Dict[str, Any]) -> str:
+    """Render a snapshot in the Prometheus text exposition format."""
+    lines: List[str] = []
+    seen: set[str] = set()
+    for sample in snapshot["counters"]:
+        name = sample["name"]
+        if name not in seen:
+            seen.add(name)
+            lines.append(f"# TYPE {name} counter")
+        lines.append(f"{name}{_prom_labels(sample['labels'])} {sample['value']}")
+    for sample in snapshot.get("gauges", []):
+        name = sample["name"]
+        if name not in seen:
+            seen.add(name)
+            lines.append(f"# TYPE {name} gauge")
+        lines.append(f"{name}{_prom_labels(sample['labels'])} {sample['value']}")
+    for sample in snapshot["timings"]:
+        name = sample["name"]
+        if name not in seen:
+            seen.add(name)
+            lines.append(f"# TYPE {name} summary")
+        labels = _prom_labels(sample["labels"])
+        lines.append(f"{name}_count{labels} {sample['count']}")
+        lines.append(f"{name}_sum{labels} {sample['sum']}")
+    return "\n".join(lines) + "\n"
+
+
+class JsonExporter:
+    def __init__(self, path: Path) -> None:
+        self.path = Path(path)
+
+    def export(self, snapshot: Dict[str, Any]) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.path.write_text(json.dumps(snapshot, ensure_ascii=False, indent=2), encoding="utf-8")
+
+
+class PrometheusTextExporter:
+    def __init__(self, path: Path) -> None:
+        self.path = Path(path)
+
+    def export(self, snapshot: Dict[str, Any]) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.path.write_text(to_prometheus(snapshot), encoding="utf-8")
+
+
+class LocalOtelStub:
+    """Stand-in for an OpenTelemetry meter when the SDK is not installed; keeps data points in memory."""
+
+    def __init__(self) -> None:
+        self.points: List[Dict[str, Any]] = []
+
+    def record(self, kind: str, name: str, value: float, attributes: Dict[str, str]) -> None:
+        self.points.append({"kind": kind, "name": name, "value": value, "attributes": attributes})
+
+
+class OpenTelemetryExporter:
+    """Push counters and timing sums through an OpenTelemetry meter (or ``LocalOtelStub``)."""
+
+    def __init__(self, meter: Any = None) -> None:
+        if meter is None:
+            try:
+                from opentelemetry import metrics as otel_metrics  # type: ignore
+
+                meter = otel_metrics.get_meter("skala.report")
+            except ImportError:
+                meter = LocalOtelStub()
+        self.meter = meter
+        self._instruments: Dict[str, Any] = {}
+
+    def _instrument(self, kind: str, name: str) -> Any:
+        if name not in self._instruments:
+            factory = {
+                "counter": self.meter.create_counter,
+                "gauge": getattr(self.meter, "create_gauge", None),
+                "histogram": self.meter.create_histogram,
+            }[kind]
+            self._instruments[name] = factory(name) if factory else None
+        return self._instruments[name]
+
+    def export(self, snapshot: Dict[str, Any]) -> None:
+        if isinstance(self.meter, LocalOtelStub):
+            for sample in snapshot["counters"]:
+                self.meter.record("counter", sample["name"], sample["value"], sample["labels"])
+            for sample in snapshot.get("gauges", []):
+                self.meter.record("gauge", sample["name"], sample["value"], sample["labels"])
+            for sample in snapshot["timings"]:
+                self.meter.record("histogram", sample["name"], sample["sum"], sample["labels"])
+            return
+        for sample in snapshot["counters"]:
+            self._instrument("counter", sample["name"]).add(sample["value"], attributes=sample["labels"])
+        for sample in snapshot.get("gauges", []):
+            gauge = self._instrument("gauge", sample["name"])  # needs an SDK with synchronous gauges
+            if gauge is not None:
+                gauge.set(sample["value"], attributes=sample["labels"])
+        for sample in snapshot["timings"]:
+            self._instrument("histogram", sample["name"]).record(sample["sum"], attributes=sample["labels"])
+
+
+EXPORTER_FORMATS = ("json", "prometheus", "otel")
+
+
+def build_exporters(formats: List[str], out_dir: Path, run_id: str) -> List[MetricsExporter]:
+    exporters: List[MetricsExporter] = []
+    for fmt in formats:
+        if fmt == "json":
+            exporters.append(JsonExporter(out_dir / f"metrics_{run_id}.json"))
+        elif fmt == "prometheus":
+            exporters.append(PrometheusTextExporter(out_dir / f"metrics_{run_id}.prom"))
+        elif fmt == "otel":
+            exporters.append(OpenTelemetryExporter())
+        else:
+            raise ValueError(f"Unknown metrics format: {fmt!r} (expected one of {', '.join(EXPORTER_FORMATS)})")
+    return exporters
+
+
+def export_metrics(exporters: List[MetricsExporter], registry: MetricsRegistry = METRICS) -> Dict[str, Any]:
+    snapshot = registry.snapshot()
+    for exporter in exporters:
+        try:
+            exporter.export(snapshot)
+        except Exception:
+            logger.exception("metrics export failed via %s", type(exporter).__name__)
+    return snapshot
+
+
+def summarize(snapshot: Dict[str, Any]) -> Dict[str, Dict[str, float]]:
+    """Per-provider HTTP totals (requests, bytes, seconds) for a one-line run summary."""
+    summary: Dict[str, Dict[str, float]] = {}
+    for sample in snapshot["counters"]:
+        provider = sample["labels"].get("provider")
+        if provider and sample["name"] in ("http_requests_total", "http_response_bytes_total"):
+            entry = summary.setdefault(provider, {"requests": 0, "bytes": 0, "seconds": 0.0})
+            entry["requests" if sample["name"] == "http_requests_total" else "bytes"] += sample["value"]
+    for sample in snapshot["timings"]:
+        provider = sample["labels"].get("provider")
+        if provider and sample["name"] == "http_request_seconds":
+            summary.setdefault(provider, {"requests": 0, "bytes": 0, "seconds": 0.0})["seconds"] += sample["sum"]
+    return summary
+
+
+# --------------------------------------------------------------------------- httpx instrumentation
+
+
+class _CountingStream(httpx.AsyncByteStream):
+    """Response body wrapper that reports the bytes read once the body is closed."""
+
+    def __init__(self, stream: httpx.AsyncByteStream, on_close: Callable[[int], None]) -> None:
+        self._stream = stream
+        self._on_close = on_close
+        self._bytes = 0
+        self._closed = False
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        async for chunk in self._stream:
+            self._bytes += len(chunk)
+            yield chunk
+
+    async def aclose(self) -> None:
+        try:
+            await self._stream.aclose()
+        finally:
+            if not self._closed:
+                self._closed = True
+                self._on_close(self._bytes)
+
+
+class InstrumentedTransport(httpx.AsyncBaseTransport):
+    """Transport wrapper counting requests, bytes and wall time per provider and node."""
+
+    def __init__(self, provider: str, transport: httpx.AsyncBaseTransport, registry: MetricsRegistry = METRICS) -> None:
+        self.provider = provider
+        self._transport = transport
+        self._registry = registry
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        node = current_node()
+        labels = {"provider": self.provider, "node": node}
+        started = time.perf_counter()
+        try:
+            response = await self._transport.handle_async_request(request)
+        except Exception as exc:
+            self._registry.inc("http_errors_total", error=type(exc).__name__, **labels)
+            self._registry.observe("http_request_seconds", time.perf_counter() - started, **labels)
+            raise
+
+        self._registry.inc("http_requests_total", status=response.status_code, **labels)
+        try:
+            sent = len(request.content)
+        except httpx.RequestNotRead:  # streamed upload; size unknown
+            sent = 0
+        self._registry.inc("http_request_bytes_total", sent, **labels)
+
+        def _finished(num_bytes: int) -> None:
+            self._registry.inc("http_response_bytes_total", num_bytes, **labels)
+            self._registry.observe("http_request_seconds", time.perf_counter() - started, **labels)
+
+        assert isinstance(response.stream, httpx.AsyncByteStream)
+        return httpx.Response(
+            status_code=response.status_code,
+            headers=response.headers,
+            stream=_CountingStream(response.stream, _finished),
+            extensions=response.extensions,
+        )
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
@@ -0,0 +1,223 @@
+"""Optional full-text stage: download the top search hits and extract their main text.
+
+Search providers only return short snippets, which often miss the market-size/CAGR figures
+and regulatory wording the parsers look for. When ``web_search.full_text.enabled`` (or
+``FULL_TEXT_ENABLED=1``) is set, ``attach_full_text`` fetches the first ``top_n`` result URLs
+concurrently -- bounded overall and per host, with a byte cap and timeout, through their own
+``pages`` client whose failures never trip a breaker shared with other calls -- and stores the
+extracted text under each page's ``full_text`` key. Documents are cached by URL and
+revalidated with their ETag/Last-Modified once they are older than ``PAGE_FRESH_SECONDS``.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import re
+import time
+import weakref
+from typing import Any, Dict, Iterable, List, Optional
+from urllib.parse import urlsplit
+
+import httpx
+from bs4 import BeautifulSoup
+
+from tools.cache import DiskCache, cache_reads_enabled, cache_writes_enabled, make_key
+from tools.coalesce import coalesce
+from tools.config import load_sources
+from tools.http_client import get_client
+from tools.metrics import METRICS
+from tools.tracing import traced
+
+try:  # lxml is several times faster than the stdlib parser on large pages
+    import lxml  # noqa: F401
+
+    HTML_PARSER = "lxml"
+except ImportError:
+    HTML_PARSER = "html.parser"
+
+logger = logging.getLogger(__name__)
+
+PAGE_CACHE = DiskCache(
+    "pages",
+    default_ttl=float(os.getenv("PAGE_CACHE_TTL", 30 * 24 * 3600)),
+    max_entries=int(os.getenv("PAGE_CACHE_MAX_ENTRIES", 5_000)),
+)
+# Cached documents younger than this are served without revalidating.
+PAGE_FRESH_SECONDS = float(os.getenv("PAGE_FRESH_SECONDS", 24 * 3600))
+
+DEFAULT_FULL_TEXT_SETTINGS: Dict[str, Any] = {
+    "enabled": False,
+    "top_n": 3,
+    "max_bytes": 1_000_000,
+    "timeout": 10.0,
+    "per_host": 2,
+    "concurrency": 8,
+    "max_chars": 20_000,
+}
+
+_TEXT_TYPES = {"text/html", "application/xhtml+xml", "text/plain"}
+_BOILERPLATE_TAGS = [
+    "script", "style", "noscript", "template", "svg", "iframe", "nav", "header", "footer", "aside", "form",
+]
+# Below this many characters an <article>/<main> is probably a teaser; use the whole body.
+_MIN_MAIN_CHARS = 200
+_WHITESPACE = re.compile(r"\s+")
+
+
+def full_text_settings() -> Dict[str, Any]:
+    """``web_search.full_text`` from ``sources.yaml`` over the defaults; ``FULL_TEXT_ENABLED`` wins."""
+    section = (load_sources().get("web_search") or {}).get("full_text") or {}
+    settings = dict(DEFAULT_FULL_TEXT_SETTINGS)
+    settings.update({key: value for key, value in section.items() if key in DEFAULT_FULL_TEXT_SETTINGS})
+    env = os.getenv("FULL_TEXT_ENABLED")
+    if env is not None:
+        settings["enabled"] = env.strip().lower() in {"1", "true", "yes", "on"}
+    return settings
+
+
+def extract_main_text(html: str, *, max_chars: int = DEFAULT_FULL_TEXT_SETTINGS["max_chars"]) -> str:
+    """Visible text of the page's ``<article>``/``<main>`` (else ``<body>``), boilerplate removed."""
+    if not html:
+        return ""
+    soup = BeautifulSoup(html, HTML_PARSER)
+    for tag in soup(_BOILERPLATE_TAGS):
+        tag.decompose()
+    body = soup.body or soup
+    text = ""
+    for candidate in (soup.find("article"), soup.find("main")):
+        if candidate is not None:
+            text = " ".join(candidate.stripped_strings)
+            if len(text) >= _MIN_MAIN_CHARS:
+                break
+    if len(text) < _MIN_MAIN_CHARS:
+        text = " ".join(body.stripped_strings)
+    return _WHITESPACE.sub(" ", text).strip()[:max_chars]
+
+
+class _FetchLimits:
+    """Overall and per-host semaphores for one event loop."""
+
+    def __init__(self, concurrency: int, per_host: int) -> None:
+        self.total = asyncio.Semaphore(max(1, concurrency))
+        self.per_host = max(1, per_host)
+        self._hosts: Dict[str, asyncio.Semaphore] = {}
+
+    def host(self, name: str) -> asyncio.Semaphore:
+        if name not in self._hosts:
+            self._hosts[name] = asyncio.Semaphore(self.per_host)
+        return self._hosts[name]
+
+
+_LIMITS: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, _FetchLimits]" = weakref.WeakKeyDictionary()
+
+
+def _limits(settings: Dict[str, Any]) -> _FetchLimits:
+    loop = asyncio.get_running_loop()
+    limits = _LIMITS.get(loop)
+    if limits is None:
+        limits = _LIMITS[loop] = _FetchLimits(int(settings["concurrency"]), int(settings["per_host"]))
+    return limits
+
+
+async def _store(key: str, url: str, text: str, response: Optional[httpx.Response]) -> None:
+    if not cache_writes_enabled():
+        return
+    headers = response.headers if response is not None else {}
+    await PAGE_CACHE.aset(
+        key,
+        {
+            "url": url,
+            "text": text,
+            "etag": headers.get("etag"),
+            "last_modified": headers.get("last-modified"),
+            "fetched": time.time(),
+        },
+    )
+
+
+@traced("fetch_document")
+@coalesce(lambda url, settings: url)
+async def fetch_document(url: str, settings: Dict[str, Any]) -> Optional[str]:
+    """Return the main text of ``url`` (cached/revalidated), or ``None`` if unavailable.
+
+    Non-text content types are skipped and bodies are cut at ``settings['max_bytes']``.
+    """
+    key = make_key("page", url)
+    cached = await PAGE_CACHE.aget(key) if cache_reads_enabled() else None
+    if cached and time.time() - cached.get("fetched", 0) < PAGE_FRESH_SECONDS:
+        METRICS.inc("full_text_fetches_total", outcome="cached")
+        return cached["text"]
+
+    headers: Dict[str, str] = {}
+    if cached and cached.get("etag"):
+        headers["If-None-Match"] = cached["etag"]
+    if cached and cached.get("last_modified"):
+        headers["If-Modified-Since"] = cached["last_modified"]
+
+    max_bytes = int(settings["max_bytes"])
+    limits = _limits(settings)
+    body = bytearray()
+    async with limits.total, limits.host(urlsplit(url).hostname or ""):
+        try:
+            request = get_client("pages").stream("GET", url, headers=headers, timeout=float(settings["timeout"]))
+            async with request as response:
+                if response.status_code == 304 and cached:
+                    METRICS.inc("full_text_fetches_total", outcome="revalidated")
+                    await _store(key, url, cached["text"], response)
+                    return cached["text"]
+                response.raise_for_status()
+                content_type = response.headers.get("content-type", "").split(";")[0].strip().lower()
+                if content_type and content_type not in _TEXT_TYPES:
+                    METRICS.inc("full_text_fetches_total", outcome="skipped")
+                    return None
+                async for chunk in response.aiter_bytes():
+                    body.extend(chunk)
+                    if len(body) >= max_bytes:
+                        METRICS.inc("full_text_truncated_total")
+                        break
+                encoding = response.charset_encoding or "utf-8"
+        except httpx.HTTPError as exc:
+            logger.debug("full-text fetch failed for %s: %s", url, exc)
+            METRICS.inc("full_text_fetches_total", outcome="error")
+            return cached["text"] if cached else None
+
+    try:
+        raw = bytes(body[:max_bytes]).decode(encoding, errors="replace")
+    except LookupError:  # unknown charset label
+        raw = bytes(body[:max_bytes]).decode("utf-8", errors="replace")
+    max_chars = int(settings["max_chars"])
+    if content_type == "text/plain":
+        text = _WHITESPACE.sub(" ", raw).strip()[:max_chars]
+    else:
+        text = await asyncio.to_thread(extract_main_text, raw, max_chars=max_chars)
+    METRICS.inc("full_text_fetches_total", outcome="fetched")
+    await _store(key, url, text, response)
+    return text
+
+
+def _is_http(url: Any) -> bool:
+    return isinstance(url, str) and urlsplit(url).scheme in {"http", "https"}
+
+
+async def attach_full_text(
+    pages: Iterable[Dict[str, Any]],
+    *,
+    settings: Optional[Dict[str, Any]] = None,
+) -> List[Dict[str, Any]]:
+    """Return copies of ``pages`` with ``full_text`` added to the first ``top_n`` fetchable hits.
+
+    A no-op (plain copies) while the stage is disabled; failed fetches leave pages unchanged.
+    """
+    settings = settings or full_text_settings()
+    pages = [dict(page) for page in pages or []]
+    if not settings["enabled"]:
+        return pages
+    targets = [page for page in pages if _is_http(page.get("url"))][: int(settings["top_n"])]
+    texts = await asyncio.gather(*(fetch_document(page["url"], settings) for page in targets), return_exceptions=True)
+    for page, text in zip(targets, texts):
+        if isinstance(text, asyncio.CancelledError):
+            raise text
+        if isinstance(text, str) and text:
+            page["full_text"] = text
+    return pages
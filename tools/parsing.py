@@ -4,9 +4,27 @@ from __future__ import annotations
 import re
 from typing import Any, Dict, Iterable, List, Optional, Tuple
 
-USD_PATTERN = re.compile(r"\$?\s*([\d,.]+)\s*(trillion|billion|million|tn|bn|m|k)?", re.IGNORECASE)
+USD_PATTERN = re.compile(r"\$?\s*([\d,.]+)\s*(trillion|billion|million|tn|bn|m|k)?\b", re.IGNORECASE)
 CAGR_PATTERN = re.compile(r"(\d+(?:\.\d+)?)\s*%\s*(?:CAGR)?", re.IGNORECASE)
 PERIOD_PATTERN = re.compile(r"(20\d{2})\D+(20\d{2})")
+SENTENCE_SPLIT = re.compile(r"(?<=[.!?])\s+|\n+")
+# Full-text sentences worth parsing for market figures: a market term and a money/rate marker.
+MARKET_TERMS = re.compile(r"\b(market|industry|sector|revenue|valued|cagr)\b", re.IGNORECASE)
+MARKET_FIGURE_HINT = re.compile(r"(\$|\busd\b|\bbillion\b|\bmillion\b|\btrillion\b|\bbn\b|%)", re.IGNORECASE)
+# Full text is full of years, page numbers, phone numbers and shares, so its figures need an
+# explicit currency marker and its percentages a growth word close by.
+FULL_TEXT_USD_PATTERN = re.compile(
+    r"(?:(?:US\$|\$|\bUSD)\s*([\d,.]*\d)\s*(trillion|billion|million|tn|bn|m|k)?\b"
+    r"|\b([\d,.]*\d)\s*(trillion|billion|million|tn|bn|m|k)?\s*(?:USD|US dollars)\b)",
+    re.IGNORECASE,
+)
+FULL_TEXT_CAGR_PATTERN = re.compile(
+    r"(?:\b(?:cagr|growth|grow(?:s|ing)?|annual(?:ly)?)\b[^%.]{0,40}?(\d+(?:\.\d+)?)\s*%"
+    r"|(\d+(?:\.\d+)?)\s*%[^%.]{0,40}?\b(?:cagr|growth|annual(?:ly)?|a year|per year)\b)",
+    re.IGNORECASE,
+)
+# No real market is smaller than this.
+MIN_FULL_TEXT_MARKET_USD = 1_000_000
 
 
 def _normalize_usd(value: str, multiplier: Optional[str]) -> Optional[float]:
@@ -60,6 +78,38 @@ def extract_numbers(text: str) -> Dict[str, Optional[Any]]:
     return {"usd": usd_value, "cagr_pct": cagr_value, "period": period_value}
 
 
+def relevant_sentences(text: str, *patterns: "re.Pattern[str]", limit: int = 20, max_len: int = 400) -> List[str]:
+    """Sentences of ``text`` matching every pattern, in order, at most ``limit`` of them."""
+    out: List[str] = []
+    for sentence in SENTENCE_SPLIT.split(text or ""):
+        sentence = sentence.strip()
+        if sentence and all(pattern.search(sentence) for pattern in patterns):
+            out.append(sentence[:max_len])
+            if len(out) >= limit:
+                break
+    return out
+
+
+def extract_full_text_numbers(sentence: str) -> Dict[str, Optional[Any]]:
+    """Stricter ``extract_numbers`` for fetched page text: currency-marked sizes, growth-marked rates."""
+    usd_value: Optional[float] = None
+    for match in FULL_TEXT_USD_PATTERN.finditer(sentence):
+        value, multiplier = (match.group(1), match.group(2)) if match.group(1) else (match.group(3), match.group(4))
+        candidate = _normalize_usd(value, multiplier)
+        if candidate is not None and candidate >= MIN_FULL_TEXT_MARKET_USD:
+            usd_value = candidate
+            break
+
+    cagr_value: Optional[float] = None
+    match = FULL_TEXT_CAGR_PATTERN.search(sentence)
+    if match:
+        cagr_value = float(match.group(1) or match.group(2))
+
+    period_match = PERIOD_PATTERN.search(sentence)
+    period_value = "-".join(period_match.groups()) if period_match else None
+    return {"usd": usd_value, "cagr_pct": cagr_value, "period": period_value}
+
+
 def extract_barrier_evidence(pages: Iterable[Dict[str, Any]], prompt: str) -> Tuple[Dict[str, Any], List[Dict[str, str]]]:
     """Transform raw search results into structured barrier hints."""
     barriers = {
@@ -87,6 +137,9 @@ def extract_market_numbers(reports: Iterable[Dict[str, Any]]) -> Tuple[Optional[
     cagr: Optional[float] = None
     period: Optional[str] = None
     evidence: List[Dict[str, str]] = []
+    full_text_size: Optional[float] = None
+    full_text_cagr: Optional[float] = None
+    full_text_period: Optional[str] = None
 
     for report in reports or []:
         text = " ".join(
@@ -107,6 +160,25 @@ def extract_market_numbers(reports: Iterable[Dict[str, Any]]) -> Tuple[Optional[
         if url and text:
             evidence.append({"fact": text[:220], "source_url": url})
 
+        # Fetched page text (see ``tools.page_fetcher``): only market sentences quoting a figure.
+        cited = 0
+        for sentence in relevant_sentences(report.get("full_text") or "", MARKET_TERMS, MARKET_FIGURE_HINT):
+            numbers = extract_full_text_numbers(sentence)
+            if numbers["usd"] is None and numbers["cagr_pct"] is None:
+                continue
+            full_text_size = full_text_size if full_text_size is not None else numbers["usd"]
+            full_text_cagr = full_text_cagr if full_text_cagr is not None else numbers["cagr_pct"]
+            full_text_period = full_text_period or numbers["period"]
+            if url and cited < 2:
+                evidence.append({"fact": sentence[:220], "source_url": url})
+                cited += 1
+
+    # Snippet figures win; full text only fills gaps, first (highest-ranked) mention first.
+    if market_size is None:
+        market_size = full_text_size
+    if cagr is None:
+        cagr = full_text_cagr
+    period = period or full_text_period
     return market_size, cagr, period, evidence
 
 
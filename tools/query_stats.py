@@ -0,0 +1,234 @@
+"""Persistent yield statistics for the ``site:`` filters used in market-report queries.
+
+Every executed official-filter query records how many pages it returned, how many of them
+carried a parseable number (USD size or CAGR) and how long it took, keyed by
+(country, segment, filter). ``plan_filters`` turns those counts into an epsilon-greedy policy:
+productive filters go first, filters that keep returning nothing are skipped (but still
+explored at ``exploration`` rate), and a country left with too few live filters gets the
+broader widened queries instead.
+"""
+from __future__ import annotations
+
+import logging
+import os
+import random
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+from tools.cache import CACHE_DIR, cache_reads_enabled, cache_writes_enabled, make_key
+from tools.config import load_sources
+from tools.metrics import METRICS
+
+logger = logging.getLogger(__name__)
+
+QUERY_STATS_PATH = Path(os.getenv("QUERY_STATS_PATH", CACHE_DIR / "query_stats.sqlite3"))
+
+DEFAULT_EXPLORATION = 0.1
+DEFAULT_MIN_TRIALS = 3
+DEFAULT_MIN_FILTERS = 2
+# The exploration draw is re-seeded every this many seconds (see ``plan_filters``).
+DEFAULT_RESEED_SECONDS = 3600
+# A page without numbers is still worth a little: it may carry barrier evidence.
+HIT_WEIGHT = 0.1
+
+
+@dataclass
+class FilterYield:
+    runs: int = 0
+    hits: int = 0
+    numbers: int = 0
+    latency_total: float = 0.0
+    latency_samples: int = 0
+
+    @property
+    def mean_latency(self) -> Optional[float]:
+        return self.latency_total / self.latency_samples if self.latency_samples else None
+
+    @property
+    def score(self) -> float:
+        """Expected value per query; one optimistic pseudo-run puts unseen filters first."""
+        return (self.numbers + HIT_WEIGHT * self.hits + 1.0) / (self.runs + 1)
+
+    def exhausted(self, min_trials: int) -> bool:
+        return self.runs >= min_trials and self.hits == 0
+
+
+@dataclass
+class FilterPlan:
+    """Official filters to query in order, the ones skipped this run, and whether to widen."""
+
+    filters: List[str]
+    skipped: List[str] = field(default_factory=list)
+    widen: bool = False
+
+
+class QueryYieldStore:
+    """SQLite table of cumulative per-(country, segment, filter) query yields."""
+
+    def __init__(self, path: Optional[Path] = None) -> None:
+        self.path = Path(path) if path else QUERY_STATS_PATH
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.path), check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS query_yield (
+                    country TEXT NOT NULL,
+                    segment TEXT NOT NULL,
+                    filter TEXT NOT NULL,
+                    runs INTEGER NOT NULL DEFAULT 0,
+                    hits INTEGER NOT NULL DEFAULT 0,
+                    numbers INTEGER NOT NULL DEFAULT 0,
+                    latency_total REAL NOT NULL DEFAULT 0,
+                    latency_samples INTEGER NOT NULL DEFAULT 0,
+                    updated REAL NOT NULL,
+                    PRIMARY KEY (country, segment, filter)
+                )
+                """
+            )
+            self._conn = conn
+        return self._conn
+
+    def stats(self, country: str, segment: str) -> Dict[str, FilterYield]:
+        with self._lock:
+            rows = self._connection().execute(
+                "SELECT filter, runs, hits, numbers, latency_total, latency_samples FROM query_yield"
+                " WHERE country=? AND segment=?",
+                (country.lower(), segment.lower()),
+            ).fetchall()
+        return {row[0]: FilterYield(*row[1:]) for row in rows}
+
+    def record(
+        self,
+        country: str,
+        segment: str,
+        filter_clause: str,
+        *,
+        hits: int,
+        numbers: int,
+        latency: Optional[float] = None,
+    ) -> None:
+        """Add one executed query's outcome; ``latency`` is omitted for prefetched results."""
+        with self._lock:
+            self._connection().execute(
+                """
+                INSERT INTO query_yield VALUES (?, ?, ?, 1, ?, ?, ?, ?, ?)
+                ON CONFLICT (country, segment, filter) DO UPDATE SET
+                    runs = runs + 1,
+                    hits = hits + excluded.hits,
+                    numbers = numbers + excluded.numbers,
+                    latency_total = latency_total + excluded.latency_total,
+                    latency_samples = latency_samples + excluded.latency_samples,
+                    updated = excluded.updated
+                """,
+                (
+                    country.lower(),
+                    segment.lower(),
+                    filter_clause,
+                    hits,
+                    numbers,
+                    latency or 0.0,
+                    int(latency is not None),
+                    time.time(),
+                ),
+            )
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+QUERY_STATS = QueryYieldStore()
+
+
+def adaptive_settings() -> Dict[str, Any]:
+    """``market_queries`` from ``sources.yaml``: ``adaptive``, ``exploration``, ``min_trials``,
+    ``min_filters`` and ``reseed_seconds``."""
+    section = load_sources().get("market_queries") or {}
+    return {
+        "adaptive": bool(section.get("adaptive", True)),
+        "exploration": float(section.get("exploration", DEFAULT_EXPLORATION)),
+        "min_trials": int(section.get("min_trials", DEFAULT_MIN_TRIALS)),
+        "min_filters": int(section.get("min_filters", DEFAULT_MIN_FILTERS)),
+        "reseed_seconds": float(section.get("reseed_seconds", DEFAULT_RESEED_SECONDS)),
+    }
+
+
+def _seed_window(seconds: float) -> int:
+    return int(time.time() // max(1.0, seconds))
+
+
+def plan_filters(
+    country: str,
+    segment: str,
+    filters: Sequence[str],
+    *,
+    store: Optional[QueryYieldStore] = None,
+    settings: Optional[Dict[str, Any]] = None,
+) -> FilterPlan:
+    """Order ``filters`` by observed yield and drop the exhausted ones (see module docstring).
+
+    The exploration draw is seeded from the stats and the current ``reseed_seconds`` window,
+    so the search planner and the fetcher get the same plan within a run, while skipped
+    filters still get a fresh draw later even when nothing new was recorded in between.
+    """
+    settings = settings or adaptive_settings()
+    if not settings["adaptive"] or not cache_reads_enabled():
+        return FilterPlan(list(filters))
+    try:
+        stats = (store or QUERY_STATS).stats(country, segment)
+    except sqlite3.Error as exc:
+        logger.warning("query stats unavailable: %s", exc)
+        return FilterPlan(list(filters))
+
+    window = _seed_window(settings.get("reseed_seconds", DEFAULT_RESEED_SECONDS))
+    rng = random.Random(make_key(country, segment, window, sorted((name, s.runs) for name, s in stats.items())))
+    position = {name: index for index, name in enumerate(filters)}
+    ranked = sorted(
+        filters,
+        key=lambda name: (
+            -stats.get(name, FilterYield()).score,
+            stats.get(name, FilterYield()).mean_latency or 0.0,
+            position[name],
+        ),
+    )
+    plan = FilterPlan([])
+    for name in ranked:
+        explored = rng.random() < settings["exploration"]
+        if stats.get(name, FilterYield()).exhausted(settings["min_trials"]) and not explored:
+            plan.skipped.append(name)
+        else:
+            plan.filters.append(name)
+    live = [name for name in plan.filters if not stats.get(name, FilterYield()).exhausted(settings["min_trials"])]
+    plan.widen = len(live) < settings["min_filters"]
+    if plan.skipped:
+        METRICS.inc("market_filters_skipped_total", len(plan.skipped))
+    return plan
+
+
+def record_yields(
+    country: str,
+    segment: str,
+    outcomes: Dict[str, Dict[str, Any]],
+    *,
+    store: Optional[QueryYieldStore] = None,
+) -> None:
+    """Persist ``{filter: {"hits", "numbers", "latency"}}`` for the queries that completed."""
+    if not outcomes or not cache_writes_enabled():
+        return
+    try:
+        for filter_clause, outcome in outcomes.items():
+            (store or QUERY_STATS).record(country, segment, filter_clause, **outcome)
+    except sqlite3.Error as exc:
+        logger.warning("query stats not recorded: %s", exc)
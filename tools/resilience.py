@@ -0,0 +1,298 @@
+"""Resilient outbound transport: jittered retries, per-provider rate limits and circuit breakers.
+
+``ResilientTransport`` sits under every pooled client in ``tools.http_client``. Limiter and
+breaker state is per provider and process-wide, so it survives clients being rebuilt for a
+new event loop. Retry counts, limiter waits and breaker states are exported via ``METRICS``.
+"""
+from __future__ import annotations
+
+import asyncio
+import email.utils
+import logging
+import os
+import random
+import threading
+import time
+from dataclasses import dataclass, fields, replace
+from typing import Any, Dict, FrozenSet, Optional, Union
+
+import httpx
+
+from tools.config import load_settings
+from tools.metrics import METRICS
+
+logger = logging.getLogger(__name__)
+
+RETRYABLE_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+# Numeric breaker states for the ``circuit_breaker_state`` gauge.
+CLOSED, HALF_OPEN, OPEN = "closed", "half_open", "open"
+_STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+
+@dataclass(frozen=True)
+class ProviderPolicy:
+    """Retry, rate-limit and breaker settings for one provider (``rate=0`` disables throttling)."""
+
+    max_retries: int = int(os.getenv("HTTP_MAX_RETRIES", 3))
+    backoff_base: float = float(os.getenv("HTTP_BACKOFF_BASE", 0.5))
+    backoff_max: float = float(os.getenv("HTTP_BACKOFF_MAX", 20))
+    rate: float = 0.0
+    burst: float = 0.0
+    failure_threshold: int = int(os.getenv("HTTP_BREAKER_THRESHOLD", 5))
+    reset_timeout: float = float(os.getenv("HTTP_BREAKER_RESET", 30))
+    breaker: bool = True
+    retry_statuses: FrozenSet[int] = RETRYABLE_STATUSES
+
+
+# Built-in per-provider adjustments, applied after ``resilience.default``. The OpenAI SDK
+# already retries 429/5xx honouring Retry-After, so its transport only throttles and breaks.
+# Full-text page fetches hit arbitrary third-party hosts: a few dead ones say nothing about
+# the next, so they get no breaker and a single retry.
+PROVIDER_OVERRIDES: Dict[str, Dict[str, Any]] = {
+    "openai": {"max_retries": 0},
+    "pages": {"breaker": False, "max_retries": 1},
+}
+
+
+def policy_for(provider: str) -> ProviderPolicy:
+    """Defaults overlaid with ``resilience.default``, built-in overrides and ``resilience.<provider>``."""
+    section = load_settings().get("resilience") or {}
+    policy = ProviderPolicy()
+    known = {f.name for f in fields(ProviderPolicy)}
+    for overrides in (section.get("default"), PROVIDER_OVERRIDES.get(provider), section.get(provider)):
+        if not isinstance(overrides, dict):
+            continue
+        values: Dict[str, Any] = {key: value for key, value in overrides.items() if key in known}
+        if "retry_statuses" in values:
+            values["retry_statuses"] = frozenset(int(code) for code in values["retry_statuses"])
+        policy = replace(policy, **values)
+    return policy
+
+
+class CircuitOpenError(httpx.TransportError):
+    """Raised without touching the network while a provider's breaker is open."""
+
+
+class RateLimiter:
+    """Token bucket shared by every event loop; callers reserve a slot and sleep until it is due."""
+
+    def __init__(self, provider: str, rate: float, burst: float = 0.0) -> None:
+        self.provider = provider
+        self.rate = rate
+        self.capacity = max(1.0, burst or rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """Take one token (possibly going into debt) and return how long to wait for it."""
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= 1
+            wait = 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+        METRICS.set("rate_limiter_tokens", round(self.tokens, 3), provider=self.provider, node="-")
+        return wait
+
+    async def acquire(self) -> None:
+        wait = self.reserve()
+        if wait > 0:
+            METRICS.observe("rate_limiter_wait_seconds", wait, provider=self.provider)
+            await asyncio.sleep(wait)
+
+
+class _NoBreaker:
+    """Stand-in for providers with ``breaker: false``: always closed, records nothing."""
+
+    def publish(self) -> None:
+        pass
+
+    def allow(self) -> bool:
+        return True
+
+    def release(self) -> None:
+        pass
+
+    def record_success(self) -> None:
+        pass
+
+    def record_failure(self) -> None:
+        pass
+
+
+class CircuitBreaker:
+    """Opens after ``failure_threshold`` consecutive failures; one trial call is let through
+    after ``reset_timeout`` (half-open) and its outcome closes or re-opens the circuit."""
+
+    def __init__(self, provider: str, failure_threshold: int, reset_timeout: float) -> None:
+        self.provider = provider
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout = reset_timeout
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+        self.publish()
+
+    def publish(self) -> None:
+        METRICS.set("circuit_breaker_state", _STATE_VALUES[self.state], provider=self.provider, node="-")
+
+    def _transition(self, state: str) -> None:
+        if state == self.state:
+            return
+        logger.warning("circuit breaker for %s: %s -> %s", self.provider, self.state, state)
+        self.state = state
+        METRICS.inc("circuit_breaker_transitions_total", provider=self.provider, state=state, node="-")
+        self.publish()
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self._transition(HALF_OPEN)
+            if self.state == CLOSED:
+                return True
+            if self.state == HALF_OPEN and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+        METRICS.inc("circuit_breaker_rejections_total", provider=self.provider)
+        return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.failures = 0
+            self._trial_in_flight = False
+            self._transition(CLOSED)
+
+    def release(self) -> None:
+        """Give back a half-open trial slot whose call ended without an outcome (cancelled)."""
+        with self._lock:
+            self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            self._trial_in_flight = False
+            if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+                self._transition(OPEN)
+
+
+_LIMITERS: Dict[str, Optional[RateLimiter]] = {}
+_BREAKERS: Dict[str, CircuitBreaker] = {}
+_REGISTRY_LOCK = threading.Lock()
+
+
+def rate_limiter(provider: str, policy: ProviderPolicy) -> Optional[RateLimiter]:
+    with _REGISTRY_LOCK:
+        if provider not in _LIMITERS:
+            _LIMITERS[provider] = RateLimiter(provider, policy.rate, policy.burst) if policy.rate > 0 else None
+        return _LIMITERS[provider]
+
+
+def circuit_breaker(provider: str, policy: ProviderPolicy) -> Union[CircuitBreaker, _NoBreaker]:
+    if not policy.breaker:
+        return _NoBreaker()
+    with _REGISTRY_LOCK:
+        if provider not in _BREAKERS:
+            _BREAKERS[provider] = CircuitBreaker(provider, policy.failure_threshold, policy.reset_timeout)
+        return _BREAKERS[provider]
+
+
+def reset_resilience_state() -> None:
+    """Forget every limiter and breaker (tests, or after changing settings)."""
+    with _REGISTRY_LOCK:
+        _LIMITERS.clear()
+        _BREAKERS.clear()
+
+
+def retry_after_seconds(response: httpx.Response) -> Optional[float]:
+    """Parse ``Retry-After`` as delta-seconds or an HTTP date."""
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        parsed = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, parsed.timestamp() - time.time())
+
+
+def backoff_delay(attempt: int, policy: ProviderPolicy, rng: Optional[random.Random] = None) -> float:
+    """Full-jitter exponential backoff: uniform(0, min(max, base * 2**attempt))."""
+    return (rng or random).uniform(0.0, min(policy.backoff_max, policy.backoff_base * (2**attempt)))
+
+
+class ResilientTransport(httpx.AsyncBaseTransport):
+    """Transport wrapper adding rate limiting, a circuit breaker and jittered retries.
+
+    Retries cover connection errors/timeouts and ``policy.retry_statuses``; ``Retry-After`` wins
+    over the computed backoff (capped at ``backoff_max``). 5xx and transport errors count
+    towards the breaker, 429s do not (the provider is up, just throttling).
+    """
+
+    def __init__(
+        self,
+        provider: str,
+        transport: httpx.AsyncBaseTransport,
+        policy: Optional[ProviderPolicy] = None,
+    ) -> None:
+        self.provider = provider
+        self.policy = policy or policy_for(provider)
+        self._transport = transport
+        self._limiter = rate_limiter(provider, self.policy)
+        self._breaker = circuit_breaker(provider, self.policy)
+        self._breaker.publish()  # clients are rebuilt per run, after metrics are reset
+
+    async def _wait_before_retry(self, attempt: int, reason: str, response: Optional[httpx.Response] = None) -> None:
+        delay = retry_after_seconds(response) if response is not None else None
+        delay = min(self.policy.backoff_max, delay) if delay is not None else backoff_delay(attempt, self.policy)
+        METRICS.inc("http_retries_total", provider=self.provider, reason=reason)
+        await asyncio.sleep(delay)
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        attempt = 0
+        while True:
+            if not self._breaker.allow():
+                raise CircuitOpenError(f"circuit open for {self.provider}", request=request)
+            try:
+                # Inside the try: a call cancelled while waiting for its rate slot must give a
+                # claimed half-open trial back too.
+                if self._limiter is not None:
+                    await self._limiter.acquire()
+                response = await self._transport.handle_async_request(request)
+            except (httpx.TimeoutException, httpx.NetworkError) as exc:
+                self._breaker.record_failure()
+                if attempt >= self.policy.max_retries:
+                    raise
+                await self._wait_before_retry(attempt, type(exc).__name__)
+                attempt += 1
+                continue
+            except Exception:
+                self._breaker.record_failure()
+                raise
+            except BaseException:
+                # Cancelled (e.g. the losing leg of a hedged search): no verdict on the provider,
+                # but a half-open trial must not stay claimed forever.
+                self._breaker.release()
+                raise
+
+            status = response.status_code
+            if status >= 500:
+                self._breaker.record_failure()
+            else:
+                self._breaker.record_success()
+            if status not in self.policy.retry_statuses or attempt >= self.policy.max_retries:
+                return response
+            await response.aclose()
+            await self._wait_before_retry(attempt, str(status), response)
+            attempt += 1
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
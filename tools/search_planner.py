@@ -0,0 +1,232 @@
+"""Plan a run's web searches up front: collapse near-duplicate intents and route the results.
+
+Collector nodes declare ``SearchIntent``s (consumer, country, query, k). ``plan_searches``
+groups intents for the same country whose queries substantially overlap, ``execute_plan`` runs
+each group once under one global concurrency limit, and ``planned_search`` hands every
+consumer its slice of the pages for its original query, falling back to a live search when
+unplanned.
+"""
+from __future__ import annotations
+
+import copy
+import os
+import re
+from dataclasses import dataclass, field
+from typing import Any, Dict, FrozenSet, Iterable, List, Mapping, Optional, Set, Tuple
+from urllib.parse import urlsplit
+
+from tools.concurrency import gather_bounded
+from tools.config import load_sources
+from tools.metrics import METRICS
+from tools.web_search import normalize_query, search_pages, search_pages_or_raise, search_reused
+
+DEFAULT_SIMILARITY = 0.6
+DEFAULT_PLAN_CONCURRENCY = int(os.getenv("SEARCH_PLAN_CONCURRENCY", 8))
+
+_FILTER_RE = re.compile(r"^-?\w+:\S+$")
+_WORD_RE = re.compile(r"[0-9a-z\u00c0-\uffff]+")
+# Connectives that carry no intent; dropped before comparing queries.
+_STOPWORDS = frozenset({"a", "an", "and", "for", "in", "of", "on", "or", "the", "to", "with"})
+
+
+@dataclass(frozen=True)
+class SearchIntent:
+    """One consumer's need for up to ``k`` results for ``query`` about ``country``."""
+
+    consumer: str
+    country: str
+    query: str
+    k: int
+
+
+@dataclass
+class PlannedQuery:
+    """A query executed once on behalf of every intent merged into it.
+
+    ``sites`` are the ``site:`` clauses of the merged intents, searched together as one OR
+    group; ``filters`` are the other operator clauses, which every member shares.
+    """
+
+    country: str
+    filters: FrozenSet[str]
+    sites: Tuple[str, ...]
+    terms: FrozenSet[str]
+    seed: str
+    intents: List[SearchIntent] = field(default_factory=list)
+
+    @property
+    def query(self) -> str:
+        """The seed's text, with the ``site:`` clauses of every member OR-ed together."""
+        if len(self.sites) <= 1:
+            return self.seed
+        words = [token for token in self.seed.split() if not token.lower().startswith("site:")]
+        return f"{' '.join(words)} ({' OR '.join(self.sites)})"
+
+    @property
+    def k(self) -> int:
+        """The largest ``k`` asked for each site slice (the whole result for unfiltered queries)."""
+        per_site: Dict[Optional[str], int] = {}
+        for intent in self.intents:
+            site = _site(intent.query)
+            per_site[site] = max(per_site.get(site, 0), intent.k)
+        return sum(per_site.values())
+
+
+@dataclass
+class SearchPlan:
+    queries: List[PlannedQuery]
+    # Planned queries ``execute_plan`` answered from the search cache or a concurrent search.
+    reused: Set[str] = field(default_factory=set)
+
+    @property
+    def intents(self) -> List[SearchIntent]:
+        return [intent for planned in self.queries for intent in planned.intents]
+
+    def reused_intents(self) -> Dict[str, List[str]]:
+        """``{country: [intent query]}`` for intents whose pages no provider was asked for."""
+        reused: Dict[str, List[str]] = {}
+        for planned in self.queries:
+            if planned.query in self.reused:
+                reused.setdefault(planned.country, []).extend(intent.query for intent in planned.intents)
+        return reused
+
+
+def _split(query: str) -> Tuple[FrozenSet[str], Tuple[str, ...], List[str]]:
+    """Separate operator clauses and ``site:`` clauses from the ordered content words."""
+    filters, sites, words = set(), [], []
+    for token in normalize_query(query).split(" "):
+        if token.startswith("site:"):
+            sites.append(token)
+        elif _FILTER_RE.match(token):
+            filters.add(token)
+        else:
+            words.extend(word for word in _WORD_RE.findall(token) if word not in _STOPWORDS)
+    return frozenset(filters), tuple(dict.fromkeys(sites)), words
+
+
+def _site(query: str) -> Optional[str]:
+    sites = _split(query)[1]
+    return sites[0] if sites else None
+
+
+def _matches_site(page: Mapping[str, Any], site: str) -> bool:
+    domain = site[len("site:") :].lstrip(".")
+    host = (urlsplit(page.get("url") or page.get("source") or "").hostname or "").lower()
+    return host == domain or host.endswith(f".{domain}")
+
+
+def similarity(left: FrozenSet[str], right: FrozenSet[str]) -> float:
+    """Jaccard overlap of two term sets."""
+    if not left and not right:
+        return 1.0
+    return len(left & right) / len(left | right)
+
+
+def plan_searches(intents: Iterable[SearchIntent], *, threshold: float = DEFAULT_SIMILARITY) -> SearchPlan:
+    """Greedily merge intents that substantially overlap.
+
+    An intent joins the first planned query for the same country whose seed terms overlap
+    its own by at least ``threshold`` (Jaccard, ignoring case, order, stopwords and repeats)
+    and whose filters are compatible: the same non-``site:`` operator clauses, and either no
+    ``site:`` clause on both sides or one on each, in which case the sites are OR-ed. The
+    planned query keeps the seed's words -- no consumer's words are added to another's search.
+    """
+    planned: List[PlannedQuery] = []
+    for intent in intents:
+        filters, sites, words = _split(intent.query)
+        terms = frozenset(words)
+        target = next(
+            (
+                candidate
+                for candidate in planned
+                if candidate.country == intent.country
+                and candidate.filters == filters
+                and bool(candidate.sites) == bool(sites)
+                and similarity(candidate.terms, terms) >= threshold
+            ),
+            None,
+        )
+        if target is None:
+            planned.append(PlannedQuery(intent.country, filters, sites, terms, intent.query, [intent]))
+            continue
+        target.sites = tuple(dict.fromkeys(target.sites + sites))
+        target.intents.append(intent)
+    return SearchPlan(planned)
+
+
+def route_pages(planned: PlannedQuery, pages: List[Dict[str, Any]]) -> Dict[str, List[Dict[str, Any]]]:
+    """Split a planned query's ``pages`` into ``{intent query: its slice}``.
+
+    Without an OR-ed site group every intent gets the top ``k`` pages. Otherwise each site
+    gets the pages on its domain, and pages matching no site (providers that ignore the
+    operator) fill the sites with room in rank order, so the slices do not overlap.
+    """
+    if len(planned.sites) <= 1:
+        return {intent.query: pages[: intent.k] for intent in planned.intents}
+    room = {site: 0 for site in planned.sites}
+    for intent in planned.intents:
+        site = _site(intent.query) or planned.sites[0]
+        room[site] = max(room[site], intent.k)
+    slices: Dict[str, List[Dict[str, Any]]] = {site: [] for site in planned.sites}
+    unmatched = []
+    for page in pages:
+        site = next((site for site in planned.sites if _matches_site(page, site) and len(slices[site]) < room[site]), None)
+        if site is None:
+            unmatched.append(page)
+        else:
+            slices[site].append(page)
+    for page in unmatched:
+        site = next((site for site in planned.sites if len(slices[site]) < room[site]), None)
+        if site is None:
+            break
+        slices[site].append(page)
+    return {intent.query: slices[_site(intent.query) or planned.sites[0]][: intent.k] for intent in planned.intents}
+
+
+def planner_settings() -> Dict[str, Any]:
+    """``web_search.planner`` from ``sources.yaml``: merge ``similarity`` and ``concurrency``."""
+    section = (load_sources().get("web_search") or {}).get("planner") or {}
+    return {
+        "similarity": float(section.get("similarity", DEFAULT_SIMILARITY)),
+        "concurrency": int(section.get("concurrency", DEFAULT_PLAN_CONCURRENCY)),
+    }
+
+
+async def execute_plan(plan: SearchPlan, *, limit: int = DEFAULT_PLAN_CONCURRENCY) -> Dict[str, Dict[str, List[Dict[str, Any]]]]:
+    """Run every planned query once and route pages back as ``{country: {original query: pages}}``.
+
+    Each intent receives at most its own ``k`` pages (see ``route_pages``). A query that raised
+    is left unrouted so its consumers fall back to searching themselves. Queries answered
+    without a provider call are added to ``plan.reused``.
+    """
+    by_query = {planned.query: planned for planned in plan.queries}
+
+    async def _run(query: str) -> List[Dict[str, Any]]:
+        pages = await search_pages_or_raise(query=query, k=by_query[query].k)
+        if search_reused():
+            plan.reused.add(query)
+        return pages
+
+    pages = await gather_bounded(by_query, _run, limit=limit)
+    METRICS.inc("search_plan_intents_total", len(plan.intents))
+    METRICS.inc("search_plan_queries_total", len(by_query))
+
+    routed: Dict[str, Dict[str, List[Dict[str, Any]]]] = {}
+    for query, planned in by_query.items():
+        if query not in pages:
+            continue
+        routed.setdefault(planned.country, {}).update(route_pages(planned, pages[query]))
+    return routed
+
+
+async def planned_search(
+    state: Optional[Mapping[str, Any]],
+    country: str,
+    query: str,
+    k: int,
+) -> List[Dict[str, Any]]:
+    """Return the planner's pages for ``query`` from ``state['search_results']``, else search live."""
+    routed = (((state or {}).get("search_results") or {}).get(country) or {}).get(query)
+    if routed is not None:
+        return copy.deepcopy(routed)
+    return await search_pages(query=query, k=k)
@@ -2,17 +2,34 @@
 from __future__ import annotations
 
 import asyncio
-from typing import Any, Dict
+import os
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 
 import httpx
 
+from tools.cache import DiskCache, cache_reads_enabled, cache_writes_enabled, get_cache_mode
+from tools.coalesce import SingleFlight, coalesce
+from tools.http_client import get_client
+from tools.tracing import traced
+
 TIMEOUT = float(25)
-BASE_URL = "https://api.worldbank.org/v2/country/{code}/indicator/{indicator}"
+# WORLDBANK_BASE_URL points the client at a mirror or a local stand-in (benchmarks.mock_server).
+API_ROOT = os.getenv("WORLDBANK_BASE_URL", "https://api.worldbank.org/v2").rstrip("/")
+BASE_URL = API_ROOT + "/country/{code}/indicator/{indicator}"
 INDICATORS = {
     "gdp_usd_bil": "NY.GDP.MKTP.CD",
     "population_m": "SP.POP.TOTL",
     "internet_users_pct": "IT.NET.USER.ZS",
 }
+_INDICATOR_KEYS = {indicator: key for key, indicator in INDICATORS.items()}
+# Freshness per indicator: annual series rarely change more than a few times a year.
+INDICATOR_TTL = {
+    "gdp_usd_bil": 30 * 24 * 3600,
+    "population_m": 90 * 24 * 3600,
+    "internet_users_pct": 90 * 24 * 3600,
+}
+# Country codes per bulk request; keeps the request URL comfortably short.
+BULK_CHUNK_SIZE = int(os.getenv("WORLDBANK_BULK_CHUNK", 50))
 
 _COUNTRY_ALIASES = {
     "united states": "USA",
@@ -20,23 +37,57 @@ _COUNTRY_ALIASES = {
     "south korea": "KOR",
     "korea, republic of": "KOR",
     "mongolia": "MNG",
+    "japan": "JPN",
+    "china": "CHN",
+    "vietnam": "VNM",
+    "viet nam": "VNM",
+    "germany": "DEU",
+    "united kingdom": "GBR",
+    "uk": "GBR",
+    "singapore": "SGP",
+    "indonesia": "IDN",
+    "philippines": "PHL",
+    "malaysia": "MYS",
+    "kazakhstan": "KAZ",
+    "uzbekistan": "UZB",
+    "united arab emirates": "ARE",
+    "uae": "ARE",
+    "saudi arabia": "SAU",
+    "mexico": "MEX",
+    "brazil": "BRA",
+    "canada": "CAN",
+    "australia": "AUS",
 }
 _CACHE: Dict[str, Dict[str, float]] = {}
-_CACHE_LOCK = asyncio.Lock()
+_INFLIGHT = SingleFlight()
+_MACRO_CACHE = DiskCache("worldbank", max_entries=5_000)
+_MISSING = object()
 
 
 def _resolve_country_code(country: str) -> str:
     key = country.strip().lower()
     if key in _COUNTRY_ALIASES:
         return _COUNTRY_ALIASES[key]
+    if len(key) == 3 and key.isalpha():
+        return key.upper()
     letters = [ch for ch in key.upper() if ch.isalpha()]
     return "".join(letters[:3]).ljust(3, "X")
 
 
+def _scale(key: str, value: Optional[float]) -> float:
+    value = float(value) if value is not None else 0.0
+    if key == "gdp_usd_bil":
+        value /= 1_000_000_000  # convert to billions
+    if key == "population_m":
+        value /= 1_000_000
+    return round(value, 4)
+
+
+@traced("_fetch_indicator")
 async def _fetch_indicator(client: httpx.AsyncClient, code: str, indicator: str) -> float:
     params = {"format": "json", "per_page": 5, "MRV": 1}
     url = BASE_URL.format(code=code, indicator=indicator)
-    resp = await client.get(url, params=params)
+    resp = await client.get(url, params=params, timeout=TIMEOUT)
     resp.raise_for_status()
     data = resp.json()
     try:
@@ -46,26 +97,179 @@ async def _fetch_indicator(client: httpx.AsyncClient, code: str, indicator: str)
     return float(value) if value is not None else 0.0
 
 
+@traced("_fetch_bulk")
+async def _fetch_bulk(
+    client: httpx.AsyncClient, codes: List[str], indicators: List[str]
+) -> Dict[Tuple[str, str], Optional[float]]:
+    """Fetch the latest non-empty value for every (country, indicator) pair in one query.
+
+    Uses the multi-country/multi-indicator syntax (``country/USA;MNG/indicator/A;B``), which
+    requires ``source=2`` when more than one indicator is requested. Pages are followed when
+    the response does not fit in a single page.
+    """
+    url = BASE_URL.format(code=";".join(codes), indicator=";".join(indicators))
+    params: Dict[str, Any] = {"format": "json", "per_page": 1000, "mrnev": 1}
+    if len(indicators) > 1:
+        params["source"] = 2
+
+    values: Dict[Tuple[str, str], Optional[float]] = {(code, ind): None for code in codes for ind in indicators}
+    page, pages = 1, 1
+    while page <= pages:
+        resp = await client.get(url, params={**params, "page": page}, timeout=TIMEOUT)
+        resp.raise_for_status()
+        data = resp.json()
+        if not isinstance(data, list) or len(data) < 2 or not isinstance(data[0], dict):
+            raise httpx.HTTPError(f"Unexpected World Bank payload for {url}")
+        pages = int(data[0].get("pages") or 1)
+        for row in data[1] or []:
+            code = (row.get("countryiso3code") or "").upper()
+            indicator = (row.get("indicator") or {}).get("id")
+            if (code, indicator) in values and row.get("value") is not None:
+                values[(code, indicator)] = float(row["value"])
+        page += 1
+    return values
+
+
+async def _fetch_chunk(
+    client: httpx.AsyncClient, codes: List[str], indicators: List[str]
+) -> Dict[Tuple[str, str], Optional[float]]:
+    """Bulk-fetch ``codes``; a failing chunk is bisected so one unknown code costs a few extra
+    requests (run concurrently) instead of a serial call per (code, indicator) pair."""
+    try:
+        return await _fetch_bulk(client, codes, indicators)
+    except (httpx.HTTPError, ValueError):
+        if len(codes) > 1:
+            middle = len(codes) // 2
+            halves = await asyncio.gather(
+                _fetch_chunk(client, codes[:middle], indicators),
+                _fetch_chunk(client, codes[middle:], indicators),
+            )
+            return {pair: value for half in halves for pair, value in half.items()}
+
+    # A single code the bulk endpoint rejects: try its indicators one by one.
+    code = codes[0]
+    values = await asyncio.gather(
+        *(_fetch_indicator(client, code, indicator) for indicator in indicators), return_exceptions=True
+    )
+    fetched: Dict[Tuple[str, str], Optional[float]] = {}
+    for indicator, value in zip(indicators, values):
+        if isinstance(value, asyncio.CancelledError):
+            raise value
+        if isinstance(value, httpx.HTTPError):
+            continue
+        if isinstance(value, BaseException):
+            raise value
+        fetched[(code, indicator)] = value
+    return fetched
+
+
+async def _fetch_pairs(codes: List[str], keys: List[str]) -> Dict[Tuple[str, str], Optional[float]]:
+    """Resolve raw values for ``codes`` x ``keys`` in bulk chunks (see ``_fetch_chunk``)."""
+    client = get_client("worldbank")
+    indicators = [INDICATORS[key] for key in keys]
+    chunks = [codes[start : start + BULK_CHUNK_SIZE] for start in range(0, len(codes), BULK_CHUNK_SIZE)]
+    fetched: Dict[Tuple[str, str], Optional[float]] = {}
+    for values in await asyncio.gather(*(_fetch_chunk(client, chunk, indicators) for chunk in chunks)):
+        fetched.update(values)
+    return fetched
+
+
+def _read_cached(codes: List[str]) -> Dict[Tuple[str, str], Optional[float]]:
+    cached: Dict[Tuple[str, str], Optional[float]] = {}
+    for code in codes:
+        for indicator in INDICATORS.values():
+            value = _MACRO_CACHE.get(f"{code}:{indicator}", _MISSING)
+            if value is not _MISSING:
+                cached[(code, indicator)] = value
+    return cached
+
+
+def _write_cached(values: Dict[Tuple[str, str], Optional[float]], overwrite: bool) -> None:
+    for (code, indicator), value in values.items():
+        ttl = INDICATOR_TTL.get(_INDICATOR_KEYS[indicator])
+        _MACRO_CACHE.set(f"{code}:{indicator}", value, ttl=ttl, overwrite=overwrite)
+
+
+async def _load_codes(codes: List[str], mode: str) -> Dict[str, Dict[str, float]]:
+    """Resolve ``codes`` from the persistent cache, fetching only missing pairs."""
+    raw: Dict[Tuple[str, str], Optional[float]] = {}
+    missing: Dict[str, List[str]] = {}
+    if cache_reads_enabled(mode):
+        raw = await asyncio.to_thread(_read_cached, codes)
+    for code in codes:
+        for key, indicator in INDICATORS.items():
+            if (code, indicator) not in raw:
+                missing.setdefault(key, []).append(code)
+
+    # Group by the set of missing indicators so each group is one bulk query.
+    groups: Dict[Tuple[str, ...], List[str]] = {}
+    for code in codes:
+        keys = tuple(key for key in INDICATORS if code in missing.get(key, []))
+        if keys:
+            groups.setdefault(keys, []).append(code)
+    for keys, group_codes in groups.items():
+        fetched = await _fetch_pairs(group_codes, list(keys))
+        raw.update(fetched)
+        if cache_writes_enabled(mode):
+            await asyncio.to_thread(_write_cached, fetched, mode != "write")
+
+    return {
+        code: {key: _scale(key, raw.get((code, indicator))) for key, indicator in INDICATORS.items()}
+        for code in codes
+    }
+
+
+async def get_macro_bulk(countries: Iterable[str]) -> Dict[str, Dict[str, float]]:
+    """Fetch macro indicators for many countries in as few round-trips as possible.
+
+    Values are served from the process cache, then from the persistent per-indicator cache
+    (``data/cache/worldbank.sqlite3``); only stale or missing pairs hit the API, batched
+    into multi-country/multi-indicator requests. Codes already being fetched by a
+    concurrent call are awaited instead of requested again.
+    """
+    names = list(dict.fromkeys(countries))
+    codes = {country: _resolve_country_code(country) for country in names}
+    resolved = {code: dict(_CACHE[code]) for code in set(codes.values()) if code in _CACHE}
+
+    owned: List[str] = []
+    waiting: Dict[str, Any] = {}
+    for code in sorted({code for code in codes.values() if code not in resolved}):
+        future, owner = _INFLIGHT.claim(code)
+        if owner:
+            owned.append(code)
+        else:
+            waiting[code] = future
+
+    if owned:
+        try:
+            loaded = await _load_codes(owned, get_cache_mode())
+        except BaseException as exc:
+            for code in owned:
+                _INFLIGHT.reject(code, exc)
+            raise
+        for code, values in loaded.items():
+            _CACHE[code] = values
+            _INFLIGHT.resolve(code, values)
+            resolved[code] = dict(values)
+
+    for code, future in waiting.items():
+        try:
+            resolved[code] = await _INFLIGHT.wait(future)
+        except asyncio.CancelledError:
+            if not future.cancelled():
+                raise
+            # The owning call was cancelled; fetch the code ourselves.
+            resolved[code] = (await get_macro_bulk([code]))[code]
+
+    return {country: dict(resolved[code]) for country, code in codes.items()}
+
+
+@coalesce(lambda country: _resolve_country_code(country))
 async def get_macro(country: str) -> Dict[str, float]:
     """Fetch GDP, population, and internet penetration for a country."""
     code = _resolve_country_code(country)
-    async with _CACHE_LOCK:
-        if code in _CACHE:
-            return _CACHE[code]
+    if code in _CACHE:
+        return _CACHE[code]
 
-    async with httpx.AsyncClient(timeout=TIMEOUT) as client:
-        results: Dict[str, float] = {}
-        for key, indicator in INDICATORS.items():
-            try:
-                value = await _fetch_indicator(client, code, indicator)
-            except httpx.HTTPError:
-                value = 0.0
-            if key == "gdp_usd_bil":
-                value /= 1_000_000_000  # convert to billions
-            if key == "population_m":
-                value /= 1_000_000
-            results[key] = round(value, 4)
-
-    async with _CACHE_LOCK:
-        _CACHE[code] = results
-    return results
+    results = await get_macro_bulk([country])
+    return results[country]
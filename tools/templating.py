@@ -1,11 +1,12 @@
 """Jinja2 기반 템플릿 렌더링 및 선택적 LLM 후처리 헬퍼."""
 from __future__ import annotations
 
+import asyncio
 import json
 import os
 from functools import lru_cache
 from pathlib import Path
-from typing import Any, Dict, Iterable, Union
+from typing import Any, Dict, Iterable, List, Optional, Union
 
 from jinja2 import Environment, FileSystemLoader
 
@@ -77,25 +78,28 @@ def _localize_stub(text: str, language: str) -> str:
     return localized
 
 
-def _render_with_llm(content: str, state: Dict[str, Any]) -> str:
-    """REPORT_RENDER_MODE=llm && OPENAI_API_KEY 설정 시 LLM으로 마크다운 재작성."""
+def _llm_render_enabled() -> bool:
+    """REPORT_RENDER_MODE=llm && OPENAI_API_KEY 설정 여부."""
     mode = os.getenv("REPORT_RENDER_MODE", "")
     mode = mode.strip().strip("\"'").lower()
     if mode != "llm":
-        return content
-    if not os.getenv("OPENAI_API_KEY"):
-        return content
+        return False
+    return bool(os.getenv("OPENAI_API_KEY"))
 
-    try:
-        from tools.llm import complete_markdown
-    except ImportError:
-        return content
 
-    prompt = (
+def project_state(state: Dict[str, Any], keys: Iterable[str]) -> Dict[str, Any]:
+    """LLM 프롬프트에 실을 state 부분집합(keys에 있는 최상위 키만)을 반환."""
+    return {key: state[key] for key in keys if key in state}
+
+
+def _llm_prompt(content: str, state: Dict[str, Any], llm_state: Optional[Dict[str, Any]] = None) -> str:
+    """llm_state가 주어지면 전체 state 대신 해당 부분만 압축 JSON으로 첨부."""
+    payload = state if llm_state is None else llm_state
+    return (
         "[INSTRUCTION]\n"
         f"{content}\n\n"
         "[STATE JSON]\n```json\n"
-        f"{json.dumps(state, ensure_ascii=False, indent=2)}\n"
+        f"{json.dumps(payload, ensure_ascii=False, separators=(',', ':'), default=str)}\n"
         "```\n\n"
         "[REQUIREMENTS]\n"
         f"- Output in {state.get('language', 'ko')}.\n"
@@ -103,27 +107,89 @@ def _render_with_llm(content: str, state: Dict[str, Any]) -> str:
         "- Prefer Markdown tables or bullet lists where useful.\n"
     )
 
+
+def _render_with_llm(content: str, state: Dict[str, Any], llm_state: Optional[Dict[str, Any]] = None) -> str:
+    """REPORT_RENDER_MODE=llm && OPENAI_API_KEY 설정 시 LLM으로 마크다운 재작성."""
+    if not _llm_render_enabled():
+        return content
+
+    try:
+        from tools.llm import complete_markdown
+    except ImportError:
+        return content
+
     try:
-        output = complete_markdown(prompt) or ""
+        output = complete_markdown(_llm_prompt(content, state, llm_state)) or ""
         return output.strip()
     except Exception:
         # LLM 호출 실패 시 원본 유지
         return content
 
 
-def render_md(template_path: Union[str, Iterable[str]], state: Dict[str, Any]) -> str:
-    """단일 또는 다중 마크다운 템플릿을 렌더링."""
+async def _arender_with_llm(
+    content: str,
+    state: Dict[str, Any],
+    llm_state: Optional[Dict[str, Any]] = None,
+    token_log: Optional[List[int]] = None,
+) -> str:
+    """_render_with_llm의 비동기 버전 (이벤트 루프를 막지 않음). token_log에 프롬프트 토큰 추정치를 기록."""
+    if not _llm_render_enabled():
+        return content
+
+    try:
+        from tools.llm import acomplete_markdown, estimate_tokens
+    except ImportError:
+        return content
+
+    prompt = _llm_prompt(content, state, llm_state)
+    if token_log is not None:
+        token_log.append(estimate_tokens(prompt))
+    try:
+        output = await acomplete_markdown(prompt) or ""
+        return output.strip()
+    except Exception:
+        # LLM 호출 실패 시 원본 유지
+        return content
+
+
+def render_md(
+    template_path: Union[str, Iterable[str]],
+    state: Dict[str, Any],
+    *,
+    llm_state: Optional[Dict[str, Any]] = None,
+) -> str:
+    """단일 또는 다중 마크다운 템플릿을 렌더링. llm_state는 LLM 프롬프트에만 사용."""
     if isinstance(template_path, (list, tuple, set)):
-        fragments = [render_md(path, state) for path in template_path]
+        fragments = [render_md(path, state, llm_state=llm_state) for path in template_path]
         return "\n\n".join(fragments)
 
     context = {"state": state, **state}
     raw_content = _render_template(template_path, context)
     processed = _localize_stub(raw_content, state.get("language", "en"))
-    processed = _render_with_llm(processed, state)
+    processed = _render_with_llm(processed, state, llm_state)
     return processed
 
 
+async def arender_md(
+    template_path: Union[str, Iterable[str]],
+    state: Dict[str, Any],
+    *,
+    llm_state: Optional[Dict[str, Any]] = None,
+    token_log: Optional[List[int]] = None,
+) -> str:
+    """render_md의 비동기 버전. 다중 템플릿은 동시에 렌더링하고 입력 순서대로 합침."""
+    if isinstance(template_path, (list, tuple, set)):
+        fragments = await asyncio.gather(
+            *(arender_md(path, state, llm_state=llm_state, token_log=token_log) for path in template_path)
+        )
+        return "\n\n".join(fragments)
+
+    context = {"state": state, **state}
+    raw_content = _render_template(template_path, context)
+    processed = _localize_stub(raw_content, state.get("language", "en"))
+    return await _arender_with_llm(processed, state, llm_state, token_log)
+
+
 def render_md_html(template_path: Union[str, Iterable[str]], state: Dict[str, Any]) -> str:
     """render_md 결과를 HTML로 변환."""
     return markdown_to_html(render_md(template_path, state))
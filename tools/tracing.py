@@ -0,0 +1,190 @@
+"""Hierarchical trace spans for a report run, written as Chrome trace-event JSON.
+
+A run is the root span, graph nodes are its children and outbound calls (search, World Bank,
+page fetches, LLM completions) are leaves. Load the resulting ``trace_<run_id>.json`` in
+``chrome://tracing`` or https://ui.perfetto.dev to see critical paths in a flame view.
+"""
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import inspect
+import itertools
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from functools import wraps
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, TypeVar
+
+_FuncT = TypeVar("_FuncT", bound=Callable[..., Any])
+
+OUTPUT_DIR = Path(__file__).resolve().parents[1] / "data" / "outputs"
+TRACE_ENABLED = os.getenv("TRACE_ENABLED", "0").strip().lower() in {"1", "true", "yes"}
+
+_span_ids = itertools.count(1)
+
+
+@dataclass
+class Span:
+    name: str
+    cat: str
+    span_id: int
+    parent_id: Optional[int]
+    start: float
+    lane: int
+    args: Dict[str, Any] = field(default_factory=dict)
+    end: Optional[float] = None
+
+
+class Tracer:
+    """Collects finished spans for one run; thread- and task-safe."""
+
+    def __init__(self, run_id: str) -> None:
+        self.run_id = run_id
+        self.origin = time.perf_counter()
+        self.spans: List[Span] = []
+        self._lock = threading.Lock()
+        self._lanes: Dict[Any, int] = {}
+
+    def lane(self) -> int:
+        """Small integer per asyncio task (or thread) so overlapping work lands on separate rows."""
+        try:
+            owner: Any = asyncio.current_task()
+        except RuntimeError:
+            owner = None
+        if owner is None:
+            owner = ("thread", threading.get_ident())
+        with self._lock:
+            return self._lanes.setdefault(owner, len(self._lanes) + 1)
+
+    def record(self, span: Span) -> None:
+        with self._lock:
+            self.spans.append(span)
+
+    def to_chrome(self) -> Dict[str, Any]:
+        """Complete ("X") events in microseconds relative to the run start."""
+        pid = os.getpid()
+        with self._lock:
+            spans = sorted(self.spans, key=lambda s: s.start)
+        events: List[Dict[str, Any]] = [
+            {"name": "process_name", "ph": "M", "pid": pid, "args": {"name": f"report {self.run_id}"}}
+        ]
+        for span in spans:
+            end = span.end if span.end is not None else span.start
+            events.append(
+                {
+                    "name": span.name,
+                    "cat": span.cat,
+                    "ph": "X",
+                    "pid": pid,
+                    "tid": span.lane,
+                    "ts": round((span.start - self.origin) * 1e6, 1),
+                    "dur": round((end - span.start) * 1e6, 1),
+                    "args": {
+                        "run_id": self.run_id,
+                        "span_id": span.span_id,
+                        "parent_id": span.parent_id,
+                        **span.args,
+                    },
+                }
+            )
+        return {"traceEvents": events, "displayTimeUnit": "ms", "otherData": {"run_id": self.run_id}}
+
+    def write(self, path: Path) -> Path:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(self.to_chrome(), ensure_ascii=False), encoding="utf-8")
+        return path
+
+
+_TRACER: contextvars.ContextVar[Optional[Tracer]] = contextvars.ContextVar("tracer", default=None)
+_CURRENT_SPAN: contextvars.ContextVar[Optional[Span]] = contextvars.ContextVar("trace_span", default=None)
+
+
+def current_run_id() -> Optional[str]:
+    tracer = _TRACER.get()
+    return tracer.run_id if tracer else None
+
+
+@contextmanager
+def span(name: str, cat: str = "call", **args: Any) -> Iterator[Optional[Span]]:
+    """Open a child of the current span; a no-op outside ``trace_run``."""
+    tracer = _TRACER.get()
+    if tracer is None:
+        yield None
+        return
+    parent = _CURRENT_SPAN.get()
+    current = Span(
+        name=name,
+        cat=cat,
+        span_id=next(_span_ids),
+        parent_id=parent.span_id if parent else None,
+        start=time.perf_counter(),
+        lane=tracer.lane(),
+        args={key: value if isinstance(value, (int, float, bool)) else str(value) for key, value in args.items()},
+    )
+    token = _CURRENT_SPAN.set(current)
+    try:
+        yield current
+    except BaseException as exc:
+        current.args["error"] = type(exc).__name__
+        raise
+    finally:
+        _CURRENT_SPAN.reset(token)
+        current.end = time.perf_counter()
+        tracer.record(current)
+
+
+def traced(name: Optional[str] = None, cat: str = "call") -> Callable[[_FuncT], _FuncT]:
+    """Decorator wrapping every call of a (sync or async) function in a span."""
+
+    def decorator(func: _FuncT) -> _FuncT:
+        span_name = name or getattr(func, "__name__", "call")
+
+        if inspect.iscoroutinefunction(func):
+
+            @wraps(func)
+            async def async_wrapper(*args: Any, **kwargs: Any) -> Any:
+                with span(span_name, cat):
+                    return await func(*args, **kwargs)
+
+            return async_wrapper  # type: ignore[return-value]
+
+        @wraps(func)
+        def sync_wrapper(*args: Any, **kwargs: Any) -> Any:
+            with span(span_name, cat):
+                return func(*args, **kwargs)
+
+        return sync_wrapper  # type: ignore[return-value]
+
+    return decorator
+
+
+@contextmanager
+def trace_run(
+    run_id: str,
+    *,
+    name: str = "report_run",
+    enabled: Optional[bool] = None,
+    out_dir: Path = OUTPUT_DIR,
+) -> Iterator[Optional[Tracer]]:
+    """Trace everything inside this block as one run and write ``trace_<run_id>.json``.
+
+    ``enabled`` defaults to the ``TRACE_ENABLED`` environment variable.
+    """
+    if not (TRACE_ENABLED if enabled is None else enabled):
+        yield None
+        return
+    tracer = Tracer(run_id)
+    tracer_token = _TRACER.set(tracer)
+    span_token = _CURRENT_SPAN.set(None)
+    try:
+        with span(name, "run"):
+            yield tracer
+    finally:
+        _CURRENT_SPAN.reset(span_token)
+        _TRACER.reset(tracer_token)
+        tracer.write(out_dir / f"trace_{run_id}.json")
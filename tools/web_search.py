@@ -1,32 +1,346 @@
-"""Thin wrapper for external web-search providers (e.g., Tavily)."""
+"""Web search over pluggable providers (Tavily, Brave, a local JSONL index) with hedged requests.
+
+``config/sources.yaml`` picks the primary (``web_search.provider``) and the providers tried as
+a hedge (``web_search.fallback``). When the primary has not answered within its observed p95
+latency, the first available fallback is fired too and whichever returns first wins.
+"""
 from __future__ import annotations
 
+import asyncio
+import contextvars
+import json
+import logging
+import math
 import os
-from typing import Any, Dict, List
+import re
+import time
+from collections import Counter, deque
+from pathlib import Path
+from typing import Any, Deque, Dict, List, Optional, Protocol, Sequence
 
 import httpx
 
+from tools.cache import DiskCache, cached_call, make_key
+from tools.coalesce import coalesce
+from tools.config import load_sources
+from tools.http_client import get_client
+from tools.metrics import METRICS
+from tools.tracing import span, traced
+
+logger = logging.getLogger(__name__)
+
 TAVILY_API_KEY = os.getenv("TAVILY_API_KEY")
 SEARCH_ENDPOINT = os.getenv("TAVILY_ENDPOINT", "https://api.tavily.com/search")
+BRAVE_API_KEY = os.getenv("BRAVE_API_KEY")
+BRAVE_ENDPOINT = os.getenv("BRAVE_ENDPOINT", "https://api.search.brave.com/res/v1/web/search")
 DEFAULT_TIMEOUT = float(os.getenv("HTTP_TIMEOUT", 25))
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
 
+SEARCH_CACHE_TTL = float(os.getenv("SEARCH_CACHE_TTL", 7 * 24 * 3600))
+SEARCH_CACHE = DiskCache(
+    "search",
+    default_ttl=SEARCH_CACHE_TTL,
+    max_entries=int(os.getenv("SEARCH_CACHE_MAX_ENTRIES", 20_000)),
+)
+
+# Provider failures that degrade a search to no evidence.
+SEARCH_ERRORS = (httpx.HTTPError, OSError, ValueError)
+
+# Whether the calling task's last ``search_pages_or_raise`` was answered without querying a
+# provider (search cache hit or another caller's in-flight search); see ``search_reused``.
+_LAST_SEARCH_REUSED: contextvars.ContextVar[bool] = contextvars.ContextVar("last_search_reused", default=False)
+
+# Hedge timing: the delay is the primary's p95 once enough samples exist, else the default.
+HEDGE_DEFAULT_DELAY = 1.5
+HEDGE_MIN_DELAY = 0.2
+HEDGE_MIN_SAMPLES = 20
+LATENCY_WINDOW = 200
+
+
+def normalize_query(query: str) -> str:
+    """Lower-case and collapse whitespace so equivalent queries share a cache key."""
+    return re.sub(r"\s+", " ", query).strip().lower()
+
+
+class SearchProvider(Protocol):
+    name: str
+
+    def available(self) -> bool: ...
+
+    async def search(self, query: str, k: int) -> List[Dict[str, Any]]: ...
+
+
+class TavilyProvider:
+    name = "tavily"
+
+    def available(self) -> bool:
+        return bool(TAVILY_API_KEY)
+
+    async def search(self, query: str, k: int) -> List[Dict[str, Any]]:
+        payload = {
+            "api_key": TAVILY_API_KEY,
+            "query": query,
+            "max_results": k,
+        }
+        resp = await get_client("tavily").post(SEARCH_ENDPOINT, json=payload, timeout=DEFAULT_TIMEOUT)
+        resp.raise_for_status()
+        data = resp.json()
+        return data.get("results", [])
+
+
+class BraveProvider:
+    """Brave Search API; results are mapped onto Tavily's ``title``/``url``/``content`` shape."""
+
+    name = "brave"
+
+    def available(self) -> bool:
+        return bool(BRAVE_API_KEY)
+
+    async def search(self, query: str, k: int) -> List[Dict[str, Any]]:
+        resp = await get_client("brave").get(
+            BRAVE_ENDPOINT,
+            params={"q": query, "count": min(k, 20)},
+            headers={"Accept": "application/json", "X-Subscription-Token": BRAVE_API_KEY or ""},
+            timeout=DEFAULT_TIMEOUT,
+        )
+        resp.raise_for_status()
+        results = (resp.json().get("web") or {}).get("results") or []
+        return [
+            {
+                "title": item.get("title", ""),
+                "url": item.get("url", ""),
+                "content": " ".join(filter(None, [item.get("description"), *(item.get("extra_snippets") or [])])),
+                "score": round(1.0 - index / max(len(results), 1), 4),
+            }
+            for index, item in enumerate(results[:k])
+        ]
+
+
+_TOKEN_RE = re.compile(r"[0-9a-z\u00c0-\uffff]+")
+
+
+def _tokens(text: str) -> List[str]:
+    return _TOKEN_RE.findall(text.lower())
+
+
+class LocalIndexProvider:
+    """BM25 over a JSONL file of ``{"title", "url", "content"}`` documents; no network needed."""
+
+    name = "local"
+    k1 = 1.5
+    b = 0.75
+
+    def __init__(self, path: Optional[Path] = None) -> None:
+        self.path = path
+        self._loaded_mtime: Optional[float] = None
+        self._docs: List[Dict[str, Any]] = []
+        self._tfs: List[Counter] = []
+        self._df: Counter = Counter()
+        self._avg_len = 0.0
+
+    def available(self) -> bool:
+        return bool(self.path) and self.path.exists()  # type: ignore[union-attr]
+
+    def _load(self) -> None:
+        assert self.path is not None
+        mtime = self.path.stat().st_mtime
+        if self._loaded_mtime == mtime:
+            return
+        docs, tfs, df = [], [], Counter()
+        for line in self.path.read_text(encoding="utf-8").splitlines():
+            if not line.strip():
+                continue
+            doc = json.loads(line)
+            tf = Counter(_tokens(f"{doc.get('title', '')} {doc.get('content', '')}"))
+            docs.append(doc)
+            tfs.append(tf)
+            df.update(tf.keys())
+        self._docs, self._tfs, self._df = docs, tfs, df
+        self._avg_len = sum(sum(tf.values()) for tf in tfs) / max(len(tfs), 1)
+        self._loaded_mtime = mtime
+
+    def _search_sync(self, query: str, k: int) -> List[Dict[str, Any]]:
+        self._load()
+        terms = set(_tokens(query))
+        total = len(self._docs)
+        scored = []
+        for doc, tf in zip(self._docs, self._tfs):
+            length = sum(tf.values()) or 1
+            score = 0.0
+            for term in terms:
+                if term not in tf:
+                    continue
+                idf = math.log(1 + (total - self._df[term] + 0.5) / (self._df[term] + 0.5))
+                freq = tf[term]
+                score += idf * freq * (self.k1 + 1) / (freq + self.k1 * (1 - self.b + self.b * length / self._avg_len))
+            if score > 0:
+                scored.append((score, doc))
+        scored.sort(key=lambda item: item[0], reverse=True)
+        return [{**doc, "score": round(score, 4)} for score, doc in scored[:k]]
+
+    async def search(self, query: str, k: int) -> List[Dict[str, Any]]:
+        return await asyncio.to_thread(self._search_sync, query, k)
 
-async def search_pages(query: str, k: int = 5) -> List[Dict[str, Any]]:
-    """Return a list of search results, or an empty collection if disabled."""
-    if not TAVILY_API_KEY:
-        return []
 
-    payload = {
-        "api_key": TAVILY_API_KEY,
-        "query": query,
-        "max_results": k,
+class LatencyTracker:
+    """Rolling window of call latencies per provider (lower bounds for cancelled/timed-out calls)."""
+
+    def __init__(self, window: int = LATENCY_WINDOW) -> None:
+        self._samples: Dict[str, Deque[float]] = {}
+        self._window = window
+
+    def record(self, provider: str, seconds: float) -> None:
+        self._samples.setdefault(provider, deque(maxlen=self._window)).append(seconds)
+
+    def percentile(self, provider: str, pct: float) -> Optional[float]:
+        samples = sorted(self._samples.get(provider, ()))
+        if len(samples) < HEDGE_MIN_SAMPLES:
+            return None
+        index = min(len(samples) - 1, max(0, math.ceil(pct / 100 * len(samples)) - 1))
+        return samples[index]
+
+
+LATENCIES = LatencyTracker()
+
+
+def _search_config() -> Dict[str, Any]:
+    return load_sources().get("web_search") or {}
+
+
+def _build_providers(config: Dict[str, Any]) -> Dict[str, SearchProvider]:
+    index_path = config.get("local_index")
+    return {
+        "tavily": TavilyProvider(),
+        "brave": BraveProvider(),
+        "local": LocalIndexProvider(PROJECT_ROOT / index_path if index_path else None),
     }
 
+
+_PROVIDERS: Optional[Dict[str, SearchProvider]] = None
+
+
+def get_providers() -> Dict[str, SearchProvider]:
+    global _PROVIDERS
+    if _PROVIDERS is None:
+        _PROVIDERS = _build_providers(_search_config())
+    return _PROVIDERS
+
+
+def provider_chain(config: Optional[Dict[str, Any]] = None) -> List[SearchProvider]:
+    """Available providers in preference order: the configured primary, then the fallbacks."""
+    config = _search_config() if config is None else config
+    fallback = config.get("fallback") or []
+    names = [config.get("provider", "tavily"), *([fallback] if isinstance(fallback, str) else fallback)]
+    providers = get_providers()
+    chain: List[SearchProvider] = []
+    for name in names:
+        provider = providers.get(name)
+        if provider is None:
+            logger.warning("unknown web_search provider %r in sources.yaml", name)
+        elif provider.available() and provider not in chain:
+            chain.append(provider)
+    return chain
+
+
+def hedge_delay(provider: str, config: Optional[Dict[str, Any]] = None) -> float:
+    """Seconds to wait on ``provider`` before hedging: its observed p95 (``hedge.percentile``)."""
+    hedge = (config if config is not None else _search_config()).get("hedge") or {}
+    observed = LATENCIES.percentile(provider, float(hedge.get("percentile", 95)))
+    if observed is None:
+        return float(hedge.get("default_delay_ms", HEDGE_DEFAULT_DELAY * 1000)) / 1000
+    return max(float(hedge.get("min_delay_ms", HEDGE_MIN_DELAY * 1000)) / 1000, observed)
+
+
+async def _timed(provider: SearchProvider, query: str, k: int) -> List[Dict[str, Any]]:
+    with span(f"search:{provider.name}", provider=provider.name):
+        started = time.perf_counter()
+        try:
+            results = await provider.search(query, k)
+        except (asyncio.CancelledError, httpx.TimeoutException):
+            # A call that lost the hedge race or timed out took at least this long; leaving it
+            # out would keep only the fast samples and walk the p95 (and hedge delay) down.
+            LATENCIES.record(provider.name, time.perf_counter() - started)
+            raise
+    LATENCIES.record(provider.name, time.perf_counter() - started)
+    return results
+
+
+async def hedged_search(
+    providers: Sequence[SearchProvider],
+    query: str,
+    k: int,
+    *,
+    delay: Optional[float] = None,
+) -> List[Dict[str, Any]]:
+    """Ask ``providers[0]``; if it is slower than ``delay`` (or fails), race ``providers[1]`` too.
+
+    The first successful answer wins and the other request is cancelled. Raises the primary's
+    error only when every attempted provider failed.
+    """
+    primary = asyncio.ensure_future(_timed(providers[0], query, k))
+    if len(providers) < 2:
+        return await primary
+    wait = hedge_delay(providers[0].name) if delay is None else delay
+    done, _ = await asyncio.wait({primary}, timeout=wait)
+    if done and primary.exception() is None:
+        return primary.result()
+
+    secondary_provider = providers[1]
+    METRICS.inc("search_hedges_total", primary=providers[0].name, secondary=secondary_provider.name)
+    secondary = asyncio.ensure_future(_timed(secondary_provider, query, k))
+    pending = {secondary} if done else {primary, secondary}
+    names = {primary: providers[0].name, secondary: secondary_provider.name}
+    try:
+        while pending:
+            finished, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in finished:
+                if task.exception() is None:
+                    METRICS.inc("search_hedge_wins_total", provider=names[task])
+                    return task.result()
+        # Both failed: surface the primary's error like an unhedged call would.
+        raise primary.exception()  # type: ignore[misc]
+    finally:
+        for task in (primary, secondary):
+            if not task.done():
+                task.cancel()
+
+
+@traced("search_pages")
+async def search_pages_or_raise(query: str, k: int = 5) -> List[Dict[str, Any]]:
+    """Like ``search_pages`` but raises the provider error (after the transport's retries)
+    instead of degrading to ``[]``, for callers that must tell "no results" from "failed"."""
+    queried: List[bool] = []
+    pages = await _search_once(query, k, queried)
+    _LAST_SEARCH_REUSED.set(not queried)
+    return pages
+
+
+def search_reused() -> bool:
+    """Whether the current task's last completed search was served from the search cache or
+    shared with a concurrent identical search, i.e. no provider was asked for it."""
+    return _LAST_SEARCH_REUSED.get()
+
+
+@coalesce(lambda query, k, queried: (normalize_query(query), k))
+async def _search_once(query: str, k: int, queried: List[bool]) -> List[Dict[str, Any]]:
+    providers = provider_chain()
+    if not providers:
+        return []
+
+    async def _fetch() -> List[Dict[str, Any]]:
+        queried.append(True)  # only the single-flight owner on a cache miss gets here
+        return await hedged_search(providers, query, k)
+
+    # Tavily-primary keys match the pre-provider cache layout, so existing entries stay valid.
+    key = make_key(providers[0].name, normalize_query(query), k)
+    return await cached_call(SEARCH_CACHE, key, _fetch)
+
+
+async def search_pages(query: str, k: int = 5) -> List[Dict[str, Any]]:
+    """Return a list of search results, or an empty collection if disabled or failing."""
     try:
-        async with httpx.AsyncClient(timeout=DEFAULT_TIMEOUT) as client:
-            resp = await client.post(SEARCH_ENDPOINT, json=payload)
-            resp.raise_for_status()
-            data = resp.json()
-    except httpx.HTTPError:
+        return await search_pages_or_raise(query=query, k=k)
+    except SEARCH_ERRORS as exc:
+        # Retries/backoff already happened in the transport; degrade to no evidence.
+        logger.warning("search failed for %r: %s", query, exc)
         return []
-    return data.get("results", [])